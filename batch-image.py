@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import csv
@@ -5,16 +6,25 @@ import json
 import time
 import logging
 import argparse
+import base64
+import io
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 import backoff  # pip install backoff
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 from dotenv import load_dotenv
-from openai import OpenAI, OpenAIAPIError
+from openai import APIError, AsyncOpenAI
 from tqdm import tqdm
 
+from dedup_engine import hash_file
+from hash_cache import HashCache
+from image_metadata import MetadataIndex, preview, probe_image
+from llm_cache import CACHE_MODES, CacheMiss, ResponseCache, request_key
+from llm_scheduler import RateLimiter, read_batch_results, run_ordered, write_batch_requests
+
 
 # Load API keys from ~/.env.d/
 from pathlib import Path as PathLib
@@ -31,6 +41,11 @@ CONSTANT_300 = 300
 CONSTANT_400 = 400
 CONSTANT_500 = 500
 CONSTANT_1024 = 1024
+PREVIEW_MAX_SIDE = 1024  # Vision input is downscaled server-side anyway
+PROMPT_TOKEN_ESTIMATE = 1000  # Prompts plus one high-detail 1024px image
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RPM = 500
+DEFAULT_TPM = 30000
 
 
 # ───────────────────────────────────────────────────────────────────────────────
@@ -86,9 +101,10 @@ NUANCED_PROMPTS = {
 # ───────────────────────────────────────────────────────────────────────────────
 
 
-def load_openai_client(env_path: Path) -> OpenAI:
+def load_openai_client(env_path: Path, base_url: Optional[str] = None) -> AsyncOpenAI:
     """
-    Load OpenAI API key from .env and return a configured OpenAI client.
+    Load OpenAI API key from .env and return a configured async OpenAI client.
+    ``base_url`` points it at any OpenAI-compatible server.
     Raises an error if key is missing.
     """
     if not env_path.is_file():
@@ -97,17 +113,17 @@ def load_openai_client(env_path: Path) -> OpenAI:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise EnvironmentError("OPENAI_API_KEY not found in .env")
-    return OpenAI(api_key=api_key)
+    return AsyncOpenAI(api_key=api_key, base_url=base_url)
 
 
 def retry_on_api_error(exception: Exception) -> bool:
     """
-    Return True if we should retry on this exception (e.g., OpenAIAPIError with 5xx or rate limit).
-    We give up on 4xx (invalid request).
+    Return True if we should retry on this exception (e.g., APIError with 5xx or rate limit).
+    We give up on other 4xx (invalid request).
     """
-    if isinstance(exception, OpenAIAPIError):
+    if isinstance(exception, APIError):
         status = getattr(exception, "status_code", None)
-        if status and CONSTANT_400 <= status < CONSTANT_500:
+        if status and CONSTANT_400 <= status < CONSTANT_500 and status != 429:
             return False
         return True
     return False
@@ -115,31 +131,58 @@ def retry_on_api_error(exception: Exception) -> bool:
 
 @backoff.on_exception(
     backoff.expo,
-    OpenAIAPIError,
+    APIError,
     max_tries=4,
     jitter=backoff.full_jitter,
     giveup=lambda e: not retry_on_api_error(e),
 )
-def call_gpt4o(
-    messages: List[Dict[str, Any]], model: str, max_tokens: int, temperature: float
+async def call_gpt4o(
+    client: AsyncOpenAI,
+    messages: List[Dict[str, Any]],
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    limiter: Optional[RateLimiter] = None,
 ) -> str:
     """
     Wrapper around the OpenAI chat completion call with retry logic.
+    Every attempt first reserves a request and its estimated tokens from ``limiter``.
     Returns the raw text content from the model.
     """
-    response = client.chat.completions.create(
+    estimated_tokens = PROMPT_TOKEN_ESTIMATE + max_tokens
+    if limiter:
+        await limiter.acquire(estimated_tokens)
+    response = await client.chat.completions.create(
         model=model,
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
     )
+    if limiter:
+        limiter.settle(estimated_tokens, response.usage.total_tokens if response.usage else None)
     return response.choices[0].message.content
 
 
-def get_image_tech_meta(image_path: Path) -> Dict[str, Optional[Any]]:
+def parse_gpt_response(raw_response: str, name: str) -> Dict[str, Any]:
+    """
+    Pull the JSON object out of the model's reply; {} if there isn't one.
+    """
+    try:
+        start = raw_response.index("{")
+        end = raw_response.rindex("}") + 1
+        return json.loads(raw_response[start:end])
+    except Exception as e:
+        logger.error(f"JSON parse error for '{name}': {e}")
+        logger.debug(f"Raw response: {raw_response}")
+        return {}
+
+
+def get_image_tech_meta(image_path: Path, index: Optional[MetadataIndex] = None) -> Dict[str, Optional[Any]]:
     """
     Extracts technical metadata from an image file:
       filename, width, height, dpi, format, file_size (bytes), created_date (YYYY-MM-DD HH:MM:SS)
+    Only the header is read (no pixel decoding), and results come from the
+    metadata index when the file is unchanged since it was last probed.
     If reading fails, returns None for everything except filename.
     """
     meta = {
@@ -152,20 +195,18 @@ def get_image_tech_meta(image_path: Path) -> Dict[str, Optional[Any]]:
         "created_date": None,
     }
     try:
-        im = Image.open(image_path)
-        width, height = im.width, im.height
-        dpi_info = im.info.get("dpi", (CONSTANT_300, CONSTANT_300))
-        dpi_val = dpi_info[0] if isinstance(dpi_info, tuple) else dpi_info
-        file_size = image_path.stat().st_size
-        created_ts = image_path.stat().st_ctime
-        created_date = datetime.fromtimestamp(created_ts).strftime("%Y-%m-%d %H:%M:%S")
+        st = image_path.stat()
+        image_meta = index.get_or_probe(image_path, st) if index else probe_image(image_path)
+        if image_meta is None:
+            raise UnidentifiedImageError(image_path.name)
+        created_date = datetime.fromtimestamp(st.st_ctime).strftime("%Y-%m-%d %H:%M:%S")
         meta.update(
             {
-                "width": width,
-                "height": height,
-                "dpi": dpi_val,
-                "format": im.format,
-                "file_size": file_size,
+                "width": image_meta.width,
+                "height": image_meta.height,
+                "dpi": image_meta.dpi or CONSTANT_300,
+                "format": image_meta.format,
+                "file_size": st.st_size,
                 "created_date": created_date,
             }
         )
@@ -203,15 +244,25 @@ def discover_images(input_folder: Path) -> List[Path]:
     return image_files
 
 
+def image_data_url(image_path: Path, max_side: int = PREVIEW_MAX_SIDE) -> str:
+    """
+    A JPEG preview of the image as a data URL. The API can't fetch file://
+    URLs, and JPEGs are draft-decoded at reduced scale, so a print-sized
+    file never gets decoded at full resolution.
+    """
+    buffer = io.BytesIO()
+    preview(image_path, max_side).save(buffer, format="JPEG", quality=90)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
 def build_gpt_messages(image_path: Path) -> List[Dict[str, Any]]:
     """
     Build the list of messages for GPT-4o:
       1) System role with multimedia analysis instructions
       2) User role with multimodal content array (image_url + text prompt)
     """
-    image_url = f"file://{image_path.resolve()}"
     multimodal_content = [
-        {"type": "image_url", "image_url": image_url},
+        {"type": "image_url", "image_url": {"url": image_data_url(image_path)}},
         {"type": "text", "text": USER_TEXT_PROMPT},
     ]
     return [
@@ -220,6 +271,49 @@ def build_gpt_messages(image_path: Path) -> List[Dict[str, Any]]:
     ]
 
 
+def chat_request_body(image_path: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    The chat completion request for one image, as sent live or written to a batch file.
+    """
+    return {
+        "model": args.model,
+        "messages": build_gpt_messages(image_path),
+        "max_tokens": args.max_tokens,
+        "temperature": args.temperature,
+    }
+
+
+def response_cache_key(image_path: Path, args: argparse.Namespace, hashes: Optional[HashCache] = None) -> str:
+    """
+    Response cache key: prompts, request settings and the image file's bytes
+    (hashed from the source, so a cache hit never has to build the preview).
+    With ``hashes`` an unchanged image isn't even re-read to hash it.
+    """
+    if hashes is not None:
+        image_sha256 = hashes.get_or_compute(image_path, "sha256", lambda: hash_file(image_path))
+    else:
+        image_sha256 = hash_file(image_path)
+    prompts = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": USER_TEXT_PROMPT},
+    ]
+    return request_key(
+        args.model,
+        prompts,
+        args.temperature,
+        args.max_tokens,
+        image_sha256=image_sha256,
+        preview_max_side=PREVIEW_MAX_SIDE,
+    )
+
+
+def batch_custom_id(image_path: Path, input_folder: Path) -> str:
+    """
+    Stable batch request id: the image path relative to the input folder.
+    """
+    return image_path.relative_to(input_folder).as_posix()
+
+
 # ───────────────────────────────────────────────────────────────────────────────
 # ARGPARSE
 # ───────────────────────────────────────────────────────────────────────────────
@@ -262,6 +356,65 @@ def parse_args() -> argparse.Namespace:
         default=0.7,
         help="Temperature for GPT-4o (default: 0.7).",
     )
+    parser.add_argument(
+        "--metadata-db",
+        type=Path,
+        default=None,
+        help="Image metadata index (default: ~/.cache/pythons/image_metadata.db).",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        type=Path,
+        default=None,
+        help="Image hash cache database (default: ~/.cache/pythons/hash_cache.db).",
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=None,
+        help="OpenAI-compatible API base URL (default: the OpenAI API, or $OPENAI_BASE_URL).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Requests in flight at once (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=DEFAULT_RPM,
+        help=f"Requests per minute limit (default: {DEFAULT_RPM}).",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        default=DEFAULT_TPM,
+        help=f"Tokens per minute limit, 0 to disable (default: {DEFAULT_TPM}).",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=None,
+        help="Response cache: use (default), replay (cached responses only, no API calls) or off.",
+    )
+    parser.add_argument(
+        "--cache-db",
+        type=Path,
+        default=None,
+        help="Response cache database (default: ~/.cache/pythons/llm_responses.db).",
+    )
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument(
+        "--export-batch",
+        type=Path,
+        help="Write Batch API requests (JSONL) instead of calling the API, then exit.",
+    )
+    batch.add_argument(
+        "--import-batch",
+        type=Path,
+        help="Build the CSV from a Batch API output file (JSONL) instead of calling the API.",
+    )
     return parser.parse_args()
 
     # ───────────────────────────────────────────────────────────────────────────────
@@ -271,6 +424,158 @@ def parse_args() -> argparse.Namespace:
     """main function."""
 
 
+async def write_analysis_csv(
+    image_paths: List[Path],
+    input_folder: Path,
+    output_csv: Path,
+    fieldnames: List[str],
+    args: argparse.Namespace,
+    client: Optional[AsyncOpenAI],
+    imported: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Analyze every image with up to ``args.concurrency`` requests in flight
+    under the RPM/TPM limits, writing CSV rows in discovery order. Responses
+    already in the cache are reused. With ``imported`` (Batch API results by
+    custom id) no requests are made.
+
+    Image hashes for the cache keys go through a HashCache that lives on
+    one dedicated thread, since its SQLite connection can't be shared with
+    the event loop or the ``to_thread`` pool.
+    """
+    date_str = datetime.now().strftime("%Y%m%d")
+    limiter = RateLimiter(args.rpm, args.tpm)
+    loop = asyncio.get_running_loop()
+    hash_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-hash")
+    hashes = hash_thread.submit(HashCache, args.hash_cache).result()
+
+    async def analyze(image_path: Path) -> str:
+        if imported is not None:
+            raw_response, error = imported.get(
+                batch_custom_id(image_path, input_folder), (None, "missing from batch results")
+            )
+            if error:
+                raise RuntimeError(f"batch request failed: {error}")
+            return raw_response
+
+        key = await loop.run_in_executor(hash_thread, response_cache_key, image_path, args, hashes)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        if cache.mode == "replay":
+            raise CacheMiss(f"no cached response for '{image_path.name}'")
+
+        # Preview decoding is CPU work; keep it off the event loop
+        messages = await asyncio.to_thread(build_gpt_messages, image_path)
+        raw_response = await call_gpt4o(
+            client,
+            messages,
+            model=args.model,
+            max_tokens=args.max_tokens,
+            temperature=args.temperature,
+            limiter=limiter,
+        )
+        cache.put(key, args.model, raw_response)
+        return raw_response
+
+    try:
+        with output_csv.open("w", newline="", encoding="utf-8") as csvfile, MetadataIndex(
+            args.metadata_db
+        ) as metadata_index, ResponseCache(args.cache_db, args.cache_mode) as cache:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+
+            with tqdm(total=len(image_paths), desc="Analyzing images", unit="image") as progress:
+                # Responses arrive out of order; run_ordered hands them back in order
+                async for done in run_ordered(image_paths, analyze, args.concurrency):
+                    image_path = done.item
+
+                    # 1) Technical metadata
+                    tech_meta = get_image_tech_meta(image_path, metadata_index)
+
+                    # 2) GPT-4o Vision response & 3) Parse JSON
+                    if isinstance(done.error, APIError):
+                        logger.error(f"API error for '{image_path.name}': {done.error}")
+                        gpt_meta = {}
+                    elif isinstance(done.error, CacheMiss):
+                        logger.warning(f"Replay skipped '{image_path.name}': {done.error}")
+                        gpt_meta = {}
+                    elif done.error is not None:
+                        logger.error(f"Unexpected error for '{image_path.name}': {done.error}")
+                        gpt_meta = {}
+                    else:
+                        gpt_meta = parse_gpt_response(done.result, image_path.name)
+
+                    # 4) Build “source” tag
+                    source_tag = build_source_tag(image_path, input_folder, date_str)
+
+                    # 5) Build SEO fields (dummy values or placeholders—edit as needed)
+                    seo_data = {
+                        "SEO Keywords": SEO_TEMPLATE["SEO Keywords"],
+                        "Traffic Source": SEO_TEMPLATE["Traffic Source"],
+                        "CRO Tactic": SEO_TEMPLATE["CRO Tactic"],
+                        "Backlink Source": SEO_TEMPLATE["Backlink Source"],
+                        "Engagement Rate": SEO_TEMPLATE["Engagement Rate"],
+                    }
+
+                    # 6) Build final record
+                    record: Dict[str, Any] = {
+                        # Technical metadata
+                        "filename": tech_meta["filename"],
+                        "width": tech_meta["width"],
+                        "height": tech_meta["height"],
+                        "dpi": tech_meta["dpi"],
+                        "format": tech_meta["format"],
+                        "file_size": tech_meta["file_size"],
+                        "created_date": tech_meta["created_date"],
+                        # GPT-4o fields
+                        "main_subject": gpt_meta.get("main_subject"),
+                        "style": gpt_meta.get("style"),
+                        "color_palette": (
+                            json.dumps(gpt_meta.get("color_palette", []))
+                            if isinstance(gpt_meta.get("color_palette"), list)
+                            else gpt_meta.get("color_palette")
+                        ),
+                        "tags": (
+                            json.dumps(gpt_meta.get("tags", []))
+                            if isinstance(gpt_meta.get("tags"), list)
+                            else gpt_meta.get("tags")
+                        ),
+                        "orientation": gpt_meta.get("orientation"),
+                        "suggested_products": (
+                            json.dumps(gpt_meta.get("suggested_products", []))
+                            if isinstance(gpt_meta.get("suggested_products"), list)
+                            else gpt_meta.get("suggested_products")
+                        ),
+                        "SEO_title": gpt_meta.get("SEO_title"),
+                        "SEO_description": gpt_meta.get("SEO_description"),
+                        "emotion": gpt_meta.get("emotion"),
+                        "safety_rating": gpt_meta.get("safety_rating"),
+                        "dominant_keyword": gpt_meta.get("dominant_keyword"),
+                        # Source tag
+                        "source": source_tag,
+                        # SEO (Top 5% Analytics) placeholders
+                        "SEO Keywords": seo_data["SEO Keywords"],
+                        "Traffic Source": seo_data["Traffic Source"],
+                        "CRO Tactic": seo_data["CRO Tactic"],
+                        "Backlink Source": seo_data["Backlink Source"],
+                        "Engagement Rate": seo_data["Engagement Rate"],
+                        # Niche design prompts
+                        "Design Prompt - Geeky": NUANCED_PROMPTS["Geeky"],
+                        "Design Prompt - Dark Humor": NUANCED_PROMPTS["Dark Humour"],
+                        "Design Prompt - Anime": NUANCED_PROMPTS["Anime"],
+                    }
+
+                    writer.writerow(record)
+                    progress.update()
+
+            logger.info(cache.summary())
+            logger.info(hash_thread.submit(hashes.summary).result())
+    finally:
+        hash_thread.submit(hashes.close).result()
+        hash_thread.shutdown()
+
+
 def main():
     args = parse_args()
     input_folder: Path = args.input_folder.resolve()
@@ -282,22 +587,38 @@ def main():
         )
         sys.exit(1)
 
-    # Load OpenAI client
-    try:
-        global client
-        client = load_openai_client(Path.home() / ".env")
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {e}")
-        sys.exit(1)
-
     # Discover images
     image_paths = discover_images(input_folder)
     if not image_paths:
         logger.info(f"No image files found in '{input_folder}'. Exiting.")
         sys.exit(0)
 
+    # Offline batch: write the requests and stop
+    if args.export_batch:
+        count = write_batch_requests(
+            str(args.export_batch),
+            (
+                (batch_custom_id(image_path, input_folder), chat_request_body(image_path, args))
+                for image_path in tqdm(image_paths, desc="Exporting requests", unit="image")
+            ),
+        )
+        logger.info(f"✅ Wrote {count} batch requests to {args.export_batch.resolve()}")
+        return
+
+    # Load OpenAI client (not needed when importing batch results or replaying the cache)
+    client, imported = None, None
+    if args.import_batch:
+        imported = read_batch_results(str(args.import_batch))
+    elif (args.cache_mode or os.environ.get("LLM_CACHE_MODE")) == "replay":
+        logger.info("Replay mode: using cached responses only")
+    else:
+        try:
+            client = load_openai_client(Path.home() / ".env", args.base_url)
+        except Exception as e:
+            logger.error(f"Failed to initialize OpenAI client: {e}")
+            sys.exit(1)
+
     # Prepare CSV fieldnames (including SEO and design prompts)
-    date_str = datetime.now().strftime("%Y%m%d")
     fieldnames = [
         "filename",
         "width",
@@ -330,105 +651,10 @@ def main():
         "Design Prompt - Anime",
     ]
 
-    # Open CSV for writing
     try:
-        with output_csv.open("w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for image_path in tqdm(image_paths, desc="Analyzing images", unit="image"):
-                # 1) Technical metadata
-                tech_meta = get_image_tech_meta(image_path)
-
-                # 2) Build GPT messages & call GPT-4o Vision
-                messages = build_gpt_messages(image_path)
-                try:
-                    raw_response = call_gpt4o(
-                        messages=messages,
-                        model=args.model,
-                        max_tokens=args.max_tokens,
-                        temperature=args.temperature,
-                    )
-                except OpenAIAPIError as e:
-                    logger.error(f"API error for '{image_path.name}': {e}")
-                    gpt_meta = {}
-                except Exception as e:
-                    logger.error(f"Unexpected error for '{image_path.name}': {e}")
-                    gpt_meta = {}
-                else:
-                    # 3) Parse JSON
-                    try:
-                        start = raw_response.index("{")
-                        end = raw_response.rindex("}") + 1
-                        json_str = raw_response[start:end]
-                        gpt_meta = json.loads(json_str)
-                    except Exception as e:
-                        logger.error(f"JSON parse error for '{image_path.name}': {e}")
-                        logger.debug(f"Raw response: {raw_response}")
-                        gpt_meta = {}
-
-                # 4) Build “source” tag
-                source_tag = build_source_tag(image_path, input_folder, date_str)
-
-                # 5) Build SEO fields (dummy values or placeholders—edit as needed)
-                seo_data = {
-                    "SEO Keywords": SEO_TEMPLATE["SEO Keywords"],
-                    "Traffic Source": SEO_TEMPLATE["Traffic Source"],
-                    "CRO Tactic": SEO_TEMPLATE["CRO Tactic"],
-                    "Backlink Source": SEO_TEMPLATE["Backlink Source"],
-                    "Engagement Rate": SEO_TEMPLATE["Engagement Rate"],
-                }
-
-                # 6) Build final record
-                record: Dict[str, Any] = {
-                    # Technical metadata
-                    "filename": tech_meta["filename"],
-                    "width": tech_meta["width"],
-                    "height": tech_meta["height"],
-                    "dpi": tech_meta["dpi"],
-                    "format": tech_meta["format"],
-                    "file_size": tech_meta["file_size"],
-                    "created_date": tech_meta["created_date"],
-                    # GPT-4o fields
-                    "main_subject": gpt_meta.get("main_subject"),
-                    "style": gpt_meta.get("style"),
-                    "color_palette": (
-                        json.dumps(gpt_meta.get("color_palette", []))
-                        if isinstance(gpt_meta.get("color_palette"), list)
-                        else gpt_meta.get("color_palette")
-                    ),
-                    "tags": (
-                        json.dumps(gpt_meta.get("tags", []))
-                        if isinstance(gpt_meta.get("tags"), list)
-                        else gpt_meta.get("tags")
-                    ),
-                    "orientation": gpt_meta.get("orientation"),
-                    "suggested_products": (
-                        json.dumps(gpt_meta.get("suggested_products", []))
-                        if isinstance(gpt_meta.get("suggested_products"), list)
-                        else gpt_meta.get("suggested_products")
-                    ),
-                    "SEO_title": gpt_meta.get("SEO_title"),
-                    "SEO_description": gpt_meta.get("SEO_description"),
-                    "emotion": gpt_meta.get("emotion"),
-                    "safety_rating": gpt_meta.get("safety_rating"),
-                    "dominant_keyword": gpt_meta.get("dominant_keyword"),
-                    # Source tag
-                    "source": source_tag,
-                    # SEO (Top 5% Analytics) placeholders
-                    "SEO Keywords": seo_data["SEO Keywords"],
-                    "Traffic Source": seo_data["Traffic Source"],
-                    "CRO Tactic": seo_data["CRO Tactic"],
-                    "Backlink Source": seo_data["Backlink Source"],
-                    "Engagement Rate": seo_data["Engagement Rate"],
-                    # Niche design prompts
-                    "Design Prompt - Geeky": NUANCED_PROMPTS["Geeky"],
-                    "Design Prompt - Dark Humor": NUANCED_PROMPTS["Dark Humour"],
-                    "Design Prompt - Anime": NUANCED_PROMPTS["Anime"],
-                }
-
-                writer.writerow(record)
-
+        asyncio.run(
+            write_analysis_csv(image_paths, input_folder, output_csv, fieldnames, args, client, imported)
+        )
     except KeyboardInterrupt:
         logger.warning("Interrupted by user. Exiting gracefully.")
         sys.exit(0)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-pattern is_excluded loop vs fast_walk.ExclusionMatcher
+
+Generates synthetic home-directory paths, checks both implementations give
+identical answers, then times them over the same path list.
+
+Usage:
+    python benchmark-exclusion-matcher.py --paths 1000000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from fast_walk import ExclusionMatcher
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# The exclusion list used by file-dedup-scanner / find-duplicates-md5
+EXCLUDED_PATTERNS = [
+    r"^\..*",
+    r".*/venv/.*",
+    r".*/\.venv/.*",
+    r".*/my_global_venv/.*",
+    r".*/simplegallery/.*",
+    r".*/avatararts/.*",
+    r".*/github/.*",
+    r".*/Documents/gitHub/.*",
+    r".*/\.my_global_venv/.*",
+    r".*/node/.*",
+    r".*/Movies/CapCut/.*",
+    r".*/miniconda3/.*",
+    r".*/miniconda3.bak/.*",
+    r".*/Movies/movavi/.*",
+    r".*/env/.*",
+    r".*/\.env/.*",
+    r".*/Library/.*",
+    r".*/\.config/.*",
+    r".*/\.spicetify/.*",
+    r".*/\.gem/.*",
+    r".*/\.zprofile/.*",
+    r"^.*\/\..*",
+]
+
+COMPONENTS = [
+    "Documents", "Pictures", "Music", "Movies", "CapCut", "projects", "python",
+    "src", "venv", "node", "Library", "github", "gitHub", "archive", "2024",
+    ".git", "images", "suno", "exports", "miniconda3", "site-packages",
+]
+FILENAMES = ["track.mp3", "cover.png", "notes.txt", "main.py", ".DS_Store", "data.csv"]
+
+
+def is_excluded(path, patterns):
+    """The original per-pattern loop"""
+    for pattern in patterns:
+        if re.search(pattern, path):
+            return True
+    return False
+
+
+def make_paths(count, seed=42):
+    """Synthetic absolute paths 2-8 directories deep"""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        depth = rng.randint(2, 8)
+        parts = ["/Users/steven"] + [rng.choice(COMPONENTS) for _ in range(depth)]
+        parts.append(rng.choice(FILENAMES))
+        paths.append("/".join(parts))
+    return paths
+
+
+def time_it(label, func, paths):
+    """Run ``func`` over every path and log paths/sec"""
+    start = time.perf_counter()
+    excluded = sum(1 for path in paths if func(path))
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"{label:<22} {elapsed:8.3f}s  {len(paths) / elapsed:>12,.0f} paths/s  "
+        f"({excluded:,} excluded)"
+    )
+    return elapsed
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark path exclusion matching")
+    parser.add_argument("--paths", type=int, default=200000, help="Paths to generate")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    paths = make_paths(args.paths)
+    matcher = ExclusionMatcher(EXCLUDED_PATTERNS)
+
+    mismatches = [p for p in paths[:20000] if is_excluded(p, EXCLUDED_PATTERNS) != matcher.matches(p)]
+    if mismatches:
+        logger.info(f"MISMATCH on {len(mismatches)} paths, e.g. {mismatches[0]}")
+        return
+
+    logger.info(f"{len(EXCLUDED_PATTERNS)} patterns x {len(paths):,} paths\n")
+    loop = time_it("per-pattern re.search", lambda p: is_excluded(p, EXCLUDED_PATTERNS), paths)
+    fast = time_it("ExclusionMatcher", matcher.matches, paths)
+    logger.info(f"\nSpeedup: {loop / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
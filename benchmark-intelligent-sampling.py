@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ultra.py large-file sampling, readlines() vs streaming reservoir
+
+Writes a synthetic log file (1 GB by default), then samples it with the
+original three-open ``readlines()`` strategy and with the current
+``UltraAdvancedContentAnalyzer._intelligent_sampling``. Each run happens in
+its own process so peak RSS is measured independently.
+
+Usage:
+    python benchmark-intelligent-sampling.py --size-mb 1024
+    python benchmark-intelligent-sampling.py --log /var/log/big.log
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+CONSTANT_100 = 100
+CONSTANT_1024 = 1024
+MAX_SAMPLE_BYTES = 5 * CONSTANT_1024 * CONSTANT_1024
+LEVELS = ["INFO", "DEBUG", "WARNING", "ERROR"]
+
+
+def write_log(path, size_mb, seed=7):
+    """Synthetic log lines until the file reaches ``size_mb``"""
+    rng = random.Random(seed)
+    target = size_mb * CONSTANT_1024 * CONSTANT_1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            block = "".join(
+                f"2024-05-{rng.randint(1, 28):02d} {rng.choice(LEVELS)} worker-{rng.randint(1, 64)} "
+                f"request id={rng.getrandbits(48):x} took {rng.random() * 1000:.2f}ms\n"
+                for _ in range(10000)
+            )
+            f.write(block)
+            written += len(block)
+
+
+def readlines_sampling(file_path, max_size, encoding):
+    """The original sampler: three opens and readlines() over the middle"""
+    file_size = os.path.getsize(file_path)
+    header_size = min(CONSTANT_1024 * CONSTANT_1024, max_size // 3)
+    footer_size = min(CONSTANT_1024 * CONSTANT_1024, max_size // 3)
+    middle_size = max_size - header_size - footer_size
+
+    sampled_content = []
+    with open(file_path, "r", encoding=encoding, errors="ignore") as f:
+        sampled_content.append(f.read(header_size))
+
+    if middle_size > 0 and file_size > header_size + footer_size:
+        with open(file_path, "r", encoding=encoding, errors="ignore") as f:
+            f.seek(header_size)
+            lines = f.readlines()
+            total_lines = len(lines)
+            if total_lines > CONSTANT_100:
+                step = max(1, total_lines // CONSTANT_100)
+                middle_lines = [lines[i] for i in range(0, total_lines, step)]
+                sampled_content.append("".join(middle_lines[: middle_size // CONSTANT_100]))
+
+    if footer_size > 0:
+        with open(file_path, "r", encoding=encoding, errors="ignore") as f:
+            f.seek(max(0, file_size - footer_size))
+            sampled_content.append(f.read())
+
+    return "".join(sampled_content)
+
+
+def streaming_sampler():
+    """The current ultra.py sampler (imported up front so it isn't counted)"""
+    from ultra import UltraAdvancedContentAnalyzer
+
+    return UltraAdvancedContentAnalyzer(os.devnull)._intelligent_sampling
+
+
+def _measure(name, file_path, results):
+    sampler = readlines_sampling if name == "readlines" else streaming_sampler()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    content = sampler(file_path, MAX_SAMPLE_BYTES, "utf-8")
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((name, elapsed, peak / CONSTANT_1024, (peak - baseline) / CONSTANT_1024, len(content)))
+
+
+def run_isolated(name, file_path):
+    """Run one sampler in a fresh process and return its measurements"""
+    results = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_measure, args=(name, file_path, results))
+    proc.start()
+    measurement = results.get()
+    proc.join()
+    return measurement
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark large-file sampling memory use")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Synthetic log size")
+    parser.add_argument("--log", type=str, help="Use an existing file instead of generating one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.log:
+        file_path, generated = args.log, False
+    else:
+        fd, file_path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        generated = True
+        logger.info(f"Writing {args.size_mb} MB synthetic log to {file_path}...")
+        write_log(file_path, args.size_mb)
+
+    try:
+        size_mb = os.path.getsize(file_path) / CONSTANT_1024 / CONSTANT_1024
+        logger.info(f"Sampling {size_mb:,.0f} MB with a {MAX_SAMPLE_BYTES // CONSTANT_1024 // CONSTANT_1024} MB budget\n")
+        for name in ("streaming", "readlines"):
+            name, elapsed, peak_mb, growth_mb, chars = run_isolated(name, file_path)
+            logger.info(
+                f"{name:<10} {elapsed:7.2f}s  peak RSS {peak_mb:8.1f} MB  "
+                f"(+{growth_mb:.1f} MB while sampling)  {chars:,} chars sampled"
+            )
+    finally:
+        if generated:
+            os.remove(file_path)
+
+
+if __name__ == "__main__":
+    main()
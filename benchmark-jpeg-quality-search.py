@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stepped save-to-disk quality loop vs image_engine.encode_to_target_size
+
+For every image in a reference set (or synthetic print-sized images when no
+folder is given) both strategies target the same size range:
+
+* stepped: quality 95, 90, 85 ... each saved to disk and measured with
+  os.path.getsize (what image-resize.py / image-optimize-9mb-threshold.py
+  used to do)
+* search:  in-memory encodes with a probe-guided quality search, one write
+
+Reports encodes per image, final quality and wall time.
+
+Usage:
+    python benchmark-jpeg-quality-search.py --images ~/Pictures/pod-reference
+    python benchmark-jpeg-quality-search.py --synthetic 5 --megapixels 40
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image
+
+from image_engine import encode_to_target_size, write_atomic
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+CONSTANT_1024 = 1024
+TARGET_DPI = 300
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def stepped_encode(im, output_path, min_bytes, max_bytes, floor=15):
+    """The original loop: save at 95, 90, ... until the file fits"""
+    quality = 95
+    encodes = 0
+    while quality >= floor:
+        im.save(output_path, "JPEG", dpi=(TARGET_DPI, TARGET_DPI), quality=quality)
+        encodes += 1
+        size = os.path.getsize(output_path)
+        if min_bytes <= size <= max_bytes:
+            return quality, size, encodes
+        quality -= 5
+    return quality + 5, size, encodes
+
+
+def synthetic_images(count, megapixels, seed=3):
+    """Photo-like RGB images: blurred noise over gradients, varying detail"""
+    rng = random.Random(seed)
+    width = int((megapixels * 1e6 * 1.5) ** 0.5)
+    height = int(width / 1.5)
+    for i in range(count):
+        detail = rng.randint(20, 90)
+        noise = Image.effect_noise((width // 4, height // 4), detail).convert("RGB")
+        gradient = Image.linear_gradient("L").rotate(rng.randint(0, 359)).resize((width, height)).convert("RGB")
+        yield f"synthetic_{i + 1}.jpg", Image.blend(noise.resize((width, height), Image.BICUBIC), gradient, rng.random())
+
+
+def folder_images(folder):
+    """Every supported image in ``folder``, converted to RGB"""
+    for name in sorted(os.listdir(folder)):
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+            with Image.open(os.path.join(folder, name)) as im:
+                yield name, im.convert("RGB")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark size-targeted JPEG encoding")
+    parser.add_argument("--images", help="Folder of reference images")
+    parser.add_argument("--synthetic", type=int, default=4, help="Synthetic images when no folder is given")
+    parser.add_argument("--megapixels", type=float, default=24, help="Synthetic image size")
+    parser.add_argument("--min-mb", type=float, default=5, help="Target range lower bound")
+    parser.add_argument("--max-mb", type=float, default=9, help="Target range upper bound")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    min_bytes = int(args.min_mb * CONSTANT_1024**2)
+    max_bytes = int(args.max_mb * CONSTANT_1024**2)
+    images = folder_images(args.images) if args.images else synthetic_images(args.synthetic, args.megapixels)
+
+    totals = {"stepped": [0, 0.0], "search": [0, 0.0]}
+    count = 0
+    logger.info(f"{'image':<24} {'stepped (q/enc/s)':>22} {'search (q/enc/s)':>22}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, im in images:
+            out = os.path.join(tmp, os.path.splitext(name)[0] + ".jpg")
+
+            start = time.perf_counter()
+            old_q, _, old_encodes = stepped_encode(im, out, min_bytes, max_bytes)
+            old_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = encode_to_target_size(
+                im, "JPEG", max_bytes, min_bytes, quality_range=(15, 95), dpi=(TARGET_DPI, TARGET_DPI)
+            )
+            write_atomic(out, result.data)
+            new_time = time.perf_counter() - start
+
+            totals["stepped"][0] += old_encodes
+            totals["stepped"][1] += old_time
+            totals["search"][0] += result.encodes
+            totals["search"][1] += new_time
+            count += 1
+            logger.info(
+                f"{name[:24]:<24} {old_q:>8} {old_encodes:>5} {old_time:>7.2f}s "
+                f"{result.quality:>8} {result.encodes:>5} {new_time:>7.2f}s"
+            )
+
+    if not count:
+        logger.info("No images found")
+        return
+    for label, (encodes, seconds) in totals.items():
+        logger.info(f"{label:<8} {encodes / count:5.1f} full-size encodes/image  {seconds:8.2f}s total")
+    logger.info(f"Speedup: {totals['stepped'][1] / totals['search'][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
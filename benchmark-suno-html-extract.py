@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Benchmark and regression check: suno_html_engine backends vs BeautifulSoup
+
+Every page of a fixture corpus is extracted with each backend, both as
+scraper card rows (cards_from_file) and as library songs
+(songs_from_file). Records must equal the ``bs4`` reference exactly; the
+first difference per backend is printed. Timings are reported per backend,
+plus one run through the process pool. Section splitting
+(split_sections) must give bs4's html.parser output for every backend
+that does not resolve to lxml.
+
+--without-lxml hides lxml before anything imports it, so the run covers
+an install without it: ``auto`` must fall back to ``stream`` and no code
+path may ask bs4 for its lxml tree builder.
+
+Without --pages a synthetic corpus is generated: card pages (covers before
+cards, nested cards, missing fields, script text, comments, entities,
+stray end tags) and library pages (valid, empty and broken __NEXT_DATA__,
+link-only pages with duplicate links). --keep writes it to a folder so it
+can be reused as a fixed fixture set.
+
+Usage:
+    python benchmark-suno-html-extract.py
+    python benchmark-suno-html-extract.py --pages ~/Music/NocTurnE-meLoDieS/suno --workers 4
+    python benchmark-suno-html-extract.py --files 40 --cards 2000 --keep fixtures/suno-html
+    python benchmark-suno-html-extract.py --without-lxml
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+from suno_html_engine import BACKENDS, cards_from_file, extract_many, resolve_backend, songs_from_file, split_sections
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+GENRES = ["dark synthwave", "lo-fi & chill", "Folk <Rock>", "trap", "ambient  drone", "jazz-hop"]
+
+
+def _song_id(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+def card_html(rng, i):
+    """One scraper card, sometimes with pieces missing or odd markup"""
+    parts = []
+    if rng.random() < 0.8:
+        parts.append(f'<img class="cover" src="https://cdn2.suno.ai/image_{i}.jpeg" alt="">')
+    if rng.random() < 0.1:
+        parts.append("<img alt='no src'>")
+    body = []
+    if rng.random() < 0.95:
+        body.append(f'<span class="text-primary font-bold" title="Song {i} &amp; Friends">Song {i}</span>')
+    if rng.random() < 0.1:
+        body.append("<span class='text-primary'>untitled</span>")
+    if rng.random() < 0.9:
+        body.append(f'<a href="/song/{_song_id(rng)}"><b>play</b></a>')
+    elif rng.random() < 0.5:
+        body.append("<a href>empty href</a>")
+    if rng.random() < 0.85:
+        genre = rng.choice(GENRES).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        body.append(f'<a class="hover:underline" href="/style/{i}">\n  {genre} <!-- tag --> <i>v{i % 5}</i> </a>')
+    if rng.random() < 0.85:
+        body.append(f'<span class="text-mono">  {rng.randint(1, 9)}:{rng.randint(0, 59):02d} <script>var t = "9:99";</script></span>')
+    if rng.random() < 0.05:
+        body.append('<div class="css-79jxux"><span class="text-primary" title="Nested">n</span></div>')
+    if rng.random() < 0.05:
+        body.append("</span><p>unclosed paragraph")
+    rng.shuffle(body)
+    parts.append(f'<div class="css-79jxux">{"".join(body)}</div>')
+    return "".join(parts)
+
+
+def card_page(rng, cards):
+    rows = "\n".join(f"<li>{card_html(rng, i)}</li>" if i % 3 else card_html(rng, i) for i in range(cards))
+    return (
+        "<!DOCTYPE html><html><head><title>Library</title>"
+        "<style>.css-79jxux{display:flex}</style></head>"
+        f"<body><main>{rows}</main></body></html>"
+    )
+
+
+def clip(rng, i):
+    return {
+        "id": _song_id(rng),
+        "title": f"Clip {i}",
+        "audio_url": rng.choice(["", f"https://cdn1.suno.ai/{i}.mp3"]),
+        "image_url": f"https://cdn2.suno.ai/image_{i}.jpeg",
+        "duration": rng.uniform(0, 300),
+        "display_name": "Nocturne",
+        "handle": rng.choice(["", "nocturne"]),
+        "created_at": "2024-05-01T00:00:00Z",
+        "play_count": rng.randint(0, 1000),
+        "metadata": {"tags": ["dark", "synth"], "prompt": "[Verse]\nla la </script-less>"},
+        "is_public": True,
+        "model_name": "chirp-v3",
+    }
+
+
+def song_link_html(rng, i, song_id):
+    """A /song/ link inside a container with the facts the fallback reads"""
+    inner = []
+    if rng.random() < 0.7:
+        inner.append(f'<img data-src="x" src="https://cdn2.suno.ai/image_{i}.jpeg">')
+    title = f' title="Track {i}"' if rng.random() < 0.5 else ""
+    inner.append(f'<a href="https://suno.com/song/{song_id}"{title}> Track <b>{i}</b> </a>')
+    if rng.random() < 0.8:
+        inner.append(f'<span class="font-mono text-xs">{rng.randint(0, 9)}:{rng.randint(0, 59):02d}</span>')
+    for tag in rng.sample(["pop", "indie rock", "drill"], rng.randint(0, 2)):
+        inner.append(f'<a href="/style/{tag}"> {tag} </a>')
+    if rng.random() < 0.6:
+        inner.append(f'<a href="/@user{i}"><span>User</span> {i}</a>')
+    rng.shuffle(inner)
+    return f'<div class="row">{"".join(inner)}</div>'
+
+
+def library_page(rng, songs, kind):
+    body = []
+    if kind in ("next_data", "broken", "empty"):
+        payload = {"props": {"pageProps": {"clips": [clip(rng, i) for i in range(songs)]}}}
+        if kind == "empty":
+            payload = {"props": {"pageProps": {}}}
+        text = json.dumps(payload)
+        if kind == "broken":
+            text = text[: len(text) // 2]
+        body.append(f'<script id="__NEXT_DATA__" type="application/json">{text}</script>')
+    ids = [_song_id(rng) for _ in range(songs)]
+    for i in range(songs):
+        body.append(song_link_html(rng, i, rng.choice(ids) if rng.random() < 0.1 else ids[i]))
+    return f"<html><body>{''.join(body)}</body></html>"
+
+
+def write_corpus(folder, files, cards, seed=7):
+    """Synthetic fixture pages in ``folder``"""
+    rng = random.Random(seed)
+    kinds = ["cards", "next_data", "links", "broken", "empty"]
+    paths = []
+    for i in range(files):
+        kind = kinds[i % len(kinds)]
+        html = card_page(rng, cards) if kind == "cards" else library_page(rng, cards, kind)
+        path = os.path.join(folder, f"suno_{kind}_{i:03d}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        paths.append(path)
+    return paths
+
+
+def first_difference(expected, actual):
+    if len(expected) != len(actual):
+        return f"{len(actual)} records, expected {len(expected)}"
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            keys = [k for k in a if a.get(k) != b.get(k)]
+            return f"record {i}: " + ", ".join(f"{k}={b.get(k)!r} expected {a.get(k)!r}" for k in keys)
+    return None
+
+
+def run(backends, paths):
+    """Extract every page with every backend; returns (timings, outputs)"""
+    timings = {}
+    outputs = {}
+    for backend in backends:
+        start = time.perf_counter()
+        outputs[backend] = [(cards_from_file(path, backend), songs_from_file(path, backend)) for path in paths]
+        timings[backend] = time.perf_counter() - start
+    return timings, outputs
+
+
+def check_split(backends, paths):
+    """Backends whose split_sections differs from bs4's (lxml's own builder excluded)"""
+    reference = [split_sections(path, "bs4") for path in paths]
+    failures = []
+    for backend in ["auto"] + backends:
+        if resolve_backend(backend) == "lxml":
+            continue
+        for path, expected in zip(paths, reference):
+            try:
+                sections = split_sections(path, backend)
+            except Exception as e:
+                failures.append(backend)
+                logger.info(f"MISMATCH split {backend} {os.path.basename(path)}: {type(e).__name__}: {e}")
+                break
+            if sections != expected:
+                failures.append(backend)
+                logger.info(f"MISMATCH split {backend} {os.path.basename(path)}: {len(sections)} sections, expected {len(expected)}")
+                break
+    return failures
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Compare Suno HTML extraction backends")
+    parser.add_argument("--pages", help="Folder of saved .html pages (default: synthetic corpus)")
+    parser.add_argument("--files", type=int, default=10, help="Synthetic pages")
+    parser.add_argument("--cards", type=int, default=500, help="Cards/songs per synthetic page")
+    parser.add_argument("--keep", help="Write the synthetic corpus here instead of a temp folder")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for the pool run")
+    parser.add_argument("--without-lxml", action="store_true", help="Run as if lxml were not installed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.without_lxml:
+        # Before bs4 is first imported, so it registers no lxml tree builder either
+        sys.modules["lxml"] = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pages:
+            paths = sorted(
+                os.path.join(args.pages, name) for name in os.listdir(args.pages) if name.endswith(".html")
+            )
+        else:
+            folder = args.keep or tmp
+            os.makedirs(folder, exist_ok=True)
+            paths = write_corpus(folder, args.files, args.cards)
+        if not paths:
+            logger.info("No pages found")
+            return
+        megabytes = sum(os.path.getsize(path) for path in paths) / 1024**2
+        logger.info(f"{len(paths)} pages, {megabytes:.1f} MB")
+
+        backends = list(BACKENDS)
+        if not importlib.util.find_spec("lxml"):
+            backends.remove("lxml")
+            logger.info("lxml not installed: skipping that backend")
+
+        timings, outputs = run(backends, paths)
+        reference = outputs["bs4"]
+        failures = 0
+        for backend in backends:
+            for path, (cards, page), (ref_cards, ref_page) in zip(paths, outputs[backend], reference):
+                diff = first_difference(ref_cards, cards) or first_difference(ref_page.songs, page.songs)
+                if diff is None and (page.method, page.warning) != (ref_page.method, ref_page.warning):
+                    diff = f"method {page.method!r}/{page.warning!r}, expected {ref_page.method!r}/{ref_page.warning!r}"
+                if diff:
+                    failures += 1
+                    logger.info(f"MISMATCH {backend} {os.path.basename(path)}: {diff}")
+                    break
+
+        records = sum(len(cards) + len(page.songs) for cards, page in reference)
+        logger.info(f"{records} records per backend")
+        for backend in backends:
+            logger.info(
+                f"{backend:<8} {timings[backend]:8.2f}s  {megabytes / timings[backend]:7.1f} MB/s  "
+                f"{timings['bs4'] / timings[backend]:5.1f}x"
+            )
+
+        fastest = min(backends, key=timings.get)
+        start = time.perf_counter()
+        for _ in extract_many(songs_from_file, paths, fastest, args.workers):
+            pass
+        for _ in extract_many(cards_from_file, paths, fastest, args.workers):
+            pass
+        pooled = time.perf_counter() - start
+        logger.info(f"{fastest} x{args.workers} processes {pooled:6.2f}s  {timings['bs4'] / pooled:5.1f}x")
+
+        logger.info(f"split_sections: auto resolves to {resolve_backend('auto')}")
+        failures += len(check_split(backends, paths))
+
+    logger.info("All backends match bs4" if not failures else f"{failures} backend(s) differ from bs4")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Regression check for llm_scheduler and batch-image.py against a fake
+OpenAI-compatible server
+
+A local HTTP server answers /v1/chat/completions after a random delay, so
+responses come back out of order. It identifies each request by its text
+or, for image requests, by the colour of the decoded preview, and can
+answer 429 a set number of times before succeeding. Checks:
+
+* pipeline: batch-image.py run end to end (--base-url) writes its CSV rows
+  in discovery order with each image's own answer, retries the images the
+  server rate-limits, keeps no more than --concurrency requests in flight,
+  and a second run is served entirely from the response cache
+* rpm: run_ordered under a RateLimiter spaces requests past the burst
+  at the requests-per-minute rate and still yields in input order
+* tpm: the token bucket throttles by estimated tokens, and ``settle``
+  gives back what the server reports as unused
+
+Usage:
+    python check-llm-scheduler.py
+    python check-llm-scheduler.py --images 24 --script openai-batch-image-seo-pipeline.py
+"""
+
+import argparse
+import asyncio
+import base64
+import csv
+import io
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import AsyncOpenAI
+from PIL import Image
+
+from llm_scheduler import RateLimiter, run_ordered
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAX_DELAY = 0.15  # Seconds the fake server waits before answering
+RATE_LIMITED_TRIES = 3  # 429s before the rate-limited images succeed
+COLOUR_STEP = 32  # Test colours sit on this grid; the server snaps JPEG drift back onto it
+BUCKET_REQUESTS = 60  # Bucket capacity in requests; each one past it waits 60 / capacity seconds
+BURST_EXTRA = 3  # Requests past the bucket capacity in the rpm/tpm checks
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    """Chat completions with random latency, optional 429s and a request log"""
+
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 refuses bursts of connects
+
+    def __init__(self, seed=7):
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.attempts = []  # (arrival time, key, status)
+        self.rate_limited = {}  # key -> 429s still to send
+        self.usage_tokens = 100
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def reset(self):
+        with self.lock:
+            self.attempts = []
+            self.max_in_flight = 0
+
+
+def colour_key(colour):
+    return "rgb " + " ".join(map(str, colour))
+
+
+def request_key(body):
+    """Text of the last user message, or the colour of its image"""
+    content = body["messages"][-1]["content"]
+    if isinstance(content, str):
+        return content
+    for part in content:
+        if part.get("type") == "image_url":
+            data = base64.b64decode(part["image_url"]["url"].split(",", 1)[1])
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+            return colour_key(round(v / COLOUR_STEP) * COLOUR_STEP for v in image.getpixel((image.width // 2, image.height // 2)))
+    return ""
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so the client reuses connections
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, payload, headers=()):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        key = request_key(body)
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            limited = server.rate_limited.get(key, 0) > 0
+            if limited:
+                server.rate_limited[key] -= 1
+            server.attempts.append((time.monotonic(), key, 429 if limited else 200))
+            delay = server.rng.uniform(0, MAX_DELAY)
+        try:
+            if limited:
+                self.reply(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                    [("retry-after-ms", "10")],
+                )
+                return
+            time.sleep(delay)
+            self.reply(
+                200,
+                {
+                    "id": f"chatcmpl-{len(server.attempts)}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": json.dumps({"main_subject": key})},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": server.usage_tokens, "total_tokens": server.usage_tokens},
+                },
+            )
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def expect(self, condition, message):
+        if condition:
+            logger.info(f"ok    {message}")
+        else:
+            self.failures += 1
+            logger.info(f"FAIL  {message}")
+
+
+def make_images(folder, count):
+    """Solid-colour PNGs in a few subfolders; returns {filename: (r, g, b)}"""
+    rng = random.Random(count)
+    colours = {}
+    for i in range(count):
+        sub = os.path.join(folder, f"set_{i % 3}")
+        os.makedirs(sub, exist_ok=True)
+        colour = tuple(rng.randrange(0, 256, COLOUR_STEP) for _ in range(3))
+        while colour in colours.values():
+            colour = tuple(rng.randrange(0, 256, COLOUR_STEP) for _ in range(3))
+        name = f"image_{i:02d}.png"
+        Image.new("RGB", (64, 48), colour).save(os.path.join(sub, name))
+        colours[name] = colour
+    return colours
+
+
+def discovery_order(folder):
+    """Filenames in the order batch-image.py's os.walk finds them"""
+    return [name for _, _, files in os.walk(folder) for name in files if name.endswith(".png")]
+
+
+def run_pipeline(script, folder, work, server, concurrency):
+    output = os.path.join(work, "out.csv")
+    env = dict(os.environ, HOME=work)
+    env.pop("OPENAI_BASE_URL", None)
+    cmd = [
+        sys.executable, os.path.join(HERE, script), folder,
+        "-o", output,
+        "--base-url", server.url,
+        "--concurrency", str(concurrency),
+        "--metadata-db", os.path.join(work, "metadata.db"),
+        "--cache-db", os.path.join(work, "responses.db"),
+        "--hash-cache", os.path.join(work, "hashes.db"),
+    ]
+    proc = subprocess.run(cmd, cwd=work, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        logger.info(proc.stderr[-2000:])
+        return None
+    with open(output, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def check_pipeline(check, server, script, count, concurrency):
+    with tempfile.TemporaryDirectory() as work:
+        with open(os.path.join(work, ".env"), "w", encoding="utf-8") as f:
+            f.write("OPENAI_API_KEY=sk-test\n")
+        folder = os.path.join(work, "images")
+        colours = make_images(folder, count)
+        expected = discovery_order(folder)
+        limited = expected[1::4]
+        for name in limited:
+            server.rate_limited[colour_key(colours[name])] = RATE_LIMITED_TRIES
+        server.reset()
+
+        rows = run_pipeline(script, folder, work, server, concurrency)
+        check.expect(rows is not None, f"pipeline: {script} exits cleanly")
+        if rows is None:
+            return
+        check.expect([r["filename"] for r in rows] == expected, "pipeline: rows in discovery order")
+        check.expect(
+            all(r["main_subject"] == colour_key(colours[r["filename"]]) for r in rows),
+            "pipeline: every row has its own image's answer",
+        )
+        tries = {}
+        for _, key, _ in server.attempts:
+            tries[key] = tries.get(key, 0) + 1
+        retried = [name for name in limited if tries.get(colour_key(colours[name]), 0) > RATE_LIMITED_TRIES]
+        check.expect(retried == limited, f"pipeline: {len(limited)} rate-limited images retried until answered")
+        check.expect(1 < server.max_in_flight <= concurrency, f"pipeline: {server.max_in_flight} requests in flight (limit {concurrency})")
+
+        server.reset()
+        again = run_pipeline(script, folder, work, server, concurrency)
+        check.expect(again == rows and not server.attempts, "pipeline: rerun served from the response cache")
+        with sqlite3.connect(os.path.join(work, "hashes.db")) as conn:
+            hashed = conn.execute("SELECT COUNT(*) FROM digests WHERE kind='sha256'").fetchone()[0]
+        check.expect(hashed == count, f"pipeline: {hashed} image hashes kept in the hash cache")
+
+
+async def scheduled_requests(server, limiter, count, estimated_tokens, concurrency=32):
+    """``count`` requests through run_ordered; returns (elapsed, items in yield order, answers ok)"""
+    async def work(i):
+        await limiter.acquire(estimated_tokens)
+        response = await client.chat.completions.create(
+            model="fake", messages=[{"role": "user", "content": f"item {i}"}], max_tokens=estimated_tokens
+        )
+        limiter.settle(estimated_tokens, response.usage.total_tokens)
+        return json.loads(response.choices[0].message.content)["main_subject"]
+
+    start = time.monotonic()
+    order, ok = [], True
+    async with AsyncOpenAI(api_key="sk-test", base_url=server.url, max_retries=0) as client:
+        async for done in run_ordered(range(count), work, concurrency):
+            order.append(done.item)
+            ok = ok and done.error is None and done.result == f"item {done.item}"
+    return time.monotonic() - start, order, ok
+
+
+def expected_wait(per_second):
+    """Seconds the BURST_EXTRA requests past a full bucket must take"""
+    return BURST_EXTRA / per_second
+
+
+def check_rpm(check, server):
+    server.reset()
+    rpm = BUCKET_REQUESTS * 1.0
+    count = BUCKET_REQUESTS + BURST_EXTRA
+    elapsed, order, ok = asyncio.run(scheduled_requests(server, RateLimiter(rpm), count, 0))
+    check.expect(order == list(range(count)) and ok, f"rpm: {count} results in input order")
+    arrivals = sorted(t for t, _, _ in server.attempts)
+    # The bucket starts full, so the last request can't go out before the extras have refilled
+    spread = arrivals[-1] - arrivals[0]
+    minimum = expected_wait(rpm / 60) * 0.9
+    check.expect(spread >= minimum, f"rpm: {count} requests spread over {spread:.2f}s (>= {minimum:.2f}s)")
+
+
+def check_tpm(check, server):
+    estimate = 1000
+    tpm = BUCKET_REQUESTS * estimate
+    count = BUCKET_REQUESTS + BURST_EXTRA
+
+    server.reset()
+    server.usage_tokens = estimate
+    elapsed, order, ok = asyncio.run(scheduled_requests(server, RateLimiter(10**6, tpm), count, estimate))
+    minimum = expected_wait(tpm / 60 / estimate) * 0.9
+    check.expect(ok and elapsed >= minimum, f"tpm: full usage throttled to {elapsed:.2f}s (>= {minimum:.2f}s)")
+
+    server.reset()
+    server.usage_tokens = estimate // 10
+    elapsed, order, ok = asyncio.run(scheduled_requests(server, RateLimiter(10**6, tpm), count, estimate))
+    check.expect(ok and elapsed < minimum, f"tpm: settled unused tokens, {elapsed:.2f}s (< {minimum:.2f}s)")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Check llm_scheduler and batch-image.py against a fake API")
+    parser.add_argument("--images", type=int, default=12, help="Images in the pipeline check")
+    parser.add_argument("--concurrency", type=int, default=4, help="--concurrency passed to the script")
+    parser.add_argument("--script", default="batch-image.py", help="Pipeline script to run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # The HTTP client logs every request at INFO
+    for name in ("httpx", "httpx2", "openai"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    server = FakeOpenAI()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    check = Checker()
+    try:
+        check_pipeline(check, server, args.script, args.images, args.concurrency)
+        check_rpm(check, server)
+        check_tpm(check, server)
+    finally:
+        server.shutdown()
+
+    logger.info("All scheduler checks passed" if not check.failures else f"{check.failures} check(s) failed")
+    if check.failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Regression check for transcode_engine using the fake-ffmpeg.py stub
+
+Runs the scheduler against throwaway input files whose first line tells
+the stub what to do, and checks:
+
+* parallel: N slow jobs on N/2 workers finish in about two rounds, every
+  output equals its input, progress is reported and no .tmp_ file is left
+* failure: the stub's stderr ends up in the result and no output is written
+* timeout: a job slower than ``timeout`` is killed and reported as such
+* skip: a second run skips up-to-date outputs, ``force`` redoes them and
+  a touched input is transcoded again
+* binary selection: ``FFMPEG_BIN`` is honoured and a missing binary fails
+  the job instead of raising
+
+Usage:
+    python check-transcode-engine.py
+    python check-transcode-engine.py --ffmpeg ./my-ffmpeg-stub --jobs 16
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from transcode_engine import TMP_PREFIX, TranscodeJob, run_transcodes
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+STUB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake-ffmpeg.py")
+JOB_SECONDS = 0.4
+TIMEOUT_SECONDS = 0.5
+
+
+def make_input(folder, name, directive=""):
+    path = os.path.join(folder, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{directive}\n{name} payload\n")
+    return path
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def output_for(folder, src):
+    return os.path.join(folder, "out", os.path.basename(src) + ".mp3")
+
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+
+    def expect(self, condition, message):
+        if condition:
+            logger.info(f"ok    {message}")
+        else:
+            self.failures += 1
+            logger.info(f"FAIL  {message}")
+
+
+def check_parallel(check, folder, ffmpeg, count):
+    workers = max(1, count // 2)
+    sources = [make_input(folder, f"song_{i:02d}.aiff", f"sleep {JOB_SECONDS}") for i in range(count)]
+    jobs = [TranscodeJob(src, output_for(folder, src), ["-acodec", "libmp3lame"]) for src in sources]
+    progress = []
+
+    start = time.perf_counter()
+    results = run_transcodes(jobs, workers=workers, ffmpeg=ffmpeg, on_progress=lambda job, sec: progress.append(job.src))
+    wall = time.perf_counter() - start
+
+    check.expect([r.status for r in results] == ["done"] * count, f"parallel: {count} jobs done")
+    check.expect([r.job for r in results] == jobs, "parallel: results in job order")
+    rounds = -(-count // workers)
+    check.expect(wall < JOB_SECONDS * (rounds + 1.5), f"parallel: {wall:.2f}s for {rounds} rounds of {JOB_SECONDS}s")
+    check.expect(all(read_bytes(j.src) == read_bytes(j.dst) for j in jobs), "parallel: outputs equal inputs")
+    check.expect(all(r.out_seconds > 0 for r in results), "parallel: out_time_us parsed")
+    check.expect(set(progress) == set(sources), "parallel: progress reported for every job")
+    leftovers = [n for n in os.listdir(os.path.join(folder, "out")) if n.startswith(TMP_PREFIX)]
+    check.expect(not leftovers, "parallel: no temp outputs left")
+    return jobs
+
+
+def check_failure(check, folder, ffmpeg):
+    src = make_input(folder, "broken.aiff", "fail")
+    (result,) = run_transcodes([TranscodeJob(src, output_for(folder, src))], ffmpeg=ffmpeg)
+    check.expect(result.status == "failed", "failure: status failed")
+    check.expect("Invalid data" in (result.error or ""), "failure: stderr kept in the error")
+    check.expect(not os.path.exists(result.job.dst), "failure: no output written")
+    check.expect(not os.path.exists(os.path.join(folder, "out", TMP_PREFIX + "broken.aiff.mp3")), "failure: temp removed")
+
+
+def check_timeout(check, folder, ffmpeg):
+    src = make_input(folder, "endless.aiff", "sleep 30")
+    start = time.perf_counter()
+    (result,) = run_transcodes([TranscodeJob(src, output_for(folder, src))], ffmpeg=ffmpeg, timeout=TIMEOUT_SECONDS)
+    wall = time.perf_counter() - start
+    check.expect(result.status == "timeout", "timeout: status timeout")
+    check.expect(wall < TIMEOUT_SECONDS + 5, f"timeout: killed after {wall:.2f}s")
+    check.expect(not os.path.exists(result.job.dst), "timeout: no output written")
+
+
+def check_skip(check, jobs, ffmpeg):
+    results = run_transcodes(jobs, ffmpeg=ffmpeg)
+    check.expect(all(r.status == "skipped" for r in results), "skip: up-to-date outputs skipped")
+
+    results = run_transcodes(jobs[:2], ffmpeg=ffmpeg, force=True)
+    check.expect(all(r.status == "done" for r in results), "skip: force transcodes again")
+
+    later = os.stat(jobs[0].dst).st_mtime + 10
+    os.utime(jobs[0].src, (later, later))
+    results = run_transcodes(jobs, ffmpeg=ffmpeg)
+    statuses = [r.status for r in results]
+    check.expect(statuses == ["done"] + ["skipped"] * (len(jobs) - 1), "skip: only the touched input is redone")
+
+
+def check_binary(check, folder, ffmpeg):
+    src = make_input(folder, "env.aiff")
+    job = TranscodeJob(src, output_for(folder, src))
+    previous = os.environ.get("FFMPEG_BIN")
+    os.environ["FFMPEG_BIN"] = ffmpeg
+    try:
+        (result,) = run_transcodes([job])
+    finally:
+        if previous is None:
+            del os.environ["FFMPEG_BIN"]
+        else:
+            os.environ["FFMPEG_BIN"] = previous
+    check.expect(result.status == "done", "binary: FFMPEG_BIN used")
+
+    (result,) = run_transcodes([job], ffmpeg=os.path.join(folder, "no-such-ffmpeg"), force=True)
+    check.expect(result.status == "failed" and result.error, "binary: missing ffmpeg is a failed job")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Check transcode_engine against an ffmpeg stub")
+    parser.add_argument("--ffmpeg", default=STUB, help="Stub to run instead of ffmpeg (default: fake-ffmpeg.py)")
+    parser.add_argument("--jobs", type=int, default=8, help="Jobs in the parallel check")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    ffmpeg = os.path.abspath(args.ffmpeg)
+    if not os.access(ffmpeg, os.X_OK):
+        raise SystemExit(f"{ffmpeg} is not executable")
+
+    check = Checker()
+    with tempfile.TemporaryDirectory() as folder:
+        jobs = check_parallel(check, folder, ffmpeg, args.jobs)
+        check_failure(check, folder, ffmpeg)
+        check_timeout(check, folder, ffmpeg)
+        check_skip(check, jobs, ffmpeg)
+        check_binary(check, folder, ffmpeg)
+
+    logger.info("All transcode checks passed" if not check.failures else f"{check.failures} check(s) failed")
+    if check.failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
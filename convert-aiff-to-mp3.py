@@ -1,40 +1,41 @@
 #!/usr/bin/env python3
 """
 Convert AIFF files to MP3 format
+
+Files are transcoded by several ffmpeg processes at once (transcode_engine);
+MP3s that are already newer than their AIFF are skipped.
 """
 
-import os
-import subprocess
+import argparse
+import logging
+import time
 from pathlib import Path
 
+from transcode_engine import TranscodeJob, default_workers, run_transcodes, transcode, write_summary
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+MP3_ARGS = ["-acodec", "libmp3lame", "-ab", "128k"]
+DEFAULT_SOURCE = "as_a_man_thinketh_audio_system"
+DEFAULT_DEST = "as_a_man_thinketh_audio_mp3"
+
 
 def convert_aiff_to_mp3(input_file: str, output_file: str) -> bool:
     """Convert AIFF file to MP3 using ffmpeg"""
-    try:
-        cmd = [
-            "ffmpeg",
-            "-i",
-            input_file,
-            "-acodec",
-            "libmp3lame",
-            "-ab",
-            "128k",
-            output_file,
-            "-y",
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.returncode == 0
-
-    except Exception as e:
-        logger.info(f"Conversion error: {e}")
-        return False
-
-
-def convert_all_aiff_files():
+    result = transcode(TranscodeJob(input_file, output_file, MP3_ARGS))
+    if not result.ok:
+        logger.info(f"Conversion error: {result.error}")
+    return result.ok
+
+
+def convert_all_aiff_files(
+    audio_dir=DEFAULT_SOURCE, mp3_dir=DEFAULT_DEST, jobs=None, timeout=None, ffmpeg=None, force=False, summary=None
+):
     """Convert all AIFF files in the audio directory to MP3"""
-    audio_dir = Path("as_a_man_thinketh_audio_system")
-    mp3_dir = Path("as_a_man_thinketh_audio_mp3")
+    audio_dir = Path(audio_dir)
+    mp3_dir = Path(mp3_dir)
     mp3_dir.mkdir(exist_ok=True)
 
     logger.info("Converting AIFF files to MP3...")
@@ -43,27 +44,44 @@ def convert_all_aiff_files():
     aiff_files = list(audio_dir.rglob("*.aiff"))
     logger.info(f"Found {len(aiff_files)} AIFF files")
 
-    converted_count = 0
-
-    for aiff_file in aiff_files:
-        # Create corresponding MP3 path
-        relative_path = aiff_file.relative_to(audio_dir)
-        mp3_file = mp3_dir / relative_path.with_suffix(".mp3")
+    # Corresponding MP3 paths mirror the source tree
+    transcode_jobs = [
+        TranscodeJob(str(aiff_file), str(mp3_dir / aiff_file.relative_to(audio_dir).with_suffix(".mp3")), MP3_ARGS)
+        for aiff_file in aiff_files
+    ]
+
+    start = time.perf_counter()
+    results = run_transcodes(transcode_jobs, workers=jobs, timeout=timeout, ffmpeg=ffmpeg, force=force)
+    wall = time.perf_counter() - start
+
+    converted_count = sum(r.status == "done" for r in results)
+    skipped_count = sum(r.status == "skipped" for r in results)
+    logger.info(
+        f"\n✅ Converted {converted_count}/{len(aiff_files)} files to MP3 "
+        f"({skipped_count} already up to date) in {wall:.1f}s"
+    )
+    logger.info(f"MP3 files saved to: {mp3_dir}")
 
-        # Create directory if needed
-        mp3_file.parent.mkdir(parents=True, exist_ok=True)
+    if summary:
+        write_summary(summary, results, wall)
+        logger.info(f"Summary written to: {summary}")
+    return results
 
-        logger.info(f"Converting {aiff_file.name}...", end=" ")
 
-        if convert_aiff_to_mp3(str(aiff_file), str(mp3_file)):
-            logger.info("✓")
-            converted_count += 1
-        else:
-            logger.info("✗")
+def main():
+    parser = argparse.ArgumentParser(description="Convert AIFF files to MP3 with parallel ffmpeg")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE, help="Folder searched for .aiff files")
+    parser.add_argument("dest", nargs="?", default=DEFAULT_DEST, help="Folder for the MP3 tree")
+    parser.add_argument("--jobs", type=int, default=default_workers(), help="Concurrent ffmpeg processes")
+    parser.add_argument("--timeout", type=float, help="Seconds before a single conversion is killed")
+    parser.add_argument("--ffmpeg", help="ffmpeg executable (default: $FFMPEG_BIN or ffmpeg)")
+    parser.add_argument("--force", action="store_true", help="Convert even when the MP3 is newer than the AIFF")
+    parser.add_argument("--summary", help="Write a JSON summary of every job to this file")
+    args = parser.parse_args()
 
-    logger.info(f"\n✅ Converted {converted_count}/{len(aiff_files)} files to MP3")
-    logger.info(f"MP3 files saved to: {mp3_dir}")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    convert_all_aiff_files(args.source, args.dest, args.jobs, args.timeout, args.ffmpeg, args.force, args.summary)
 
 
 if __name__ == "__main__":
-    convert_all_aiff_files()
+    main()
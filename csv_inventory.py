@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Streaming readers for the file-inventory CSVs the duplicate finders consume.
+
+The inventories run to millions of rows, so they are read in chunks of
+CSV_CHUNK_ROWS and filtered with one vectorized ``str.contains`` per chunk.
+The exclusion regex comes from fast_walk's ``ExclusionMatcher``, so
+inventory rows are excluded by exactly the same rules as walked paths.
+
+Usage:
+    for chunk in iter_included_chunks(csv_files, "File Path", excluded_patterns, usecols=["File Path"]):
+        for path in chunk["File Path"]:
+            ...
+"""
+
+import pandas as pd
+
+from fast_walk import ExclusionMatcher
+
+# Constants
+CSV_CHUNK_ROWS = 100000
+
+
+def exclusion_regex(patterns):
+    """
+    Combine the exclusion patterns into a single regex.
+
+    Parameters:
+    patterns (list): A list of regex patterns for exclusion.
+
+    Returns:
+    str: One pattern that matches wherever any of the inputs would.
+    """
+    return ExclusionMatcher(patterns).pattern
+
+
+def iter_included_chunks(csv_files, path_column, excluded_patterns, usecols=None):
+    """
+    Stream the inventory CSVs in chunks, dropping excluded paths.
+
+    Parameters:
+    csv_files (list): List of CSV file paths to read.
+    path_column (str): Column holding the file path.
+    excluded_patterns (list): List of regex patterns for exclusion.
+    usecols (list): Columns to load (default: all).
+
+    Yields:
+    DataFrame: Rows of one chunk whose path is not excluded.
+    """
+    regex = exclusion_regex(excluded_patterns)
+    for csv_file in csv_files:
+        for chunk in pd.read_csv(csv_file, chunksize=CSV_CHUNK_ROWS, usecols=usecols):
+            paths = chunk[path_column]
+            excluded = paths.isna() | paths.astype(str).str.contains(regex, regex=True)
+            yield chunk[~excluded]
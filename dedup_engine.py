@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Staged duplicate detection shared by the dedup scripts.
+
+Files are only read when they have to be:
+
+1. Group every candidate by ``st_size`` - a file with a unique size cannot
+   have a duplicate and is never opened.
+2. For sizes that collide, hash the first and last 64 KiB.
+3. Only files whose partial hash still collides get a full content hash.
+
+Pass a ``hash_cache.HashCache`` to reuse digests of unchanged files across
+runs.
+
+With ``workers`` > 1 (or ``"auto"``) hashing runs in a bounded thread pool
+while the caller is still walking: as soon as a second file of some size is
+added, both start hashing. hashlib releases the GIL, so threads keep fast
+disks busy and overlap network-share latency. ``"auto"`` sizes one pool per
+device (few workers on spinning disks, more on SSD and network mounts).
+Results are identical, in the same order, whatever the worker count.
+
+Usage:
+    finder = StagedDuplicateFinder(algorithm="md5", workers="auto")
+    for path in paths:
+        finder.add(path)
+    duplicates = finder.find_duplicates()   # {digest: [path, ...]}
+"""
+
+import hashlib
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+PARTIAL_BYTES = 64 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+IN_FLIGHT_PER_WORKER = 4
+
+NETWORK_FILESYSTEMS = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smbfs",
+    "smb3",
+    "afpfs",
+    "webdav",
+    "9p",
+    "fuse.sshfs",
+}
+WORKERS_BY_DEVICE = {
+    "rotational": 2,
+    "ssd": max(4, (os.cpu_count() or 4) * 2),
+    "network": 16,
+    "unknown": 4,
+}
+
+PathLike = Union[str, os.PathLike]
+
+
+def hash_file(
+    path: PathLike, algorithm: str = "sha256", chunk_size: int = READ_CHUNK_BYTES
+) -> Optional[str]:
+    """Full content digest of ``path``; ``None`` if the file can't be read."""
+    hasher = hashlib.new(algorithm)
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(chunk)
+    except OSError as e:
+        logger.info(f"Error computing hash for {path}: {e}")
+        return None
+    return hasher.hexdigest()
+
+
+def partial_hash(
+    path: PathLike,
+    size: int,
+    algorithm: str = "sha256",
+    partial_bytes: int = PARTIAL_BYTES,
+) -> Optional[str]:
+    """Digest of the first and last ``partial_bytes`` of a file of ``size`` bytes."""
+    hasher = hashlib.new(algorithm)
+    try:
+        with open(path, "rb") as f:
+            hasher.update(f.read(partial_bytes))
+            if size > partial_bytes:
+                f.seek(max(size - partial_bytes, partial_bytes))
+                hasher.update(f.read(partial_bytes))
+    except OSError as e:
+        logger.info(f"Error reading {path}: {e}")
+        return None
+    return hasher.hexdigest()
+
+
+def _mount_fstype(path: PathLike) -> Optional[str]:
+    """Filesystem type of the mount holding ``path`` (Linux only)"""
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+
+    real = os.path.realpath(path)
+    best, fstype = "", None
+    for mountpoint, fs in mounts:
+        mountpoint = mountpoint.replace("\\040", " ")
+        inside = real == mountpoint or real.startswith(mountpoint.rstrip("/") + "/")
+        if inside and len(mountpoint) > len(best):
+            best, fstype = mountpoint, fs
+    return fstype
+
+
+def device_kind(path: PathLike) -> str:
+    """Classify the device holding ``path`` as network, rotational, ssd or unknown"""
+    if _mount_fstype(path) in NETWORK_FILESYSTEMS:
+        return "network"
+
+    try:
+        st_dev = os.stat(path).st_dev
+        block = os.path.realpath(
+            f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"
+        )
+    except (OSError, AttributeError):
+        return "unknown"
+
+    # Partitions keep the queue/ directory on their parent disk
+    for candidate in (block, os.path.dirname(block)):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational")) as f:
+                return "rotational" if f.read().strip() == "1" else "ssd"
+        except OSError:
+            continue
+    return "unknown"
+
+
+def auto_workers(path: PathLike) -> int:
+    """Hashing threads worth running against the device holding ``path``"""
+    return WORKERS_BY_DEVICE[device_kind(path)]
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs the job immediately (``workers=1``)"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+class StagedDuplicateFinder:
+    """Size -> partial hash -> full hash duplicate detection"""
+
+    def __init__(
+        self,
+        algorithm: str = "sha256",
+        partial_bytes: int = PARTIAL_BYTES,
+        cache=None,
+        workers: Union[int, str] = 1,
+    ):
+        self.algorithm = algorithm
+        self.partial_bytes = partial_bytes
+        self.cache = cache
+        self.workers = workers
+
+        self.by_size: Dict[int, List[PathLike]] = defaultdict(list)
+        self.digests: Dict[PathLike, str] = {}
+
+        # First file of each size, held back until a second one shows up
+        self._first_of_size: Dict[int, Tuple[PathLike, Optional[int]]] = {}
+        # Stage-2 digest per candidate: partial for large files, full for small
+        self._first_pass: Dict[PathLike, Future] = {}
+        self._devices: Dict[PathLike, Optional[int]] = {}
+        self._in_flight: deque = deque()
+        self._pools: Dict[Optional[int], object] = {}
+        self._max_in_flight = IN_FLIGHT_PER_WORKER
+        self._started: Optional[float] = None
+
+        self.stats = {
+            "files_seen": 0,
+            "size_candidates": 0,
+            "partial_hashed": 0,
+            "full_hashed": 0,
+            "bytes_read": 0,
+            "errors": 0,
+            "hash_seconds": 0.0,
+        }
+
+    def add(
+        self, path: PathLike, size: Optional[int] = None, dev: Optional[int] = None
+    ) -> bool:
+        """Register a file; pass ``size``/``dev`` if the caller already has a stat."""
+        if size is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.stats["errors"] += 1
+                return False
+            size, dev = st.st_size, st.st_dev
+
+        paths = self.by_size[size]
+        paths.append(path)
+        self.stats["files_seen"] += 1
+
+        # Start hashing as soon as a size collides
+        if len(paths) == 1:
+            self._first_of_size[size] = (path, dev)
+        else:
+            if len(paths) == 2:
+                self._first_pass_submit(*self._first_of_size.pop(size), size)
+            self._first_pass_submit(path, dev, size)
+        return True
+
+    def add_many(self, paths: Iterable[Union[PathLike, Tuple[PathLike, int]]]) -> None:
+        """Register paths, or ``(path, size)`` pairs"""
+        for item in paths:
+            if isinstance(item, tuple):
+                self.add(*item)
+            else:
+                self.add(item)
+
+    def _is_small(self, size: int) -> bool:
+        # Small files are read in full by the partial hash anyway, so they go
+        # straight to the full hash instead of being read twice.
+        return size <= 2 * self.partial_bytes
+
+    def _pool(self, dev: Optional[int], path: PathLike):
+        key = dev if self.workers == "auto" else None
+        if key not in self._pools:
+            if self.workers == "auto":
+                kind = device_kind(path)
+                count = WORKERS_BY_DEVICE[kind]
+                logger.info(f"Hashing {kind} device ({path}) with {count} workers")
+            else:
+                count = int(self.workers)
+
+            if count > 1:
+                self._pools[key] = ThreadPoolExecutor(
+                    max_workers=count, thread_name_prefix="dedup-hash"
+                )
+            else:
+                self._pools[key] = _InlineExecutor()
+            self._max_in_flight += count * IN_FLIGHT_PER_WORKER
+        return self._pools[key]
+
+    def _submit(
+        self,
+        path: PathLike,
+        kind: str,
+        compute: Callable[[], Optional[str]],
+        nbytes: int,
+    ) -> Future:
+        """Queue one digest; cache lookups and stores stay on the calling thread"""
+        if self._started is None:
+            self._started = time.monotonic()
+
+        st = None
+        if self.cache is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            digest = self.cache.lookup(st, kind) if st is not None else None
+            if digest is not None:
+                return _InlineExecutor().submit(lambda: digest)
+
+        future = self._pool(self._devices.get(path), path).submit(compute)
+        self._in_flight.append((future, path, kind, st, nbytes))
+        while len(self._in_flight) > self._max_in_flight:
+            self._collect(self._in_flight.popleft())
+        return future
+
+    def _collect(self, entry) -> None:
+        # Only digests that reached a pool get here; cache hits are not counted
+        future, path, kind, st, nbytes = entry
+        self.stats["full_hashed" if kind == self.algorithm else "partial_hashed"] += 1
+        digest = future.result()
+        if digest is None:
+            return
+        self.stats["bytes_read"] += nbytes
+        if self.cache is not None and st is not None:
+            self.cache.store(path, st, kind, digest)
+
+    def _drain(self) -> None:
+        while self._in_flight:
+            self._collect(self._in_flight.popleft())
+
+    def _first_pass_submit(self, path: PathLike, dev: Optional[int], size: int) -> None:
+        self._devices[path] = dev
+        if self._is_small(size):
+            self._first_pass[path] = self._submit(
+                path, self.algorithm, partial(hash_file, path, self.algorithm), size
+            )
+        else:
+            self._first_pass[path] = self._submit(
+                path,
+                f"{self.algorithm}:partial{self.partial_bytes}",
+                partial(partial_hash, path, size, self.algorithm, self.partial_bytes),
+                2 * self.partial_bytes,
+            )
+
+    def find_duplicates(self) -> Dict[str, List[PathLike]]:
+        """Return ``{digest: [paths]}`` for every group of identical files.
+
+        Groups and the paths within them keep the order files were added.
+        """
+        full: Dict[PathLike, Future] = {}
+
+        # Stage 3: full hashes for large files whose partial hash collides
+        for size, paths in self.by_size.items():
+            if len(paths) < 2:
+                continue
+            self.stats["size_candidates"] += len(paths)
+
+            if self._is_small(size):
+                full.update((path, self._first_pass[path]) for path in paths)
+                continue
+
+            partial_groups: Dict[str, List[PathLike]] = defaultdict(list)
+            for path in paths:
+                digest = self._first_pass[path].result()
+                if digest is None:
+                    self.stats["errors"] += 1
+                    continue
+                partial_groups[digest].append(path)
+
+            for group in partial_groups.values():
+                if len(group) < 2:
+                    continue
+                for path in group:
+                    full[path] = self._submit(
+                        path, self.algorithm, partial(hash_file, path, self.algorithm), size
+                    )
+
+        self._drain()
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        self._pools.clear()
+        if self._started is not None:
+            self.stats["hash_seconds"] = time.monotonic() - self._started
+
+        # Assemble groups in insertion order, independent of completion order
+        duplicates: Dict[str, List[PathLike]] = {}
+        for size, paths in self.by_size.items():
+            if len(paths) < 2:
+                continue
+            full_groups: Dict[str, List[PathLike]] = defaultdict(list)
+            for path in paths:
+                if path not in full:
+                    continue
+                digest = full[path].result()
+                if digest is None:
+                    self.stats["errors"] += 1
+                    continue
+                self.digests[path] = digest
+                full_groups[digest].append(path)
+
+            for digest, members in full_groups.items():
+                if len(members) > 1:
+                    duplicates.setdefault(digest, []).extend(members)
+
+        return duplicates
+
+    def throughput(self) -> float:
+        """Bytes hashed per second of wall time spent hashing"""
+        seconds = self.stats["hash_seconds"]
+        return self.stats["bytes_read"] / seconds if seconds else 0.0
+
+
+def find_duplicates(
+    paths: Iterable[Union[PathLike, Tuple[PathLike, int]]],
+    algorithm: str = "sha256",
+    cache=None,
+    workers: Union[int, str] = 1,
+) -> Dict[str, List[PathLike]]:
+    """One-shot helper around ``StagedDuplicateFinder``"""
+    finder = StagedDuplicateFinder(algorithm=algorithm, cache=cache, workers=workers)
+    finder.add_many(paths)
+    return finder.find_duplicates()
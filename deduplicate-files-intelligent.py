@@ -7,7 +7,6 @@ logger = logging.getLogger(__name__)
 CONSTANT_256 = 256
 CONSTANT_1000 = 1000
 CONSTANT_1024 = 1024
-CONSTANT_65536 = 65536
 
 #!/usr/bin/env python3
 """
@@ -25,16 +24,20 @@ Features:
 """
 
 import os
+import re
 import sys
 import ast
 import json
-import hashlib
 import shutil
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 from typing import Dict, List, Optional, Tuple, Any, Set
 
+from dedup_engine import StagedDuplicateFinder
+from fast_walk import ExclusionMatcher, FileRecord, walk_files
+from hash_cache import HashCache
+
 
 # Colors
 class Colors:
@@ -66,10 +69,20 @@ class Emojis:
 class IntelligentDeduplicator:
     """Smart duplicate detection and removal"""
 
-    def __init__(self, target_dir: str, dry_run: bool = True, interactive: bool = True):
+    def __init__(
+        self,
+        target_dir: str,
+        dry_run: bool = True,
+        interactive: bool = True,
+        semantic: bool = False,
+        use_hash_cache: bool = True,
+        hash_cache_db: Optional[str] = None,
+    ):
         self.target_dir = Path(target_dir)
         self.dry_run = dry_run
         self.interactive = interactive
+        self.semantic = semantic
+        self.hash_cache = HashCache(hash_cache_db) if use_hash_cache else None
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.backup_dir = self.target_dir / f"dedup_backup_{timestamp}"
@@ -98,19 +111,10 @@ class IntelligentDeduplicator:
         logger.info(f"{emoji} {text}")
         logger.info(f"{'='*80}{Colors.END}\n")
 
-    def calculate_hash(self, filepath: Path) -> str:
-        """Calculate SHA-CONSTANT_256 hash"""
-        try:
-            hasher = hashlib.sha256()
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(CONSTANT_65536), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except Exception as e:
-            return f"ERROR: {str(e)}"
-
-    def analyze_python_file(self, filepath: Path) -> Dict[str, Any]:
-        """Deep file analysis"""
+    def analyze_python_file(
+        self, filepath: Path, record: Optional[FileRecord] = None
+    ) -> Dict[str, Any]:
+        """Deep file analysis (pass the walk record to skip a second stat)"""
         analysis = {
             "path": str(filepath),
             "size": 0,
@@ -126,9 +130,13 @@ class IntelligentDeduplicator:
         }
 
         try:
-            stat = filepath.stat()
-            analysis["size"] = stat.st_size
-            analysis["modified"] = stat.st_mtime
+            if record is not None:
+                analysis["size"] = record.size
+                analysis["modified"] = record.mtime
+            else:
+                stat = filepath.stat()
+                analysis["size"] = stat.st_size
+                analysis["modified"] = stat.st_mtime
 
             with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
                 content = f.read()
@@ -170,9 +178,7 @@ class IntelligentDeduplicator:
 
         self.print_header("SCANNING FOR DUPLICATES", Emojis.FOLDER)
 
-        python_files = list(self.target_dir.rglob("*.py"))
-
-        # Skip certain directories
+        # Skip certain directories (substring match, pruned before descending)
         skip_patterns = [
             "dedup_backup_",
             "dedup_reports_",
@@ -181,35 +187,56 @@ class IntelligentDeduplicator:
             ".git",
             "__pycache__",
         ]
+        matcher = ExclusionMatcher([re.escape(skip) for skip in skip_patterns])
 
-        python_files = [
-            f for f in python_files if not any(skip in str(f) for skip in skip_patterns)
-        ]
+        records = {
+            Path(record.path): record
+            for record in walk_files(str(self.target_dir), matcher, suffixes={".py"})
+        }
+        python_files = list(records)
 
         self.stats["total_files"] = len(python_files)
         logger.info(
             f"{Colors.GREEN}Found {len(python_files)} Python files{Colors.END}\n"
         )
 
-        # Analyze each file
-        for idx, filepath in enumerate(python_files, 1):
+        # Exact duplicates: size, then partial hash, then full hash
+        finder = StagedDuplicateFinder(algorithm="sha256", cache=self.hash_cache)
+        for filepath, record in records.items():
+            finder.add(filepath, record.size, record.dev)
+        for file_hash, files in finder.find_duplicates().items():
+            self.hash_to_files[file_hash].extend(files)
+        if self.hash_cache:
+            self.hash_cache.close()
+            logger.info(f"{Colors.CYAN}{self.hash_cache.summary()}{Colors.END}")
+
+        logger.info(
+            f"{Colors.CYAN}Hashed {finder.stats['full_hashed']}/{len(python_files)} files "
+            f"({finder.stats['bytes_read'] / CONSTANT_1024 / CONSTANT_1024:.2f} MB read){Colors.END}"
+        )
+
+        # Deep analysis is needed for every file only when grouping semantically;
+        # otherwise just for the files that have to be ranked against each other
+        if self.semantic:
+            to_analyze = python_files
+        else:
+            duplicate_paths = {
+                str(f) for files in self.hash_to_files.values() for f in files
+            }
+            to_analyze = [f for f in python_files if str(f) in duplicate_paths]
+
+        for idx, filepath in enumerate(to_analyze, 1):
             if idx % 50 == 0:
                 logger.info(
-                    f"{Colors.YELLOW}Analyzing: {idx}/{len(python_files)}...{Colors.END}",
-                    end="\r",
+                    f"{Colors.YELLOW}Analyzing: {idx}/{len(to_analyze)}...{Colors.END}"
                 )
 
             try:
-                # Calculate hash
-                file_hash = self.calculate_hash(filepath)
-                self.hash_to_files[file_hash].append(filepath)
-
-                # Deep analysis
-                analysis = self.analyze_python_file(filepath)
+                analysis = self.analyze_python_file(filepath, records[filepath])
                 self.file_inventory[str(filepath)] = analysis
 
                 # Semantic grouping
-                if not file_hash.startswith("ERROR"):
+                if self.semantic:
                     semantic_sig = self.get_semantic_signature(analysis)
                     if semantic_sig:
                         self.semantic_groups[semantic_sig].append(filepath)
@@ -302,7 +329,7 @@ class IntelligentDeduplicator:
         exact_dupes = {
             h: files
             for h, files in self.hash_to_files.items()
-            if len(files) > 1 and not h.startswith("ERROR")
+            if len(files) > 1
         }
 
         self.stats["exact_duplicates"] = len(exact_dupes)
@@ -465,6 +492,9 @@ class IntelligentDeduplicator:
             f.write(
                 f"| Space Saved | {self.stats['space_saved'] / CONSTANT_1024 / CONSTANT_1024:.2f} MB |\n"
             )
+            if self.hash_cache:
+                f.write(f"| Hash Cache Hits | {self.hash_cache.hits:,} |\n")
+                f.write(f"| Hash Cache Misses | {self.hash_cache.misses:,} |\n")
             f.write(f"| Backup Location | `{self.backup_dir}` |\n\n")
 
             # Removal details grouped by parent folder
@@ -508,6 +538,11 @@ class IntelligentDeduplicator:
         json_data = {
             "timestamp": datetime.now().isoformat(),
             "stats": self.stats,
+            "hash_cache": (
+                {"hits": self.hash_cache.hits, "misses": self.hash_cache.misses}
+                if self.hash_cache
+                else None
+            ),
             "removed_files": [
                 {
                     "removed": str(item["remove"].relative_to(self.target_dir)),
@@ -615,6 +650,8 @@ class IntelligentDeduplicator:
         logger.info(
             f"  {Emojis.TRASH} Removed: {Colors.CYAN}{self.stats['files_removed']:,} files{Colors.END}"
         )
+        if self.hash_cache:
+            logger.info(f"  {Emojis.SPARKLES} {self.hash_cache.summary()}")
         logger.info(
             f"  💾 Space Saved: {Colors.CYAN}{self.stats['space_saved'] / CONSTANT_1024 / CONSTANT_1024:.2f} MB{Colors.END}\n"
         )
@@ -666,11 +703,32 @@ def main():
         action="store_true",
         help="Batch mode (no confirmation, auto-approve safe removals)",
     )
+    parser.add_argument(
+        "--semantic",
+        action="store_true",
+        help="Also AST-parse every file to report semantic duplicate groups "
+        "(default: only files with exact duplicates are analyzed)",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        type=str,
+        help="Hash cache database (default: ~/.cache/pythons/hash_cache.db)",
+    )
+    parser.add_argument(
+        "--no-hash-cache",
+        action="store_true",
+        help="Hash every candidate from scratch",
+    )
 
     args = parser.parse_args()
 
     deduplicator = IntelligentDeduplicator(
-        target_dir=args.target, dry_run=not args.live, interactive=not args.batch
+        target_dir=args.target,
+        dry_run=not args.live,
+        interactive=not args.batch,
+        semantic=args.semantic,
+        use_hash_cache=not args.no_hash_cache,
+        hash_cache_db=args.hash_cache,
     )
 
     deduplicator.run()
@@ -2,154 +2,189 @@
 """
 Steven's Downloads Archive - Index Generator
 Generates searchable indexes and HTML pages for the Downloads directory
+
+The directory is walked once (DirectoryScan); the stats, the streamed
+file_index.json and the category pages are all built from that scan.
 """
 
 import os
+import heapq
 import json
 import datetime
+import logging
+from array import array
 from pathlib import Path
+from typing import Dict, Iterator, List
 
+from fast_walk import scandir_files
 
-def get_file_stats(directory):
-    """Get comprehensive file statistics for the directory"""
-    stats = {
-        "total_files": 0,
-        "total_dirs": 0,
-        "total_size": 0,
-        "file_types": {},
-        "large_files": [],
-        "recent_files": [],
-        "categories": {},
-    }
-
-    for root, dirs, files in os.walk(directory):
-        # Skip hidden directories
-        dirs[:] = [d for d in dirs if not d.startswith(".")]
-
-        for file in files:
-            if file.startswith("."):
-                continue
-
-            file_path = os.path.join(root, file)
-            try:
-                file_size = os.path.getsize(file_path)
-                file_ext = os.path.splitext(file)[1].lower()
+logger = logging.getLogger(__name__)
 
-                stats["total_files"] += 1
-                stats["total_size"] += file_size
 
-                # Count file types
-                if file_ext:
-                    stats["file_types"][file_ext] = (
-                        stats["file_types"].get(file_ext, 0) + 1
-                    )
-                else:
-                    stats["file_types"]["no_extension"] = (
-                        stats["file_types"].get("no_extension", 0) + 1
-                    )
-
-                # Track large files (>10MB)
-                if file_size > 10 * CONSTANT_1024 * CONSTANT_1024:
-                    stats["large_files"].append(
-                        {
-                            "name": file,
-                            "path": file_path,
-                            "size": file_size,
-                            "size_mb": round(
-                                file_size / (CONSTANT_1024 * CONSTANT_1024), 2
-                            ),
-                        }
-                    )
-
-                # Track recent files (modified in last 30 days)
-                mod_time = os.path.getmtime(file_path)
-                if mod_time > (datetime.datetime.now().timestamp() - 30 * 24 * 60 * 60):
-                    stats["recent_files"].append(
-                        {
-                            "name": file,
-                            "path": file_path,
-                            "modified": datetime.datetime.fromtimestamp(
-                                mod_time
-                            ).strftime("%Y-%m-%d"),
-                            "size_mb": round(
-                                file_size / (CONSTANT_1024 * CONSTANT_1024), 2
-                            ),
-                        }
-                    )
-
-                # Categorize by directory
-                rel_path = os.path.relpath(file_path, directory)
-                category = rel_path.split(os.sep)[0] if os.sep in rel_path else "root"
-
-                if category not in stats["categories"]:
-                    stats["categories"][category] = {"files": 0, "size": 0}
-
-                stats["categories"][category]["files"] += 1
-                stats["categories"][category]["size"] += file_size
-
-            except (OSError, IOError):
-                continue
+# Constants
+CONSTANT_1024 = 1024
+MB = CONSTANT_1024 * CONSTANT_1024
+LARGE_FILE_BYTES = 10 * MB
+LARGE_FILES_LIMIT = 100
+RECENT_DAYS = 30
 
-    # Count directories
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if not d.startswith(".")]
-        stats["total_dirs"] += len(dirs)
 
-    # Sort large files by size
-    stats["large_files"].sort(key=lambda x: x["size"], reverse=True)
+class DirectoryScan:
+    """One scandir walk of ``directory`` (hidden files and folders skipped).
 
-    # Sort recent files by modification time
-    stats["recent_files"].sort(key=lambda x: x["modified"], reverse=True)
+    Files are kept as columns (path list plus packed size/mtime/category
+    arrays) and every aggregate is updated as the walk goes: type counts,
+    the ``large_limit`` biggest files over 10MB (bounded min-heap), files
+    modified in the last ``recent_days``, per-category totals and the
+    directory count. Each file is stat'ed once, from its ``DirEntry``.
+    """
 
-    return stats
+    def __init__(self, directory, large_limit=LARGE_FILES_LIMIT, recent_days=RECENT_DAYS):
+        self.directory = os.fspath(directory)
+        self.prefix_len = len(os.path.join(self.directory, ""))
 
+        # Columns, one row per file in walk order
+        self.paths: List[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.category_ids = array("l")
+        self.category_names: List[str] = []
 
-def generate_file_index(directory, output_file):
-    """Generate a searchable file index"""
-    file_index = []
+        # Aggregates
+        self.total_dirs = 0
+        self.total_size = 0
+        self.file_types: Dict[str, int] = {}
+        self.categories: Dict[str, Dict[str, int]] = {}
+        self.large_limit = large_limit
+        self.large_heap: List[tuple] = []  # (size, -row): smallest / latest is evicted first
+        self.recent_rows: List[int] = []
 
-    for root, dirs, files in os.walk(directory):
-        # Skip hidden directories
-        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        self.cutoff = datetime.datetime.now().timestamp() - recent_days * 24 * 60 * 60
+        self._scan()
 
-        for file in files:
-            if file.startswith("."):
-                continue
+    def __len__(self):
+        return len(self.paths)
 
-            file_path = os.path.join(root, file)
-            rel_path = os.path.relpath(file_path, directory)
+    def _count_dir(self, entry):
+        self.total_dirs += 1
 
+    def _scan(self):
+        category_index: Dict[str, int] = {}
+        for entry in scandir_files(self.directory, skip_hidden=True, on_dir=self._count_dir):
             try:
-                file_size = os.path.getsize(file_path)
-                file_ext = os.path.splitext(file)[1].lower()
-                mod_time = os.path.getmtime(file_path)
-
-                file_index.append(
-                    {
-                        "name": file,
-                        "path": rel_path,
-                        "full_path": file_path,
-                        "extension": file_ext,
-                        "size": file_size,
-                        "size_mb": round(
-                            file_size / (CONSTANT_1024 * CONSTANT_1024), 2
-                        ),
-                        "modified": datetime.datetime.fromtimestamp(mod_time).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                        "category": (
-                            rel_path.split(os.sep)[0] if os.sep in rel_path else "root"
-                        ),
-                    }
-                )
-            except (OSError, IOError):
+                st = entry.stat()
+            except OSError:
                 continue
+            row = len(self.paths)
+            size = st.st_size
+            name = entry.name
+
+            self.paths.append(entry.path)
+            self.sizes.append(size)
+            self.mtimes.append(st.st_mtime)
+            self.total_size += size
+
+            # Count file types
+            file_ext = os.path.splitext(name)[1].lower() or "no_extension"
+            self.file_types[file_ext] = self.file_types.get(file_ext, 0) + 1
+
+            # Track the largest files (>10MB)
+            if size > LARGE_FILE_BYTES and self.large_limit:
+                if len(self.large_heap) < self.large_limit:
+                    heapq.heappush(self.large_heap, (size, -row))
+                else:
+                    heapq.heappushpop(self.large_heap, (size, -row))
+
+            # Track recent files
+            if st.st_mtime > self.cutoff:
+                self.recent_rows.append(row)
+
+            # Categorize by top-level directory
+            rel_path = entry.path[self.prefix_len :]
+            category = rel_path.split(os.sep, 1)[0] if os.sep in rel_path else "root"
+            if category not in category_index:
+                category_index[category] = len(self.category_names)
+                self.category_names.append(category)
+                self.categories[category] = {"files": 0, "size": 0}
+            self.category_ids.append(category_index[category])
+            self.categories[category]["files"] += 1
+            self.categories[category]["size"] += size
+
+    def _name(self, row):
+        return os.path.basename(self.paths[row])
+
+    def stats(self):
+        """The archive_stats.json summary"""
+        large_files = [
+            {
+                "name": self._name(-neg_row),
+                "path": self.paths[-neg_row],
+                "size": size,
+                "size_mb": round(size / MB, 2),
+            }
+            for size, neg_row in sorted(self.large_heap, reverse=True)
+        ]
+        recent_files = [
+            {
+                "name": self._name(row),
+                "path": self.paths[row],
+                "modified": datetime.datetime.fromtimestamp(self.mtimes[row]).strftime("%Y-%m-%d"),
+                "size_mb": round(self.sizes[row] / MB, 2),
+            }
+            for row in self.recent_rows
+        ]
+        # Newest day first; stable, so walk order within a day
+        recent_files.sort(key=lambda x: x["modified"], reverse=True)
+        return {
+            "total_files": len(self.paths),
+            "total_dirs": self.total_dirs,
+            "total_size": self.total_size,
+            "file_types": self.file_types,
+            "large_files": large_files,
+            "recent_files": recent_files,
+            "categories": self.categories,
+        }
+
+    def index_entries(self) -> Iterator[dict]:
+        """One file_index.json entry per file, built on demand"""
+        for row, file_path in enumerate(self.paths):
+            name = os.path.basename(file_path)
+            size = self.sizes[row]
+            yield {
+                "name": name,
+                "path": file_path[self.prefix_len :],
+                "full_path": file_path,
+                "extension": os.path.splitext(name)[1].lower(),
+                "size": size,
+                "size_mb": round(size / MB, 2),
+                "modified": datetime.datetime.fromtimestamp(self.mtimes[row]).strftime("%Y-%m-%d %H:%M:%S"),
+                "category": self.category_names[self.category_ids[row]],
+            }
+
 
-    # Save as JSON
+def get_file_stats(directory):
+    """Get comprehensive file statistics for the directory"""
+    return DirectoryScan(directory).stats()
+
+
+def write_json_array(output_file, items):
+    """Stream ``items`` as a JSON array, formatted like ``json.dump(list(items), indent=2)``"""
+    count = 0
     with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(file_index, f, indent=2, ensure_ascii=False)
+        f.write("[")
+        for item in items:
+            f.write(",\n  " if count else "\n  ")
+            f.write(json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
 
-    return file_index
+
+def generate_file_index(directory, output_file, scan=None):
+    """Generate a searchable file index; returns the number of files written"""
+    if scan is None:
+        scan = DirectoryScan(directory)
+    return write_json_array(output_file, scan.index_entries())
 
 
 def generate_category_pages(directory, stats):
@@ -295,8 +330,11 @@ def main():
     """Main function to generate all indexes and pages"""
     downloads_dir = Path(str(Path.home()) + "/Downloads")
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     logger.info("🔍 Analyzing Downloads directory...")
-    stats = get_file_stats(downloads_dir)
+    scan = DirectoryScan(downloads_dir)
+    stats = scan.stats()
 
     logger.info(
         f"📊 Found {stats['total_files']} files in {stats['total_dirs']} directories"
@@ -306,11 +344,11 @@ def main():
     )
 
     logger.info("\n📝 Generating file index...")
-    file_index = generate_file_index(
-        downloads_dir, os.path.join(downloads_dir, "file_index.json")
+    indexed = generate_file_index(
+        downloads_dir, os.path.join(downloads_dir, "file_index.json"), scan
     )
 
-    logger.info(f"✅ Generated index with {len(file_index)} files")
+    logger.info(f"✅ Generated index with {indexed} files")
 
     logger.info("\n📄 Generating category pages...")
     generate_category_pages(downloads_dir, stats)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Stand-in for ffmpeg when exercising transcode_engine without real codecs.
+
+Takes the argument shape transcode_engine.build_command produces
+(``... -i SRC ... OUTPUT``), copies SRC to OUTPUT and reports progress on
+stdout the way ``-progress pipe:1`` does (``out_time_us=`` lines, then
+``progress=end``). One "second" of media is reported per input byte.
+
+The first line of the input may hold a directive:
+
+* ``fail`` - print an error to stderr and exit 1 without writing output
+* ``sleep N`` - take N seconds before finishing (for timeouts and parallelism)
+
+Usage:
+    FFMPEG_BIN=./fake-ffmpeg.py python convert-aiff-to-mp3.py ...
+    python check-transcode-engine.py
+"""
+
+import shutil
+import sys
+import time
+
+# Constants
+US_PER_SECOND = 1_000_000
+PROGRESS_STEPS = 4
+
+
+def main():
+    args = sys.argv[1:]
+    if "-i" not in args or args.index("-i") + 1 >= len(args):
+        sys.stderr.write("fake-ffmpeg: no input given\n")
+        return 1
+    src = args[args.index("-i") + 1]
+    dst = args[-1]
+
+    try:
+        with open(src, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        sys.stderr.write(f"{src}: {e.strerror}\n")
+        return 1
+
+    directive = data.split(b"\n", 1)[0].decode("utf-8", errors="replace").split()
+    if directive[:1] == ["fail"]:
+        sys.stderr.write(f"{src}: Invalid data found when processing input\n")
+        return 1
+    delay = float(directive[1]) if directive[:1] == ["sleep"] and len(directive) > 1 else 0.0
+
+    total_us = len(data) * US_PER_SECOND
+    for step in range(1, PROGRESS_STEPS + 1):
+        time.sleep(delay / PROGRESS_STEPS)
+        print(f"out_time_us={total_us * step // PROGRESS_STEPS}", flush=True)
+        print("progress=continue" if step < PROGRESS_STEPS else "progress=end", flush=True)
+
+    shutil.copyfile(src, dst)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Fast filtered directory walking shared by the dedup scanners and organizers.
+
+``ExclusionMatcher`` compiles an exclusion list once instead of running
+``re.search`` per pattern for every path:
+
+* ``.*/NAME/.*`` patterns with a plain NAME become a set lookup on path
+  components (``node_modules``, ``.git``, ``venv`` ...)
+* the "hidden anywhere" pattern ``^.*\\/\\..*`` becomes a substring test
+* everything else is folded into one alternation regex, with the
+  redundant leading/trailing ``.*`` stripped (they only make ``search``
+  backtrack; paths never contain newlines)
+
+``scandir_files`` walks with ``os.scandir`` and uses the matcher (or plain
+directory names) to prune whole subtrees before descending into them.
+``walk_files`` wraps it and yields ``FileRecord`` tuples built from the
+``DirEntry`` stat, so a scan costs one stat per file and callers never need
+to stat again.
+
+``ExclusionMatcher.pattern`` folds the same rules into one regex for
+vectorized filters (the CSV inventory readers).
+
+Usage:
+    matcher = ExclusionMatcher(excluded_patterns)
+    for record in walk_files(directory, matcher, skip_dirs={"node_modules"}):
+        print(record.path, record.size, record.mtime)
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+_COMPONENT_PATTERN = re.compile(r"^\.\*/((?:[\w\- ]|\\.)+)/\.\*$")
+_HIDDEN_PATTERNS = {r"^.*\/\..*", r".*/\..*"}
+_REGEX_META = set(".^$*+?{}[]()|\\")
+
+
+def _strip_wildcards(pattern: str) -> str:
+    """``.*X.*`` -> ``X``: identical under ``re.search`` for single-line input"""
+    if pattern.startswith("^.*"):
+        pattern = pattern[3:]
+    elif pattern.startswith(".*"):
+        pattern = pattern[2:]
+    if pattern.endswith(".*") and not pattern.endswith("\\.*"):
+        pattern = pattern[:-2]
+    return pattern or ".*"
+
+
+def _plain_component(pattern: str) -> Optional[str]:
+    """NAME for a ``.*/NAME/.*`` pattern whose NAME has no regex meaning"""
+    match = _COMPONENT_PATTERN.match(pattern)
+    if not match:
+        return None
+    escaped = match.group(1)
+    name = re.sub(r"\\(.)", r"\1", escaped)
+    # An unescaped "." is a wildcard, so it has to stay a regex
+    unescaped_part = re.sub(r"\\.", "", escaped)
+    if any(ch in _REGEX_META for ch in unescaped_part):
+        return None
+    return name
+
+
+class ExclusionMatcher:
+    """Exclusion patterns compiled once for millions of path checks"""
+
+    def __init__(self, patterns: Iterable[str] = (), names: Iterable[str] = ()):
+        self.patterns = list(patterns)
+        self.names = set(names)
+        self.hidden = False
+
+        regex_parts: List[str] = []
+        for pattern in self.patterns:
+            if pattern in _HIDDEN_PATTERNS:
+                self.hidden = True
+                continue
+            name = _plain_component(pattern)
+            if name is not None:
+                self.names.add(name)
+            else:
+                regex_parts.append(f"(?:{_strip_wildcards(pattern)})")
+
+        self.regex = re.compile("|".join(regex_parts)) if regex_parts else None
+
+    def excludes_name(self, name: str) -> bool:
+        """True if a directory called ``name`` is excluded wherever it appears"""
+        return name in self.names or (self.hidden and name.startswith("."))
+
+    def matches(self, path: str) -> bool:
+        """Same answer as ``any(re.search(p, path) for p in patterns)``"""
+        if self.hidden and "/." in path:
+            return True
+        if self.names:
+            # ".*/NAME/.*" needs NAME as a non-final component after a "/"
+            parts = path.split("/")
+            if not self.names.isdisjoint(parts[1:-1]):
+                return True
+        return bool(self.regex and self.regex.search(path))
+
+    @property
+    def pattern(self) -> str:
+        """One regex with the same answer as ``matches`` under ``re.search``.
+
+        For engines that take a single pattern (``Series.str.contains``).
+        """
+        parts = []
+        if self.hidden:
+            parts.append(r"/\.")
+        if self.names:
+            # A component after a "/" that is followed by another "/"
+            parts.append("/(?:" + "|".join(re.escape(name) for name in sorted(self.names)) + ")/")
+        if self.regex is not None:
+            parts.append(self.regex.pattern)
+        # Nothing to exclude: a pattern that never matches
+        return "|".join(parts) or r"(?!)"
+
+    def prunes_dir(self, dir_path: str, name: Optional[str] = None) -> bool:
+        """True if every path below ``dir_path`` is excluded.
+
+        Checking ``dir_path + "/"`` against the regex is exact for patterns
+        that aren't anchored at the end, which covers every exclusion list in
+        these scripts.
+        """
+        if name is not None and self.excludes_name(name):
+            return True
+        return self.matches(dir_path + "/")
+
+
+@lru_cache(maxsize=None)
+def _matcher_for(patterns: Tuple[str, ...]) -> ExclusionMatcher:
+    return ExclusionMatcher(patterns)
+
+
+def is_excluded(path: str, patterns: Iterable[str]) -> bool:
+    """Drop-in for the old per-pattern ``is_excluded`` loop (matcher is cached)"""
+    return _matcher_for(tuple(patterns)).matches(path)
+
+
+class FileRecord(NamedTuple):
+    """One walked file with the stat fields callers actually use"""
+
+    path: str
+    name: str
+    size: int
+    mtime: float
+    inode: int
+    dev: int
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.name)[1]
+
+
+def scandir_files(
+    root: str,
+    matcher: Optional[ExclusionMatcher] = None,
+    skip_dirs: Iterable[str] = (),
+    skip_hidden: bool = False,
+    on_dir: Optional[Callable[[os.DirEntry], None]] = None,
+) -> Iterator[os.DirEntry]:
+    """Yield non-excluded file entries under ``root``, pruning excluded subtrees.
+
+    ``skip_dirs`` and ``skip_hidden`` test bare entry names (like the usual
+    ``dirs[:] = [...]`` filter in an ``os.walk`` loop); ``matcher`` tests full
+    paths. ``on_dir`` is called for every directory entry that survives the
+    name filters, i.e. what ``os.walk`` would list in ``dirs`` (symlinked
+    directories included, though they are not followed).
+    """
+    skip_dirs = set(skip_dirs)
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.info(f"Cannot scan {directory}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if skip_hidden and entry.name.startswith("."):
+                continue
+            if is_dir:
+                if entry.name in skip_dirs:
+                    continue
+                if on_dir is not None:
+                    on_dir(entry)
+                try:
+                    if entry.is_symlink():
+                        # Like os.walk: listed as a directory, never followed
+                        continue
+                except OSError:
+                    continue
+                if matcher is None or not matcher.prunes_dir(entry.path, entry.name):
+                    subdirs.append(entry.path)
+            elif matcher is None or not matcher.matches(entry.path):
+                yield entry
+
+        # Reversed so subdirectories come out in listing order
+        stack.extend(reversed(subdirs))
+
+
+def walk_files(
+    root: str,
+    matcher: Optional[ExclusionMatcher] = None,
+    skip_dirs: Iterable[str] = (),
+    skip_hidden: bool = False,
+    suffixes: Optional[Set[str]] = None,
+) -> Iterator[FileRecord]:
+    """Yield a ``FileRecord`` per file, stat'ed exactly once.
+
+    ``suffixes`` (lowercase, with the dot) keeps only matching extensions and
+    is checked before the stat.
+    """
+    for entry in scandir_files(root, matcher, skip_dirs, skip_hidden):
+        if suffixes is not None and os.path.splitext(entry.name)[1].lower() not in suffixes:
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        yield FileRecord(entry.path, entry.name, st.st_size, st.st_mtime, st.st_ino, st.st_dev)
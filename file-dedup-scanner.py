@@ -1,35 +1,14 @@
 import csv
-import hashlib
-import os
-import re
-from collections import defaultdict
+
+from dedup_engine import StagedDuplicateFinder
+from fast_walk import ExclusionMatcher, scandir_files
+from hash_cache import HashCache
 
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-# Constants
-CONSTANT_4096 = 4096
-
-
-def is_excluded(path, patterns):
-    """
-    Check if a given path matches any of the exclusion patterns.
-
-    Parameters:
-    path (str): The path to check.
-    patterns (list): A list of regex patterns for exclusion.
-
-    Returns:
-    bool: True if path matches any pattern, False otherwise.
-    """
-    for pattern in patterns:
-        if re.search(pattern, path):
-            return True
-    return False
-
-
 def scan_directory(directory, excluded_patterns):
     """
     Scan a given directory, excluding files and directories
@@ -42,38 +21,9 @@ def scan_directory(directory, excluded_patterns):
     Returns:
     list: A list of file paths that do not match any exclusion patterns.
     """
-    files_list = []
-    for root, dirs, files in os.walk(directory):
-        # Exclude directories in-place
-        dirs[:] = [
-            d for d in dirs if not is_excluded(os.path.join(root, d), excluded_patterns)
-        ]
-        for file in files:
-            file_path = os.path.join(root, file)
-            if not is_excluded(file_path, excluded_patterns):
-                files_list.append(file_path)
-    return files_list
-
-
-def compute_md5(file_path):
-    """
-    Compute the MD5 hash of a file.
-
-    Parameters:
-    file_path (str): The path to the file.
-
-    Returns:
-    str: The MD5 hash of the file.
-    """
-    hash_md5 = hashlib.md5()
-    try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(CONSTANT_4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception as e:
-        logger.info(f"Error computing hash for {file_path}: {e}")
-        return None
+    # Patterns are compiled once; excluded subtrees are never descended into
+    matcher = ExclusionMatcher(excluded_patterns)
+    return [entry.path for entry in scandir_files(directory, matcher)]
 
 
 def generate_detailed_duplicate_report(directories, csv_path):
@@ -85,7 +35,9 @@ def generate_detailed_duplicate_report(directories, csv_path):
     directories (list): List of directories to scan.
     csv_path (str): Path to the output CSV file.
     """
-    file_hash_map = defaultdict(list)
+    hash_cache = HashCache()
+    finder = StagedDuplicateFinder(algorithm="md5", cache=hash_cache)
+    scanned = []
 
     # Regex patterns for exclusions
     excluded_patterns = [
@@ -114,16 +66,18 @@ def generate_detailed_duplicate_report(directories, csv_path):
     ]
 
     for directory in directories:
-        files_list = scan_directory(directory, excluded_patterns)
-        for file_path in files_list:
-            file_hash = compute_md5(file_path)
-            if file_hash:
-                file_hash_map[file_hash].append(file_path)
-
+        for file_path in scan_directory(directory, excluded_patterns):
+            if finder.add(file_path):
+                scanned.append(file_path)
+
+    # Only files that share a size (and partial hash) get a full MD5;
+    # everything else is unique and reported with a count of 1
+    duplicates = finder.find_duplicates()
+    hash_cache.close()
     rows = []
-    for file_hash, paths in file_hash_map.items():
-        for path in paths:
-            rows.append([path, file_hash, len(paths)])
+    for file_path in scanned:
+        file_hash = finder.digests.get(file_path, "")
+        rows.append([file_path, file_hash, len(duplicates.get(file_hash, [file_path]))])
 
     with open(csv_path, "w", newline="") as csvfile:
         csv_writer = csv.writer(csvfile)
@@ -131,6 +85,7 @@ def generate_detailed_duplicate_report(directories, csv_path):
         csv_writer.writerows(rows)
 
     logger.info(f"CSV output written to {csv_path}")
+    logger.info(hash_cache.summary())
 
 
 # Function to prompt user for directories
@@ -1,10 +1,7 @@
 import csv
-import hashlib
-import os
-import re
-from collections import defaultdict
 
-import pandas as pd
+from csv_inventory import iter_included_chunks
+from dedup_engine import StagedDuplicateFinder
 
 import logging
 
@@ -12,45 +9,7 @@ logger = logging.getLogger(__name__)
 
 
 # Constants
-CONSTANT_4096 = 4096
-
-
-def is_excluded(path, patterns):
-    """
-    Check if a given path matches any of the exclusion patterns.
-
-    Parameters:
-    path (str): The path to check.
-    patterns (list): A list of regex patterns for exclusion.
-
-    Returns:
-    bool: True if path matches any pattern, False otherwise.
-    """
-    for pattern in patterns:
-        if re.search(pattern, path):
-            return True
-    return False
-
-
-def compute_md5(file_path):
-    """
-    Compute the MD5 hash of a file.
-
-    Parameters:
-    file_path (str): The path to the file.
-
-    Returns:
-    str: The MD5 hash of the file.
-    """
-    hash_md5 = hashlib.md5()
-    try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(CONSTANT_4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception as e:
-        logger.info(f"Error computing hash for {file_path}: {e}")
-        return None
+HASH_WORKERS = "auto"
 
 
 def generate_detailed_duplicate_report(csv_files, output_csv_path, excluded_patterns):
@@ -63,46 +22,32 @@ def generate_detailed_duplicate_report(csv_files, output_csv_path, excluded_patt
     output_csv_path (str): Path to the output CSV file.
     excluded_patterns (list): List of regex patterns for exclusion.
     """
-    file_hash_map = defaultdict(list)
-
-    for csv_file in csv_files:
-        df = pd.read_csv(csv_file)
-        for index, row in df.iterrows():
-            file_path = row["Original Path"]
-            if not is_excluded(file_path, excluded_patterns):
-                file_hash = compute_md5(file_path)
-                if file_hash:
-                    file_hash_map[file_hash].append(
-                        {
-                            "file_path": file_path,
-                            "file_name": row["Filename"],
-                            "file_size": row["File Size"],
-                            "creation_date": row["Creation Date"],
-                            "width": row["Width"],
-                            "height": row["Height"],
-                            "dpi_x": row["DPI_X"],
-                            "dpi_y": row["DPI_Y"],
-                        }
-                    )
-
-    rows = []
-    for file_hash, details in file_hash_map.items():
-        for detail in details:
-            rows.append(
-                [
-                    detail["file_path"],
-                    detail["file_name"],
-                    detail["file_size"],
-                    detail["creation_date"],
-                    detail["width"],
-                    detail["height"],
-                    detail["dpi_x"],
-                    detail["dpi_y"],
-                    file_hash,
-                    len(details),
-                ]
-            )
-
+    columns = [
+        "Original Path",
+        "Filename",
+        "File Size",
+        "Creation Date",
+        "Width",
+        "Height",
+        "DPI_X",
+        "DPI_Y",
+    ]
+    finder = StagedDuplicateFinder(algorithm="md5", workers=HASH_WORKERS)
+    unreadable = set()
+
+    # Pass 1: only the path column, fed to the staged hasher as it streams
+    for chunk in iter_included_chunks(
+        csv_files, "Original Path", excluded_patterns, usecols=["Original Path"]
+    ):
+        for file_path in chunk["Original Path"]:
+            if not finder.add(file_path):
+                unreadable.add(file_path)
+
+    # Files with a unique size (or partial hash) are never hashed in full
+    duplicates = finder.find_duplicates()
+    counts = {file_hash: len(paths) for file_hash, paths in duplicates.items()}
+
+    # Pass 2: re-stream the inventory and write the report as we go
     with open(output_csv_path, "w", newline="") as csvfile:
         csv_writer = csv.writer(csvfile)
         csv_writer.writerow(
@@ -119,7 +64,15 @@ def generate_detailed_duplicate_report(csv_files, output_csv_path, excluded_patt
                 "Duplicate Count",
             ]
         )
-        csv_writer.writerows(rows)
+        for chunk in iter_included_chunks(
+            csv_files, "Original Path", excluded_patterns, usecols=columns
+        ):
+            for row in chunk[columns].itertuples(index=False, name=None):
+                file_path = row[0]
+                if file_path in unreadable:
+                    continue
+                file_hash = finder.digests.get(file_path, "")
+                csv_writer.writerow([*row, file_hash, counts.get(file_hash, 1)])
 
     logger.info(f"CSV output written to {output_csv_path}")
 
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Persistent content-hash cache shared by the dedup / merge scanners.
+
+Digests are stored in SQLite keyed by file identity (st_dev, st_ino) and
+validated against st_size and st_mtime_ns, so an unchanged file is never
+re-hashed between runs. A changed file simply misses and its row is
+overwritten on the next store.
+
+Usage:
+    with HashCache() as cache:
+        digest = cache.get_or_compute(path, "sha256", lambda: hash_file(path))
+        logger.info(cache.summary())
+
+Maintenance:
+    python hash_cache.py prune      # drop rows for deleted/changed files
+    python hash_cache.py vacuum     # compact the database file
+    python hash_cache.py stats
+"""
+
+import argparse
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+DEFAULT_DB_PATH = Path.home() / ".cache" / "pythons" / "hash_cache.db"
+COMMIT_EVERY = 500
+
+
+class HashCache(SQLiteStore):
+    """SQLite-backed digest cache keyed by (dev, inode, size, mtime_ns)"""
+
+    default_path = DEFAULT_DB_PATH
+    commit_every = COMMIT_EVERY
+
+    def __init__(self, db_path: Optional[os.PathLike] = None):
+        super().__init__(db_path)
+        self.hits = 0
+        self.misses = 0
+
+    def init_database(self):
+        """Create the digest table if needed"""
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS digests (
+                dev INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                path TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (dev, inode, kind)
+            )
+        """
+        )
+        self.conn.commit()
+
+    def lookup(self, st: os.stat_result, kind: str) -> Optional[str]:
+        """Stored digest for an unchanged file, else ``None``"""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, digest FROM digests WHERE dev=? AND inode=? AND kind=?",
+            (st.st_dev, st.st_ino, kind),
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE digests SET last_seen=? WHERE dev=? AND inode=? AND kind=?",
+                (time.time(), st.st_dev, st.st_ino, kind),
+            )
+            self._tick()
+            return row[2]
+        self.misses += 1
+        return None
+
+    def store(self, path: os.PathLike, st: os.stat_result, kind: str, digest: str):
+        """Record ``digest`` for the file identity in ``st``"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                st.st_dev,
+                st.st_ino,
+                kind,
+                st.st_size,
+                st.st_mtime_ns,
+                digest,
+                str(path),
+                time.time(),
+            ),
+        )
+        self._tick()
+
+    def get_or_compute(
+        self,
+        path: os.PathLike,
+        kind: str,
+        compute: Callable[[], Optional[str]],
+        st: Optional[os.stat_result] = None,
+    ) -> Optional[str]:
+        """Return the cached digest for ``path`` or compute and store it.
+
+        ``kind`` names the digest (e.g. ``"sha256"`` or ``"md5:partial"``) so
+        different hashes of the same file don't collide.
+        """
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return compute()
+
+        digest = self.lookup(st, kind)
+        if digest is None:
+            digest = compute()
+            if digest is not None:
+                self.store(path, st, kind, digest)
+        return digest
+
+    def invalidate(self, path: os.PathLike) -> int:
+        """Forget every digest stored for ``path``"""
+        try:
+            st = os.stat(path)
+            cur = self.conn.execute(
+                "DELETE FROM digests WHERE (dev=? AND inode=?) OR path=?",
+                (st.st_dev, st.st_ino, str(path)),
+            )
+        except OSError:
+            cur = self.conn.execute("DELETE FROM digests WHERE path=?", (str(path),))
+        self.commit()
+        return cur.rowcount
+
+    def prune(self, max_age_days: Optional[float] = None) -> int:
+        """Drop rows whose file is gone or changed, or not seen for ``max_age_days``"""
+        stale = []
+        rows = self.conn.execute(
+            "SELECT dev, inode, kind, size, mtime_ns, path, last_seen FROM digests"
+        )
+        cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+        for dev, inode, kind, size, mtime_ns, path, last_seen in rows:
+            if cutoff is not None and last_seen < cutoff:
+                stale.append((dev, inode, kind))
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((dev, inode, kind))
+                continue
+            if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) != (
+                dev,
+                inode,
+                size,
+                mtime_ns,
+            ):
+                stale.append((dev, inode, kind))
+
+        self.conn.executemany(
+            "DELETE FROM digests WHERE dev=? AND inode=? AND kind=?", stale
+        )
+        self.commit()
+        return len(stale)
+
+    def vacuum(self):
+        """Compact the database file"""
+        self.commit()
+        self.conn.execute("VACUUM")
+
+    def count(self) -> int:
+        """Number of cached digests"""
+        return self.conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"Hash cache: {self.hits:,} hits / {self.misses:,} misses ({rate:.1f}% hit rate)"
+
+
+def main():
+    """Cache maintenance commands"""
+    parser = argparse.ArgumentParser(description="Maintain the shared file hash cache")
+    parser.add_argument("command", choices=["prune", "vacuum", "stats"])
+    parser.add_argument("--db", type=str, help=f"Cache database (default: {DEFAULT_DB_PATH})")
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        help="With prune: also drop entries not seen for this many days",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with HashCache(args.db) as cache:
+        if args.command == "prune":
+            removed = cache.prune(args.max_age_days)
+            cache.vacuum()
+            logger.info(f"Pruned {removed:,} stale entries ({cache.count():,} remain)")
+        elif args.command == "vacuum":
+            cache.vacuum()
+            logger.info(f"Vacuumed {cache.db_path}")
+        else:
+            size = cache.db_path.stat().st_size
+            logger.info(f"{cache.db_path}: {cache.count():,} entries, {size / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
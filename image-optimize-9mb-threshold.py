@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
+import argparse
 import csv
 import logging
 import os
-import time
 from datetime import datetime
 
 from PIL import Image, UnidentifiedImageError
 from tqdm import tqdm
 
+from image_engine import JOURNAL_NAME, Journal, encode, encode_to_target_size, format_for_path, run_jobs, write_atomic
+
+logger = logging.getLogger(__name__)
+
 # Constants
 CONSTANT_300 = 300
 CONSTANT_1024 = 1024
@@ -16,10 +20,10 @@ CONSTANT_1024 = 1024
 # 🚀 Constants
 TARGET_DPI = CONSTANT_300
 UPSCALE_MULTIPLIER = 2  # How much to enlarge small images
-BATCH_SIZE = 50
-PAUSE_DURATION = 3  # Seconds between batches
+DEFAULT_JOBS = os.cpu_count() or 1  # Worker processes
 SIZE_THRESHOLD_MB = 9  # Max image size threshold
 MAX_IMAGE_SIZE_MB = 9  # Holy grail max size
+QUALITY_RANGE = (20, 95)  # Lowest and highest JPEG quality to try
 
 
 # Configure logging
@@ -46,16 +50,22 @@ def get_user_choice():
         logger.info("Invalid. Please enter 1, 2, or 3.")
 # 🔻 Resize large images
 def resize_image(im, output_path):
-    quality = 95
-    while quality >= 20:
-        im.save(output_path, dpi=(TARGET_DPI, TARGET_DPI), quality=quality)
-        size_mb = os.path.getsize(output_path) / (CONSTANT_1024**2)
-        if size_mb <= MAX_IMAGE_SIZE_MB:
-            logging.info(
-                f"Resized {os.path.basename(output_path)} -> {size_mb:.2f}MB at Q={quality}"
-            )
-            return True
-        quality -= 5
+    # Search quality in memory, then write the winning encode once
+    result = encode_to_target_size(
+        im,
+        format_for_path(output_path),
+        max_bytes=MAX_IMAGE_SIZE_MB * CONSTANT_1024**2,
+        quality_range=QUALITY_RANGE,
+        dpi=(TARGET_DPI, TARGET_DPI),
+    )
+    write_atomic(output_path, result.data)
+    size_mb = result.size / (CONSTANT_1024**2)
+    if result.in_range:
+        logging.info(
+            f"Resized {os.path.basename(output_path)} -> {size_mb:.2f}MB at Q={result.quality} "
+            f"({result.encodes} encodes)"
+        )
+        return True
     logging.warning(f"Could not shrink {os.path.basename(output_path)} below {MAX_IMAGE_SIZE_MB}MB")
     return False
 
@@ -64,59 +74,66 @@ def upscale_image(im, output_path):
     w, h = im.size
     new_size = (int(w * UPSCALE_MULTIPLIER), int(h * UPSCALE_MULTIPLIER))
     im2 = im.resize(new_size, Image.LANCZOS)
-    im2.save(output_path, dpi=(TARGET_DPI, TARGET_DPI), quality=95)
+    write_atomic(output_path, encode(im2, format_for_path(output_path), 95, dpi=(TARGET_DPI, TARGET_DPI)))
     logging.info(f"Upscaled {os.path.basename(output_path)} -> {new_size[0]}x{new_size[1]}")
 
 
-# 🖼️ Process a batch
-def process_batch(batch, root, mode, log_data):
-    for file in tqdm(batch, desc="Processing batch", unit="file"):
-        path = os.path.join(root, file)
-        try:
-            im = Image.open(path)
+# 🖼️ Process one image (runs in a worker process)
+def process_file(path, mode):
+    file = os.path.basename(path)
+    try:
+        with Image.open(path) as im:
             size_mb = os.path.getsize(path) / (CONSTANT_1024**2)
-            temp = os.path.join(root, f"tmp_{file}")
 
             # Mode 1: Resize only
             if mode == 1 and size_mb >= SIZE_THRESHOLD_MB:
-                resize_image(im, temp)
+                resize_image(im, path)
 
             # Mode 2: Resize + Upscale
             elif mode == 2:
                 if size_mb >= SIZE_THRESHOLD_MB:
-                    resize_image(im, temp)
+                    resize_image(im, path)
                 else:
-                    upscale_image(im, temp)
+                    upscale_image(im, path)
 
             # Mode 3: Upscale only
             elif mode == 3 and size_mb < SIZE_THRESHOLD_MB:
-                upscale_image(im, temp)
+                upscale_image(im, path)
 
             else:
-                if os.path.exists(temp):
-                    os.remove(temp)
-                continue
-
-            os.replace(temp, path)
-            new_size_mb = os.path.getsize(path) / (CONSTANT_1024**2)
-            log_data.append(
-                {
-                    "File": file,
-                    "Orig MB": round(size_mb, 2),
-                    "Final MB": round(new_size_mb, 2),
-                    "Status": "OK",
-                }
-            )
-        except UnidentifiedImageError:
-            logging.debug(f"Skipped non-image: {file}")
-            log_data.append({"File": file, "Status": "Skipped"})
-        except Exception as e:
-            logging.error(f"Error {file}: {e}")
-            log_data.append({"File": file, "Status": f"Error: {e}"})
+                return None
+
+        new_size_mb = os.path.getsize(path) / (CONSTANT_1024**2)
+        return {
+            "File": file,
+            "Orig MB": round(size_mb, 2),
+            "Final MB": round(new_size_mb, 2),
+            "Status": "OK",
+        }
+    except UnidentifiedImageError:
+        logging.debug(f"Skipped non-image: {file}")
+        return {"File": file, "Status": "Skipped"}
+    except Exception as e:
+        logging.error(f"Error {file}: {e}")
+        return {"File": file, "Status": f"Error: {e}"}
+
+
+# 🖼️ Process a batch of paths on the worker pool
+def process_batch(paths, mode, log_data, jobs=DEFAULT_JOBS, journal=None):
+    outcomes = run_jobs(process_file, ((path, mode) for path in paths), workers=jobs, journal=journal)
+    for outcome in tqdm(outcomes, desc="Processing", unit="file"):
+        if outcome.error is not None:
+            file = os.path.basename(outcome.job[0])
+            logging.error(f"Error {file}: {outcome.error}")
+            log_data.append({"File": file, "Status": f"Error: {outcome.error}"})
+        elif outcome.result is not None:
+            log_data.append(outcome.result)
 
 
 # 📦 Main processing
-def process_images(source, mode, from_csv=False, column="path", log_file=None, verbose=False):
+def process_images(
+    source, mode, from_csv=False, column="path", log_file=None, verbose=False, jobs=DEFAULT_JOBS, restart=False
+):
     setup_logging(log_file, verbose)
     log_data = []
     paths = []
@@ -130,15 +147,13 @@ def process_images(source, mode, from_csv=False, column="path", log_file=None, v
                     paths.append(p)
     else:
         for root, _, files in os.walk(source):
-            batch = []
-            for file in files:
-                batch.append(file)
-                if len(batch) >= BATCH_SIZE:
-                    process_batch(batch, root, mode, log_data)
-                    batch = []
-                    time.sleep(PAUSE_DURATION)
-            if batch:
-                process_batch(batch, root, mode, log_data)
+            paths.extend(
+                os.path.join(root, file) for file in files if file != JOURNAL_NAME and not file.startswith(".tmp_")
+            )
+
+    # Finished files are journaled, so an interrupted run picks up where it stopped
+    with Journal.for_target(source, restart=restart) as journal:
+        process_batch(paths, mode, log_data, jobs, journal)
     return log_data
 
 
@@ -157,14 +172,21 @@ def write_log(log_data, source):
 
 # 🎬 Entry point
 def main():
+    parser = argparse.ArgumentParser(description="Batch image resizer & upscaler")
+    parser.add_argument("source", nargs="?", help="Folder or CSV path (prompted if omitted)")
+    parser.add_argument("--mode", type=int, choices=(1, 2, 3), help="Processing mode (prompted if omitted)")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Worker processes")
+    parser.add_argument("--restart", action="store_true", help="Ignore the journal of an interrupted run")
+    args = parser.parse_args()
+
     logger.info("Ultimate Batch Image Resizer & Upscaler")
-    src = input("Enter folder or CSV path: ").strip()
+    src = args.source or input("Enter folder or CSV path: ").strip()
     if not os.path.exists(src):
         logger.info("Invalid path!")
         return
     use_csv = src.lower().endswith(".csv")
-    mode = get_user_choice()
-    log_data = process_images(src, mode, from_csv=use_csv)
+    mode = args.mode or get_user_choice()
+    log_data = process_images(src, mode, from_csv=use_csv, jobs=args.jobs, restart=args.restart)
     write_log(log_data, src)
     logger.info("Done!")
 
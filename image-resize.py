@@ -5,6 +5,9 @@ from datetime import datetime
 from PIL import Image, UnidentifiedImageError
 from tqdm import tqdm
 
+from image_engine import encode_to_target_size, format_for_path, write_atomic
+from image_metadata import probe_image
+
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +22,7 @@ CONSTANT_1024 = 1024
 TARGET_DPI = CONSTANT_300
 TARGET_MIN_FILE_SIZE_MB = 5  # Minimum file size in MB
 TARGET_MAX_FILE_SIZE_MB = 9  # Maximum file size in MB
+QUALITY_RANGE = (15, 95)  # Lowest and highest JPEG/WebP quality to try
 ASPECT_RATIOS = [
     (9, 16),
     (16, 9),
@@ -65,20 +69,30 @@ def resize_image_to_target_size(im, output_path):
     )
     im = im.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
-    # Save image iteratively to achieve the target file size
-    quality = 95  # Start with high quality
-    while quality > 10:  # Minimum quality threshold
-        im.save(output_path, dpi=(TARGET_DPI, TARGET_DPI), quality=quality)
-        file_size_mb = os.path.getsize(output_path) / (CONSTANT_1024**2)
-        if TARGET_MIN_FILE_SIZE_MB <= file_size_mb <= TARGET_MAX_FILE_SIZE_MB:
-            logger.info(f"✅ File size optimized: {file_size_mb:.2f} MB (Quality: {quality})")
-            return True, file_size_mb, (new_width, new_height)
-        quality -= 5  # Reduce quality incrementally if size doesn't fit
+    # Search quality in memory for the target size range, then write once
+    result = encode_to_target_size(
+        im,
+        format_for_path(output_path),
+        max_bytes=TARGET_MAX_FILE_SIZE_MB * CONSTANT_1024**2,
+        min_bytes=TARGET_MIN_FILE_SIZE_MB * CONSTANT_1024**2,
+        quality_range=QUALITY_RANGE,
+        dpi=(TARGET_DPI, TARGET_DPI),
+    )
+    write_atomic(output_path, result.data)
+    file_size_mb = result.size / (CONSTANT_1024**2)
+
+    if result.in_range:
+        logger.info(
+            f"✅ File size optimized: {file_size_mb:.2f} MB (Quality: {result.quality}, {result.encodes} encodes)"
+        )
+        return True, file_size_mb, (new_width, new_height)
 
     print(
         f"⚠️ Unable to resize {output_path} to target size range. Final file size: {file_size_mb:.2f} MB"
     )
     return False, file_size_mb, (new_width, new_height)
+
+
 # Function to process a single image
 def process_image(file_path):
     file_ext = file_path.lower().split(".")[-1]
@@ -94,12 +108,13 @@ def process_image(file_path):
         log_data.append(entry)
         return
 
-    # Open image
+    # Check size and dimensions from the stat and the header; only files
+    # that will actually be resized get decoded
     try:
-        im = Image.open(file_path)
-        width, height = im.size
-        file_size_mb = os.path.getsize(file_path) / (CONSTANT_1024**2)
+        meta = probe_image(file_path)
+        width, height = meta.width, meta.height
         entry["Original Dimensions"] = f"{width}x{height}"
+        file_size_mb = os.path.getsize(file_path) / (CONSTANT_1024**2)
         entry["Original Size (MB)"] = round(file_size_mb, 2)
 
         # Skip files smaller than the target minimum size
@@ -116,9 +131,10 @@ def process_image(file_path):
         )
 
         # Resize and overwrite the original file
-        success, new_file_size_mb, new_dimensions = resize_image_to_target_size(
-            im, file_path
-        )
+        with Image.open(file_path) as im:
+            success, new_file_size_mb, new_dimensions = resize_image_to_target_size(
+                im, file_path
+            )
 
         entry["New Dimensions"] = f"{new_dimensions[0]}x{new_dimensions[1]}"
         entry["New Size (MB)"] = round(new_file_size_mb, 2)
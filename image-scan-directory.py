@@ -1,8 +1,10 @@
-from pathlib import Path
+import argparse
 import os
 
 import logging
 
+from image_metadata import MetadataIndex, walk_images
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,28 +15,44 @@ CONSTANT_1024 = 1024
 def scan_directory(directory, file_types, min_size):
     """scan_directory function."""
 
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(file_types):
-                file_path = os.path.join(root, file)
-                if os.path.getsize(file_path) >= min_size:
-                    yield file_path
-
-    """main function."""
+    # One scandir stat per file; the size filter never opens the image
+    for file_path, st in walk_images(directory, set(file_types)):
+        if st.st_size >= min_size:
+            yield file_path, st
 
 
 def main():
+    parser = argparse.ArgumentParser(description="List large image files on a drive")
+    parser.add_argument("drive", nargs="?", help="Drive path to scan (prompted if omitted)")
+    parser.add_argument("--min-mb", type=float, default=1, help="Smallest file to list")
+    parser.add_argument(
+        "--with-meta",
+        action="store_true",
+        help="Also write width, height, format and DPI (header-only, cached in the metadata index)",
+    )
+    parser.add_argument("--metadata-db", help="Image metadata index database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     file_types = (".jpg", ".jpeg", ".png", ".gif", ".bmp")
-    min_size = CONSTANT_1024 * CONSTANT_1024  # 1MB in bytes
+    min_size = int(args.min_mb * CONSTANT_1024 * CONSTANT_1024)  # 1MB in bytes
 
-    drive = input("Enter the drive path to scan (e.g., /Volumes/4t): ")
+    drive = args.drive or input("Enter the drive path to scan (e.g., /Volumes/4t): ")
 
     # Automatically name the output file based on the drive
-    output_filename = f"image_paths_{os.path.basename(drive)}.txt"
+    output_filename = f"image_paths_{os.path.basename(os.path.normpath(drive))}.txt"
 
     with open(output_filename, "w") as file:
-        for image_path in scan_directory(drive, file_types, min_size):
-            file.write(image_path + Path("\n"))
+        if not args.with_meta:
+            for image_path, _ in scan_directory(drive, file_types, min_size):
+                file.write(image_path + "\n")
+        else:
+            with MetadataIndex(args.metadata_db) as index:
+                for image_path, meta in index.scan(scan_directory(drive, file_types, min_size)):
+                    if meta is not None:
+                        file.write(f"{image_path}\t{meta.width}\t{meta.height}\t{meta.format}\t{meta.dpi or ''}\n")
+                logger.info(index.summary())
 
     logger.info(f"Scan complete for {drive}. Image paths saved to {output_filename}")
 
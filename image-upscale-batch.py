@@ -11,16 +11,50 @@ Combines the best features and functionality from multiple similar files.
 
 # Imports from all source files
 from PIL import Image, UnidentifiedImageError
+import argparse
+import logging
 import os
 
+from image_engine import Journal, encode, encode_to_target_size, run_jobs, write_atomic
 
-def convert_and_upscale_images(source_directory, destination_directory, max_size_mb=8):
+logger = logging.getLogger(__name__)
+
+
+# Constants
+CONSTANT_300 = 300
+CONSTANT_1024 = 1024
+QUALITY_RANGE = (15, 95)  # Lowest and highest quality to try when over max size
+DEFAULT_JOBS = os.cpu_count() or 1
+
+
+def upscale_file(source_file, destination_file, max_size_mb=8):
+    """Upscale one image 2x and write it atomically (runs in a worker process)"""
+    with Image.open(source_file) as im:
+        width, height = im.size
+        upscale_width = width * 2
+        upscale_height = height * 2
+        im_resized = im.resize((upscale_width, upscale_height))
+
+        # Encode in memory and ensure it doesn't exceed the max size
+        max_bytes = int(max_size_mb * CONSTANT_1024 * CONSTANT_1024)
+        data = encode(im_resized, im.format, dpi=(CONSTANT_300, CONSTANT_300))
+        if len(data) > max_bytes:
+            data = encode_to_target_size(
+                im_resized, im.format, max_bytes, quality_range=QUALITY_RANGE, dpi=(CONSTANT_300, CONSTANT_300)
+            ).data
+
+    write_atomic(destination_file, data)
+    return len(data)
+
+
+def convert_and_upscale_images(source_directory, destination_directory, max_size_mb=8, jobs=DEFAULT_JOBS, restart=False):
     """convert_and_upscale_images function."""
 
     # Create the destination directory if it doesn't exist
     os.makedirs(destination_directory, exist_ok=True)
 
-    for filename in os.listdir(source_directory):
+    tasks = []
+    for filename in sorted(os.listdir(source_directory)):
         if filename.lower().endswith((".png", ".jpeg", ".jpg")):
             source_file = os.path.join(source_directory, filename)
             filename_no_ext = os.path.splitext(filename)[0]
@@ -28,53 +62,32 @@ def convert_and_upscale_images(source_directory, destination_directory, max_size
             destination_file = os.path.join(
                 destination_directory, f"{filename_no_ext}.{ext}"
             )
+            tasks.append((source_file, destination_file, max_size_mb))
 
-            try:
-                # Convert and upscale PNG or JPEG
-                with Image.open(source_file) as im:
-                    width, height = im.size
-                    upscale_width = width * 2
-                    upscale_height = height * 2
-                    im_resized = im.resize((upscale_width, upscale_height))
-
-                    # Save the image and ensure it doesn't exceed the max size
-                    im_resized.save(
-                        destination_file,
-                        format=im.format,
-                        dpi=(CONSTANT_300, CONSTANT_300),
-                    )
-
-                    # Check file size and reduce quality if needed
-                    file_size = os.path.getsize(destination_file) / (
-                        CONSTANT_1024 * CONSTANT_1024
-                    )  # size in MB
-                    if file_size > max_size_mb:
-                        for quality in range(95, 10, -5):  # Reduce quality in steps
-                            im_resized.save(
-                                destination_file,
-                                format=im.format,
-                                dpi=(CONSTANT_300, CONSTANT_300),
-                                quality=quality,
-                            )
-                            file_size = os.path.getsize(destination_file) / (
-                                CONSTANT_1024 * CONSTANT_1024
-                            )
-                            if file_size <= max_size_mb:
-                                break
-
-                print(
-                    f"Converted, upscaled, and saved: {filename} -> {filename_no_ext}.{ext}"
-                )
-            except (UnidentifiedImageError, OSError) as e:
-                logger.info(f"Error processing {filename}: {e}")
-
-    # Main function
-    """main function."""
+    with Journal.for_target(destination_directory, restart=restart) as journal:
+        for outcome in run_jobs(upscale_file, tasks, workers=jobs, journal=journal):
+            filename = os.path.basename(outcome.job[0])
+            if isinstance(outcome.error, (UnidentifiedImageError, OSError)):
+                logger.info(f"Error processing {filename}: {outcome.error}")
+            elif outcome.error is not None:
+                raise outcome.error
+            elif not outcome.resumed:
+                logger.info(f"Converted, upscaled, and saved: {filename} -> {os.path.basename(outcome.job[1])}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Upscale PNG and JPEG images 2x")
+    parser.add_argument("source", nargs="?", help="Source directory (prompted if omitted)")
+    parser.add_argument("destination", nargs="?", help="Destination directory (prompted if omitted)")
+    parser.add_argument("--max-size-mb", type=float, default=8, help="Largest output file")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Worker processes")
+    parser.add_argument("--restart", action="store_true", help="Ignore the journal of an interrupted run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Prompt for the source directory containing PNG and JPEG images
-    source_directory = input(
+    source_directory = args.source or input(
         "Enter the path to the source directory containing PNG and JPEG images: "
     )
 
@@ -84,9 +97,11 @@ def main():
         return
 
     # Prompt for the destination directory
-    destination_directory = input("Enter the path for the destination directory: ")
+    destination_directory = args.destination or input("Enter the path for the destination directory: ")
 
-    convert_and_upscale_images(source_directory, destination_directory)
+    convert_and_upscale_images(
+        source_directory, destination_directory, args.max_size_mb, jobs=args.jobs, restart=args.restart
+    )
 
 
 # Run the main function
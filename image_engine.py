@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Shared image encoding helpers for the resize / optimize / upscale scripts.
+
+``encode_to_target_size`` finds the highest JPEG/WebP quality whose output
+fits a byte budget without touching the disk: every attempt is encoded into
+an in-memory buffer, and instead of stepping quality down 95, 90, 85 ...
+it searches the quality range. A probe of full-resolution tiles (about one
+megapixel) is used as a cheap model of the size curve: each full-size encode recalibrates
+the model and the next guess comes from it, so a large print file needs a
+few full-size encodes instead of up to seventeen. The winning buffer is
+then written once with ``write_atomic``.
+
+Formats where quality has no effect on size (PNG, TIFF ...) are encoded
+exactly once.
+
+``run_jobs`` runs a per-image worker function over many files in a process
+pool. Only a bounded number of jobs is in flight at once, so decoded
+bitmaps never pile up in RAM, and a ``Journal`` records finished jobs so an
+interrupted batch continues where it stopped.
+
+Usage:
+    result = encode_to_target_size(im, "JPEG", max_bytes=9 * 1024 ** 2, dpi=(300, 300))
+    if result.in_range:
+        write_atomic(path, result.data)
+
+    with Journal.for_target(folder) as journal:
+        for outcome in run_jobs(process_one, jobs, workers=4, journal=journal):
+            log_data.append(outcome.result)
+"""
+
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+QUALITY_FORMATS = {"JPEG", "WEBP"}
+PROBE_PIXELS = 1_000_000
+PROBE_TILE = 128
+DEFAULT_QUALITY_RANGE = (10, 95)
+JOURNAL_NAME = ".image_engine_journal.jsonl"
+IN_FLIGHT_PER_WORKER = 2
+
+
+class EncodeResult(NamedTuple):
+    """Outcome of a size-targeted encode"""
+
+    data: bytes
+    quality: Optional[int]
+    size: int
+    encodes: int
+    in_range: bool
+
+
+def format_for_path(path: str) -> str:
+    """Pillow format name for a file extension (``.jpg`` -> ``JPEG``)"""
+    ext = os.path.splitext(path)[1].lower()
+    fmt = Image.registered_extensions().get(ext)
+    if fmt is None:
+        raise ValueError(f"Unknown image extension: {ext or path}")
+    return fmt
+
+
+def encode(im: Image.Image, fmt: str, quality: Optional[int] = None, **save_kwargs) -> bytes:
+    """Encode ``im`` into memory"""
+    buffer = io.BytesIO()
+    if quality is not None:
+        save_kwargs["quality"] = quality
+    im.save(buffer, format=fmt, **save_kwargs)
+    return buffer.getvalue()
+
+
+def _existing_mode(path: str) -> int:
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write ``data`` to a temp file beside ``path``, then rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates 0600; keep the replaced file's mode, else the umask default
+        os.chmod(temp, _existing_mode(path))
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def _search(size_at, max_bytes: int, lo: int, hi: int, guess: int) -> Tuple[Optional[int], Optional[int]]:
+    """Highest quality in [lo, hi] with size_at(q) <= max_bytes.
+
+    Gallops away from ``guess`` until the answer is bracketed, then bisects.
+    Returns (best fitting quality or None, lowest quality known too big).
+    """
+    fits, too_big = None, None
+    step = 1
+    q = min(max(guess, lo), hi)
+    while True:
+        if size_at(q) <= max_bytes:
+            fits = q
+        else:
+            too_big = q
+
+        if fits is not None and too_big is not None:
+            if too_big - fits <= 1:
+                break
+            q = (fits + too_big) // 2
+        elif fits is not None:
+            if fits == hi:
+                break
+            q = min(hi, fits + step)
+            step *= 2
+        else:
+            if too_big == lo:
+                break
+            q = max(lo, too_big - step)
+            step *= 2
+    return fits, too_big
+
+
+def _probe_sizer(im: Image.Image, fmt: str, save_kwargs):
+    """Estimated full-size bytes per quality, from a ~1 MP mosaic of tiles.
+
+    Tiles are cut at full resolution from a grid spread over the image, so
+    the probe keeps the original detail per pixel (a downscaled copy would
+    overestimate) and sizes scale by pixel count.
+    """
+    per_side = max(1, math.isqrt(PROBE_PIXELS) // PROBE_TILE)
+    mosaic = Image.new(im.mode, (per_side * PROBE_TILE, per_side * PROBE_TILE))
+    for row in range(per_side):
+        for col in range(per_side):
+            # Tile origins on the 16 px JPEG block grid
+            x = (col * (im.width - PROBE_TILE) // max(1, per_side - 1)) // 16 * 16
+            y = (row * (im.height - PROBE_TILE) // max(1, per_side - 1)) // 16 * 16
+            mosaic.paste(im.crop((x, y, x + PROBE_TILE, y + PROBE_TILE)), (col * PROBE_TILE, row * PROBE_TILE))
+    scale = (im.width * im.height) / (mosaic.width * mosaic.height)
+    sizes = {}
+
+    def probe_size(q):
+        if q not in sizes:
+            sizes[q] = len(encode(mosaic, fmt, q, **save_kwargs)) * scale
+        return sizes[q]
+
+    return probe_size
+
+
+def _guided_search(im: Image.Image, fmt: str, size_at, max_bytes: int, lo: int, hi: int, save_kwargs):
+    """Highest fitting quality, guessing each next quality from the probe model.
+
+    The probe's scaled sizes are off by a small quality-dependent factor;
+    every full-size encode re-measures that factor and the next guess is the
+    best quality the corrected model says fits, always strictly inside the
+    still-unknown bracket.
+    """
+    probe_size = _probe_sizer(im, fmt, save_kwargs)
+    ratios = {}  # quality -> full size / scaled probe size
+
+    def model(q):
+        below = [m for m in ratios if m <= q]
+        above = [m for m in ratios if m >= q]
+        if not ratios:
+            ratio = 1.0
+        elif below and above:
+            a, b = max(below), min(above)
+            ratio = ratios[a] if a == b else ratios[a] + (ratios[b] - ratios[a]) * (q - a) / (b - a)
+        else:
+            ratio = ratios[max(below)] if below else ratios[min(above)]
+        return probe_size(q) * ratio
+
+    fits, too_big = lo - 1, hi + 1
+    while too_big - fits > 1:
+        low, high = fits + 1, too_big - 1
+        guess, _ = _search(model, max_bytes, low, high, (low + high) // 2)
+        if guess is None:
+            guess = low
+
+        size = size_at(guess)
+        if size <= max_bytes:
+            fits = guess
+        else:
+            too_big = guess
+        ratios[guess] = size / probe_size(guess)
+    return fits if fits >= lo else None
+
+
+def encode_to_target_size(
+    im: Image.Image,
+    fmt: str,
+    max_bytes: int,
+    min_bytes: int = 0,
+    quality_range: Tuple[int, int] = DEFAULT_QUALITY_RANGE,
+    probe: bool = True,
+    **save_kwargs,
+) -> EncodeResult:
+    """Highest-quality encode of ``im`` with ``min_bytes <= size <= max_bytes``.
+
+    If no quality in ``quality_range`` lands in the range, the encode closest
+    to it is returned with ``in_range=False`` (lowest quality when even that
+    is too big, highest quality when even that is too small).
+    """
+    if fmt.upper() not in QUALITY_FORMATS:
+        data = encode(im, fmt, **save_kwargs)
+        return EncodeResult(data, None, len(data), 1, min_bytes <= len(data) <= max_bytes)
+
+    lo, hi = quality_range
+    encoded = {}
+
+    def size_at(q):
+        if q not in encoded:
+            encoded[q] = encode(im, fmt, q, **save_kwargs)
+        return len(encoded[q])
+
+    if probe and im.width * im.height > 4 * PROBE_PIXELS:
+        fits = _guided_search(im, fmt, size_at, max_bytes, lo, hi, save_kwargs)
+    else:
+        fits, _ = _search(size_at, max_bytes, lo, hi, hi)
+
+    if fits is None:
+        quality = lo
+        size_at(quality)
+    else:
+        quality = fits
+
+    data = encoded[quality]
+    return EncodeResult(data, quality, len(data), len(encoded), min_bytes <= len(data) <= max_bytes)
+
+
+class Journal:
+    """Append-only JSONL record of finished jobs, for resuming a batch"""
+
+    def __init__(self, path: str, restart: bool = False):
+        self.path = path
+        self.done: Dict[str, Any] = {}
+        if restart and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from an interrupted run
+                    self.done[entry["key"]] = entry.get("result")
+        if self.done:
+            logger.info(f"Resuming: {len(self.done)} jobs already finished ({path})")
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")  # start fresh after a torn line
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @classmethod
+    def for_target(cls, target: str, restart: bool = False) -> "Journal":
+        """Journal inside a folder, or beside a CSV/list file"""
+        if os.path.isdir(target):
+            return cls(os.path.join(target, JOURNAL_NAME), restart)
+        return cls(f"{target}{JOURNAL_NAME}", restart)
+
+    def record(self, key: str, result: Any) -> None:
+        """Mark ``key`` finished; flushed immediately so a crash keeps it"""
+        self._file.write(json.dumps({"key": key, "result": result, "time": time.time()}, default=str) + "\n")
+        self._file.flush()
+        self.done[key] = result
+
+    def close(self, completed: bool = False) -> None:
+        """Close; a fully completed batch removes its journal"""
+        self._file.close()
+        if completed and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(completed=exc_type is None)
+
+
+class JobOutcome(NamedTuple):
+    """One finished job: the worker's result, or the exception it raised"""
+
+    job: Tuple
+    result: Any
+    error: Optional[BaseException]
+    resumed: bool
+
+
+def _init_worker() -> None:
+    # Load every Pillow plugin once per worker process instead of lazily per image
+    Image.init()
+
+
+def run_jobs(
+    worker: Callable[..., Any],
+    jobs: Iterable[Tuple],
+    workers: int = 1,
+    journal: Optional[Journal] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[JobOutcome]:
+    """Run ``worker(*job)`` for every job, yielding outcomes as they finish.
+
+    ``job[0]`` (the source path) is the journal key. ``worker`` must be a
+    module-level function so it can be sent to the worker processes. At
+    most ``max_in_flight`` jobs (default: twice the worker count) are
+    submitted at a time.
+    """
+    def finish(job, result, error):
+        if journal is not None and error is None:
+            journal.record(str(job[0]), result)
+        return JobOutcome(job, result, error, False)
+
+    def is_done(job):
+        return journal is not None and str(job[0]) in journal.done
+
+    if workers <= 1:
+        for job in jobs:
+            if is_done(job):
+                yield JobOutcome(job, journal.done[str(job[0])], None, True)
+                continue
+            try:
+                result, error = worker(*job), None
+            except Exception as e:
+                result, error = None, e
+            yield finish(job, result, error)
+        return
+
+    pending_jobs = iter(jobs)
+    limit = max_in_flight or workers * IN_FLIGHT_PER_WORKER
+    in_flight: Dict[Future, Tuple] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        while True:
+            # Top up to the in-flight limit; a new job is only read when a slot frees
+            for job in pending_jobs:
+                if is_done(job):
+                    yield JobOutcome(job, journal.done[str(job[0])], None, True)
+                    continue
+                in_flight[pool.submit(worker, *job)] = job
+                if len(in_flight) >= limit:
+                    break
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                error = future.exception()
+                yield finish(job, None if error else future.result(), error)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Header-only image metadata and a persistent metadata index.
+
+``Image.open`` only parses the file header; pixels are decoded on the first
+``load()``. ``probe_image`` reads dimensions, format, mode, DPI and the
+EXIF fields the catalog scripts use without ever calling ``load()`` (PNG
+EXIF is only read when it sits before the image data), so a probe costs a
+few KB of I/O instead of decoding tens of megapixels.
+
+``preview`` is for callers that do need pixels but only at thumbnail size:
+``Image.draft`` lets the JPEG decoder scale by 1/2, 1/4 or 1/8 while
+decoding, so a 40 MP photo is decoded as ~0.6 MP.
+
+``MetadataIndex`` stores probe results in SQLite keyed by file identity
+(st_dev, st_ino) and validated against st_size and st_mtime_ns, like
+``hash_cache.HashCache``. A catalog pass over an unchanged library is one
+stat and one indexed lookup per file.
+
+Usage:
+    with MetadataIndex() as index:
+        meta = index.get_or_probe(path)
+        if meta:
+            print(meta.width, meta.height, meta.dpi)
+
+Maintenance:
+    python image_metadata.py scan ~/Pictures    # fill the index
+    python image_metadata.py prune               # drop rows for deleted/changed files
+    python image_metadata.py stats
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, UnidentifiedImageError
+
+from fast_walk import scandir_files
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+DEFAULT_DB_PATH = Path.home() / ".cache" / "pythons" / "image_metadata.db"
+COMMIT_EVERY = 500
+SCAN_CHUNK = 256
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".tif", ".webp"}
+EXIF_ORIENTATION = 0x0112
+EXIF_DATETIME = 0x0132
+EXIF_MAKE = 0x010F
+EXIF_MODEL = 0x0110
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+
+
+class ImageMeta(NamedTuple):
+    """What a catalog pass needs to know about an image, read from its header"""
+
+    width: int
+    height: int
+    format: Optional[str]
+    mode: str
+    dpi: Optional[float]
+    orientation: Optional[int]
+    taken: Optional[str]
+    camera: Optional[str]
+
+
+def _header_exif(im: Image.Image):
+    # PngImageFile.getexif() decodes the image to look for a trailing eXIf chunk
+    if im.format == "PNG" and "exif" not in im.info:
+        return {}, {}
+    exif = im.getexif()
+    return exif, exif.get_ifd(EXIF_IFD) if exif else {}
+
+
+def probe_image(path: os.PathLike) -> ImageMeta:
+    """Metadata from the file header; pixel data is never decoded.
+
+    Raises ``UnidentifiedImageError`` / ``OSError`` like ``Image.open``.
+    """
+    with Image.open(path) as im:
+        dpi = im.info.get("dpi")
+        if isinstance(dpi, tuple):
+            dpi = dpi[0]
+        exif, exif_ifd = _header_exif(im)
+        camera = " ".join(str(exif[tag]).strip() for tag in (EXIF_MAKE, EXIF_MODEL) if exif.get(tag))
+        taken = exif_ifd.get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+        return ImageMeta(
+            width=im.width,
+            height=im.height,
+            format=im.format,
+            mode=im.mode,
+            dpi=float(dpi) if dpi else None,
+            orientation=exif.get(EXIF_ORIENTATION),
+            taken=str(taken) if taken else None,
+            camera=camera or None,
+        )
+
+
+def preview(path: os.PathLike, max_side: int, mode: str = "RGB") -> Image.Image:
+    """A decoded copy no larger than ``max_side``, decoded at reduced scale where possible"""
+    with Image.open(path) as im:
+        # JPEG decodes straight to the smallest DCT scale still >= the request;
+        # other formats ignore the draft and decode in full
+        im.draft(mode, (max_side, max_side))
+        thumb = im.convert(mode) if im.mode != mode else im.copy()
+    thumb.thumbnail((max_side, max_side), Image.LANCZOS)
+    return thumb
+
+
+def _probe_or_none(path: str) -> Optional[ImageMeta]:
+    try:
+        return probe_image(path)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.debug(f"Cannot probe {path}: {e}")
+        return None
+
+
+class MetadataIndex(SQLiteStore):
+    """SQLite-backed ``ImageMeta`` cache keyed by (dev, inode, size, mtime_ns)"""
+
+    default_path = DEFAULT_DB_PATH
+    commit_every = COMMIT_EVERY
+
+    def __init__(self, db_path: Optional[os.PathLike] = None):
+        super().__init__(db_path)
+        self.hits = 0
+        self.misses = 0
+
+    def init_database(self):
+        """Create the metadata table if needed"""
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS image_meta (
+                dev INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                meta TEXT,
+                path TEXT NOT NULL,
+                probed REAL NOT NULL,
+                PRIMARY KEY (dev, inode)
+            )
+        """
+        )
+        self.conn.commit()
+
+    def lookup(self, st: os.stat_result) -> Tuple[bool, Optional[ImageMeta]]:
+        """(found, meta) for an unchanged file; meta is ``None`` for non-images"""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, meta FROM image_meta WHERE dev=? AND inode=?",
+            (st.st_dev, st.st_ino),
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            self.hits += 1
+            return True, ImageMeta(*json.loads(row[2])) if row[2] else None
+        self.misses += 1
+        return False, None
+
+    def store(self, path: os.PathLike, st: os.stat_result, meta: Optional[ImageMeta]):
+        """Record ``meta`` (``None`` marks a file Pillow can't read)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO image_meta VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                st.st_dev,
+                st.st_ino,
+                st.st_size,
+                st.st_mtime_ns,
+                json.dumps(meta) if meta else None,
+                str(path),
+                time.time(),
+            ),
+        )
+        self._tick()
+
+    def get_or_probe(self, path: os.PathLike, st: Optional[os.stat_result] = None) -> Optional[ImageMeta]:
+        """Cached metadata for ``path``, probing the header on a miss"""
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return None
+        found, meta = self.lookup(st)
+        if not found:
+            meta = _probe_or_none(str(path))
+            self.store(path, st, meta)
+        return meta
+
+    def scan(self, paths: Iterable[Tuple[str, os.stat_result]], workers: int = 8) -> Iterator[Tuple[str, Optional[ImageMeta]]]:
+        """``get_or_probe`` over many files, probing misses on a thread pool"""
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            misses: List[Tuple[str, os.stat_result]] = []
+
+            def flush():
+                for (path, st), meta in zip(misses, pool.map(_probe_or_none, [p for p, _ in misses])):
+                    self.store(path, st, meta)
+                    yield path, meta
+                misses.clear()
+
+            for path, st in paths:
+                found, meta = self.lookup(st)
+                if found:
+                    yield path, meta
+                    continue
+                misses.append((path, st))
+                if len(misses) >= SCAN_CHUNK:
+                    yield from flush()
+            yield from flush()
+
+    def prune(self) -> int:
+        """Drop rows whose file is gone or changed"""
+        stale = []
+        for dev, inode, size, mtime_ns, path in self.conn.execute(
+            "SELECT dev, inode, size, mtime_ns, path FROM image_meta"
+        ):
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((dev, inode))
+                continue
+            if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) != (dev, inode, size, mtime_ns):
+                stale.append((dev, inode))
+        self.conn.executemany("DELETE FROM image_meta WHERE dev=? AND inode=?", stale)
+        self.commit()
+        return len(stale)
+
+    def count(self) -> int:
+        """Number of indexed files"""
+        return self.conn.execute("SELECT COUNT(*) FROM image_meta").fetchone()[0]
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"Metadata index: {self.hits:,} hits / {self.misses:,} misses ({rate:.1f}% hit rate)"
+
+
+def walk_images(directory: str, suffixes=IMAGE_EXTENSIONS) -> Iterator[Tuple[str, os.stat_result]]:
+    """(path, stat) for every image-extension file under ``directory``, one stat each"""
+    for entry in scandir_files(directory):
+        if os.path.splitext(entry.name)[1].lower() in suffixes:
+            try:
+                yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+
+def main():
+    """Index maintenance commands"""
+    parser = argparse.ArgumentParser(description="Maintain the shared image metadata index")
+    parser.add_argument("command", choices=["scan", "prune", "stats"])
+    parser.add_argument("directory", nargs="?", help="With scan: folder to index")
+    parser.add_argument("--db", type=str, help=f"Index database (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--workers", type=int, default=8, help="Threads probing uncached files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with MetadataIndex(args.db) as index:
+        if args.command == "scan":
+            if not args.directory:
+                parser.error("scan needs a directory")
+            start = time.perf_counter()
+            images = sum(meta is not None for _, meta in index.scan(walk_images(args.directory), args.workers))
+            logger.info(f"{images:,} images indexed in {time.perf_counter() - start:.2f}s")
+            logger.info(index.summary())
+        elif args.command == "prune":
+            removed = index.prune()
+            logger.info(f"Pruned {removed:,} stale entries ({index.count():,} remain)")
+        else:
+            size = index.db_path.stat().st_size
+            logger.info(f"{index.db_path}: {index.count():,} entries, {size / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
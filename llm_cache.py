@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for LLM chat-completion responses.
+
+A rerun after a crash or a CSV tweak sends the same prompts again. Each
+request is keyed by a SHA-256 of its canonical JSON (model, messages,
+temperature, max_tokens and any extra inputs); inline ``data:`` image URLs
+are replaced by a hash of their decoded bytes first, so the key stays small
+and the same image always produces the same key. Only successful responses
+are stored.
+
+Entries expire after ``ttl_days``. When the database grows past ``max_mb``,
+the least recently used entries are evicted.
+
+Modes (``mode=`` or the ``LLM_CACHE_MODE`` environment variable):
+
+* ``use``    - read hits, call and store on a miss (default)
+* ``replay`` - read-only: hits only, a miss raises ``CacheMiss`` instead of
+  calling the API and nothing is written
+* ``off``    - bypass the cache entirely
+
+Usage:
+    with ResponseCache() as cache:
+        text = cached_chat_completion(cache, client, model="gpt-4o", messages=messages, max_tokens=200)
+
+Maintenance:
+    python llm_cache.py stats
+    python llm_cache.py evict     # drop expired entries, enforce the size cap
+    python llm_cache.py clear
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+DEFAULT_DB_PATH = Path.home() / ".cache" / "pythons" / "llm_responses.db"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 512
+COMMIT_EVERY = 50
+CACHE_MODES = ("use", "replay", "off")
+SECONDS_PER_DAY = 86400
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode when a request has no cached response"""
+
+
+def _normalize(value: Any) -> Any:
+    """Replace inline base64 data URLs with a digest of the bytes they carry"""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str) and value.startswith("data:") and ";base64," in value:
+        payload = base64.b64decode(value.split(";base64,", 1)[1])
+        return f"sha256:{hashlib.sha256(payload).hexdigest()}"
+    return value
+
+
+def request_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    **extra: Any,
+) -> str:
+    """Cache key for a chat request; ``extra`` adds inputs the messages don't show
+    (e.g. the hash of a local image that is only encoded on a miss)"""
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": _normalize(messages),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "extra": extra,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(SQLiteStore):
+    """SQLite-backed response cache with TTL expiry and LRU size eviction"""
+
+    default_path = DEFAULT_DB_PATH
+    commit_every = COMMIT_EVERY
+
+    def __init__(
+        self,
+        db_path: Optional[os.PathLike] = None,
+        mode: Optional[str] = None,
+        ttl_days: float = DEFAULT_TTL_DAYS,
+        max_mb: float = DEFAULT_MAX_MB,
+    ):
+        self.mode = mode or os.environ.get("LLM_CACHE_MODE", "use")
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {self.mode!r} (expected one of {', '.join(CACHE_MODES)})")
+        self.ttl = ttl_days * SECONDS_PER_DAY if ttl_days else None
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        super().__init__(db_path)
+        self.hits = 0
+        self.misses = 0
+
+    def init_database(self):
+        """Create the response table if needed"""
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for ``key``, or ``None`` (expired entries count as misses)"""
+        if self.mode == "off":
+            return None
+        row = self.conn.execute("SELECT content, created FROM responses WHERE key=?", (key,)).fetchone()
+        now = time.time()
+        if row and (self.ttl is None or now - row[1] <= self.ttl):
+            self.hits += 1
+            if self.mode == "use":
+                self.conn.execute("UPDATE responses SET last_used=? WHERE key=?", (now, key))
+                self._tick()
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, model: str, content: str):
+        """Store a successful response (no-op in replay/off mode)"""
+        if self.mode != "use" or content is None:
+            return
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, content, len(content.encode("utf-8")), now, now),
+        )
+        self._tick()
+
+    def lookup_or_call(self, key: str, model: str, call: Callable[[], str]) -> str:
+        """Cached response, else ``call()`` and store its result.
+
+        In replay mode a miss raises ``CacheMiss`` and ``call`` is never made.
+        """
+        content = self.get(key)
+        if content is not None:
+            return content
+        if self.mode == "replay":
+            raise CacheMiss(f"No cached response for request {key[:12]}")
+        content = call()
+        self.put(key, model, content)
+        return content
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones beyond the size cap"""
+        removed = 0
+        if self.ttl is not None:
+            removed += self.conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)
+            ).rowcount
+        if self.max_bytes is not None:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                stale = []
+                for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self.conn.executemany("DELETE FROM responses WHERE key=?", stale)
+                removed += len(stale)
+        self.commit()
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry"""
+        removed = self.conn.execute("DELETE FROM responses").rowcount
+        self.commit()
+        return removed
+
+    def count(self) -> int:
+        """Number of cached responses"""
+        return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"LLM cache ({self.mode}): {self.hits:,} hits / {self.misses:,} misses ({rate:.1f}% hit rate)"
+
+    def close(self):
+        """Enforce TTL/size limits, commit and close the connection"""
+        if self.mode == "use":
+            self.evict()
+        super().close()
+
+
+def cached_chat_completion(cache: ResponseCache, client, **request: Any) -> str:
+    """``client.chat.completions.create(**request)`` message content, through ``cache``"""
+    key = request_key(
+        request["model"],
+        request["messages"],
+        request.get("temperature"),
+        request.get("max_tokens"),
+        **{k: v for k, v in request.items() if k not in ("model", "messages", "temperature", "max_tokens")},
+    )
+    return cache.lookup_or_call(
+        key,
+        request["model"],
+        lambda: client.chat.completions.create(**request).choices[0].message.content,
+    )
+
+
+def main():
+    """Cache maintenance commands"""
+    parser = argparse.ArgumentParser(description="Maintain the shared LLM response cache")
+    parser.add_argument("command", choices=["stats", "evict", "clear"])
+    parser.add_argument("--db", type=str, help=f"Cache database (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL_DAYS, help="Entry lifetime")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_MB, help="Size cap before LRU eviction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with ResponseCache(args.db, mode="use", ttl_days=args.ttl_days, max_mb=args.max_mb) as cache:
+        if args.command == "evict":
+            removed = cache.evict()
+            logger.info(f"Evicted {removed:,} entries ({cache.count():,} remain)")
+        elif args.command == "clear":
+            logger.info(f"Cleared {cache.clear():,} entries")
+        else:
+            size = cache.db_path.stat().st_size
+            logger.info(f"{cache.db_path}: {cache.count():,} responses, {size / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
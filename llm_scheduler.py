@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited scheduling for chat-completion style API calls.
+
+Calling the API one item per round-trip leaves throughput bounded by
+latency. ``run_ordered`` keeps up to ``concurrency`` requests in flight and
+still hands results back in input order, so CSV rows come out exactly as a
+serial loop would have written them. At most ``window`` items are started
+ahead of the oldest unfinished one, which bounds the results held in memory
+while a slow request blocks emission.
+
+``RateLimiter`` is a pair of token buckets (requests per minute and tokens
+per minute). Each request reserves its estimated tokens up front, the way
+the API counts ``max_tokens`` against the limit, and ``settle`` returns the
+unused part once the real usage is known.
+
+``write_batch_requests`` / ``read_batch_results`` convert to and from the
+Batch API JSONL format for offline submission.
+
+Usage:
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=30000)
+
+    async def work(item):
+        await limiter.acquire(estimated_tokens)
+        return await client.chat.completions.create(...)
+
+    async for done in run_ordered(items, work, concurrency=8):
+        handle(done.item, done.result, done.error)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+SECONDS_PER_MINUTE = 60
+WINDOW_PER_SLOT = 4
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``per_minute`` tokens/minute"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.rate = per_minute / SECONDS_PER_MINUTE
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until ``amount`` tokens are available, then take them (FIFO)"""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def release(self, amount: float):
+        """Give back tokens that were reserved but not used"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one API key"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Reserve one request slot and ``estimated_tokens``"""
+        await self.requests.acquire(1)
+        if self.tokens is not None and estimated_tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Return the over-reservation once the response reports real usage"""
+        if self.tokens is not None and used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.release(estimated_tokens - used_tokens)
+
+
+class Completed(NamedTuple):
+    """One finished item: the worker's result, or the exception it raised"""
+
+    item: Any
+    result: Any
+    error: Optional[BaseException]
+
+
+async def run_ordered(
+    items: Iterable[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    concurrency: int = 8,
+    window: Optional[int] = None,
+) -> AsyncIterator[Completed]:
+    """Run ``worker(item)`` concurrently, yielding ``Completed`` in input order.
+
+    ``concurrency`` bounds requests in flight; ``window`` (default four per
+    slot) bounds how far ahead of the oldest unfinished item work starts.
+    """
+    window = max(window or concurrency * WINDOW_PER_SLOT, concurrency)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def guarded(item):
+        async with slots:
+            return await worker(item)
+
+    async def outcome(item, task):
+        try:
+            return Completed(item, await task, None)
+        except Exception as e:
+            return Completed(item, None, e)
+
+    started: deque = deque()
+    try:
+        for item in items:
+            started.append((item, asyncio.create_task(guarded(item))))
+            if len(started) >= window:
+                yield await outcome(*started.popleft())
+        while started:
+            yield await outcome(*started.popleft())
+    finally:
+        for _, task in started:
+            task.cancel()
+
+
+def batch_request_line(custom_id: str, body: Dict[str, Any], url: str = CHAT_COMPLETIONS_URL) -> Dict[str, Any]:
+    """One Batch API input line"""
+    return {"custom_id": custom_id, "method": "POST", "url": url, "body": body}
+
+
+def write_batch_requests(path: str, requests: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+    """Write ``(custom_id, body)`` pairs as Batch API JSONL; returns the count"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, body in requests:
+            f.write(json.dumps(batch_request_line(custom_id, body), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def read_batch_results(path: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """``custom_id -> (message content, error)`` from a Batch API output file"""
+    results: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"{path}:{line_no}: invalid JSON ({e})")
+                continue
+            custom_id = entry.get("custom_id")
+            response = entry.get("response") or {}
+            body = response.get("body") or {}
+            if entry.get("error") or response.get("status_code", 200) >= 400:
+                error = entry.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+                results[custom_id] = (None, json.dumps(error) if not isinstance(error, str) else error)
+                continue
+            try:
+                results[custom_id] = (body["choices"][0]["message"]["content"], None)
+            except (KeyError, IndexError, TypeError):
+                results[custom_id] = (None, "response has no message content")
+    return results
@@ -7,7 +7,6 @@ logger = logging.getLogger(__name__)
 # Constants
 CONSTANT_33 = 33
 CONSTANT_256 = 256
-CONSTANT_65536 = 65536
 
 #!/usr/bin/env python3
 """
@@ -25,7 +24,6 @@ Features:
 """
 
 import difflib
-import hashlib
 import json
 import os
 import shutil
@@ -36,6 +34,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from dedup_engine import hash_file
+from hash_cache import HashCache
+
 
 # Color codes
 class Colors:
@@ -70,11 +71,13 @@ class IntelligentMergeTool:
     """AI-Powered Intelligent Merge System"""
 
     def __init__(self, target_dir: str, source_dirs: List[str],
-                 dry_run: bool = True, interactive: bool = True):
+                 dry_run: bool = True, interactive: bool = True,
+                 use_hash_cache: bool = True, hash_cache_db: Optional[str] = None):
         self.target_dir = Path(target_dir)
         self.source_dirs = [Path(d) for d in source_dirs]
         self.dry_run = dry_run
         self.interactive = interactive
+        self.hash_cache = HashCache(hash_cache_db) if use_hash_cache else None
 
         # Create backup directory
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -101,15 +104,13 @@ class IntelligentMergeTool:
         logger.info(f"{'='*80}{Colors.END}\n")
 
     def calculate_hash(self, filepath: Path) -> str:
-        """Calculate SHA-CONSTANT_256 hash"""
-        try:
-            hasher = hashlib.sha256()
-            with open(filepath, 'rb') as f:
-                for chunk in iter(lambda: f.read(CONSTANT_65536), b''):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except Exception as e:
-            return f"ERROR: {str(e)}"
+        """Calculate SHA-256 hash (served from the hash cache when unchanged)"""
+        compute = lambda: hash_file(filepath, "sha256")
+        if self.hash_cache:
+            digest = self.hash_cache.get_or_compute(filepath, "sha256", compute)
+        else:
+            digest = compute()
+        return digest or f"ERROR: {filepath}"
 
     def analyze_python_file(self, filepath: Path) -> Dict[str, Any]:
         """Deep analyze Python file"""
@@ -602,6 +603,9 @@ class IntelligentMergeTool:
             f.write(f"| **Identical Files Skipped** | {self.stats['identical_files']:,} |\n")
             f.write(f"| **Conflicts Detected** | {self.stats['conflicts_found']:,} |\n")
             f.write(f"| **Files Skipped** | {self.stats['files_skipped']:,} |\n")
+            if self.hash_cache:
+                f.write(f"| **Hash Cache Hits** | {self.hash_cache.hits:,} |\n")
+                f.write(f"| **Hash Cache Misses** | {self.hash_cache.misses:,} |\n")
             f.write(f"| **Backup Location** | `{self.backup_dir}` |\n")
             f.write(f"| **Diff Reports** | `{self.merge_report_dir}` |\n\n")
 
@@ -684,6 +688,8 @@ class IntelligentMergeTool:
 
         # Analyze and merge
         self.analyze_and_merge(file_map)
+        if self.hash_cache:
+            self.hash_cache.close()
 
         # Generate report
         self.print_header("GENERATING REPORT", Colors.BLUE, Emojis.CHART)
@@ -698,6 +704,8 @@ class IntelligentMergeTool:
         logger.info(f"  {Emojis.SPARKLES} New Files: {Colors.CYAN}{self.stats['new_files']:,}{Colors.END}")
         logger.info(f"  {Emojis.CHECK} Updated: {Colors.CYAN}{self.stats['updated_files']:,}{Colors.END}")
         logger.info(f"  {Emojis.WARNING} Conflicts: {Colors.CYAN}{self.stats['conflicts_found']:,}{Colors.END}")
+        if self.hash_cache:
+            logger.info(f"  {Emojis.BRAIN} {self.hash_cache.summary()}")
         logger.info(f"  ⏭️  Skipped: {Colors.CYAN}{self.stats['files_skipped']:,}{Colors.END}\n")
 
         logger.info(f"{Colors.BOLD}📝 OUTPUTS:{Colors.END}\n")
@@ -734,6 +742,10 @@ def main():
                        help='Interactive mode (asks for confirmation on conflicts)')
     parser.add_argument('--batch', action='store_true',
                        help='Batch mode (no confirmation)')
+    parser.add_argument('--hash-cache', type=str,
+                       help='Hash cache database (default: ~/.cache/pythons/hash_cache.db)')
+    parser.add_argument('--no-hash-cache', action='store_true',
+                       help='Hash every file from scratch')
 
     args = parser.parse_args()
 
@@ -744,7 +756,9 @@ def main():
         target_dir=args.target,
         source_dirs=args.sources,
         dry_run=dry_run,
-        interactive=interactive
+        interactive=interactive,
+        use_hash_cache=not args.no_hash_cache,
+        hash_cache_db=args.hash_cache
     )
 
     merger.run()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+MinHash signatures and LSH banding for near-duplicate grouping.
+
+Comparing every pair of n items is O(n^2). Instead each item's token set
+(keywords, shingles ...) is reduced to a MinHash signature of
+``bands * rows`` values; two signatures agree on any one value with
+probability equal to the Jaccard similarity of their sets. The signature is
+cut into ``bands`` bands of ``rows`` values and every band is hashed into a
+bucket, so only items sharing at least one whole band become candidates.
+
+A pair with Jaccard similarity ``s`` becomes a candidate with probability
+``1 - (1 - s**rows) ** bands``; the S-curve is steepest around
+``(1 / bands) ** (1 / rows)`` (see ``MinHashLSH.threshold``). More bands
+catch more true pairs, more rows reject more unrelated ones. Candidates are
+only a shortlist - callers verify them with their exact similarity.
+
+Usage:
+    lsh = MinHashLSH(bands=32, rows=3)
+    for key, tokens in items:
+        lsh.add(key, tokens)
+    for key, _ in items:
+        for other in lsh.candidates(key):
+            ...
+"""
+
+import hashlib
+import logging
+import random
+from array import array
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+DEFAULT_BANDS = 32
+DEFAULT_ROWS = 3
+TOKEN_CACHE_SIZE = 50000
+
+
+def token_hash(token: str) -> int:
+    """Stable 32-bit hash of a token (``hash()`` is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class MinHashLSH:
+    """MinHash signatures bucketed by LSH bands"""
+
+    def __init__(self, bands: int = DEFAULT_BANDS, rows: int = DEFAULT_ROWS, seed: int = 1):
+        if bands < 1 or rows < 1:
+            raise ValueError("bands and rows must be positive")
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+
+        # Universal hash family h(x) = (a*x + b) mod p, one per permutation
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(self.num_perm)
+        ]
+
+        # Permuted hashes per token; keyword vocabularies repeat a lot
+        self._token_cache: Dict[str, array] = {}
+
+        self.signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+
+    @property
+    def threshold(self) -> float:
+        """Jaccard similarity at which a pair has ~50% chance of being a candidate"""
+        return (1.0 / self.bands) ** (1.0 / self.rows)
+
+    def _permuted(self, token: str) -> array:
+        values = self._token_cache.get(token)
+        if values is None:
+            h = token_hash(token)
+            values = array("L", [((a * h + b) % MERSENNE_PRIME) & MAX_HASH for a, b in self._perms])
+            if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                self._token_cache.clear()
+            self._token_cache[token] = values
+        return values
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a token set"""
+        vectors = [self._permuted(token) for token in set(tokens)]
+        if not vectors:
+            return ()
+        return tuple(map(min, zip(*vectors)))
+
+    def add(self, key: Hashable, tokens: Iterable[str]) -> bool:
+        """Index ``key`` under its token set; empty sets are not indexed"""
+        signature = self.signature(tokens)
+        if not signature:
+            return False
+        self.signatures[key] = signature
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            buckets[signature[start:start + self.rows]].append(key)
+        return True
+
+    def candidates(self, key: Hashable) -> Set[Hashable]:
+        """Keys sharing at least one band bucket with ``key`` (excluding itself)"""
+        signature = self.signatures.get(key)
+        if signature is None:
+            return set()
+        found = set()
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            found.update(buckets[signature[start:start + self.rows]])
+        found.discard(key)
+        return found
+
+    def estimate_jaccard(self, key1: Hashable, key2: Hashable) -> float:
+        """Fraction of agreeing signature values (Jaccard estimate)"""
+        sig1 = self.signatures.get(key1)
+        sig2 = self.signatures.get(key2)
+        if not sig1 or not sig2:
+            return 0.0
+        return sum(x == y for x, y in zip(sig1, sig2)) / self.num_perm
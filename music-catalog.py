@@ -1,8 +1,21 @@
-from pathlib import Path
+"""
+Build a songs CSV from a folder of MP3s and their analysis/transcript text files.
+
+Sidecars are matched through sidecar_index.SidecarIndex (built once) and
+rows are written as the MP3 folder is scanned, so nothing runs on import.
+
+Usage:
+    python music-catalog.py
+    python music-catalog.py --mp3-dir DIR --txt-dir DIR --output songs.csv
+"""
+
+import argparse
 import csv
+import logging
 import os
+from pathlib import Path
 
-import logging
+from sidecar_index import SidecarIndex
 
 logger = logging.getLogger(__name__)
 
@@ -12,62 +25,80 @@ mp3_dir = Path(str(Path.home()) + "/Music/NocTurnE-meLoDieS/mp3")
 txt_dir = Path(str(Path.home()) + "/Music/NocTurnE-meLoDieS/mp3")
 csv_output = Path(str(Path.home()) + "/Music/NocTurnE-meLoDieS/songs_data.csv")
 
-# Collect the list of MP3 and text files
-mp3_files = [f for f in os.listdir(mp3_dir) if f.endswith(".mp3")]
-txt_files = [f for f in os.listdir(txt_dir) if f.endswith(".txt")]
+CSV_HEADER = [
+    "Title",
+    "Artist",
+    "MP3 Path",
+    "Analysis Path",
+    "Transcript Path",
+    "Image Path",
+    "Description",
+]
+
+
+def list_files(directory, suffix):
+    """Names of files in ``directory`` ending with ``suffix``, in listing order"""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(suffix):
+                yield entry.name
 
 
 # Function to match song with corresponding text files
-def get_matching_files(song_title, txt_files):
-    """get_matching_files function."""
-
-    analysis_file = None
-    transcript_file = None
-    base_title = song_title.replace(".mp3", "")
-    for txt in txt_files:
-        if base_title in txt:
-            if "analysis" in txt.lower():
-                analysis_file = txt
-            elif "transcript" in txt.lower():
-                transcript_file = txt
-    return analysis_file, transcript_file
-
-
-# Create and write to the CSV
-with open(csv_output, mode="w", newline="") as file:
-    writer = csv.writer(file)
-    writer.writerow(
-        [
-            "Title",
-            "Artist",
-            "MP3 Path",
-            "Analysis Path",
-            "Transcript Path",
-            "Image Path",
-            "Description",
-        ]
-    )
+def get_matching_files(song_title, index):
+    """(analysis, transcript) text file names for an MP3 name or title"""
+    return index.sidecars(song_title.replace(".mp3", ""))
+
+
+def catalog_rows(mp3_dir, txt_dir):
+    """Yield one CSV row per MP3, matched against an index of the text files"""
+    index = SidecarIndex(list_files(txt_dir, ".txt"))
 
     # Loop over MP3 files
-    for mp3 in mp3_files:
+    for mp3 in list_files(mp3_dir, ".mp3"):
         song_title = mp3.replace(".mp3", "")
-        analysis_file, transcript_file = get_matching_files(mp3, txt_files)
+        analysis_file, transcript_file = get_matching_files(mp3, index)
 
         # Set Artist as TrashCaTs but allow customization in the CSV
-        writer.writerow(
-            [
-                song_title,
-                "TrashCaTs (Customizable)",  # Customize later for each song
-                os.path.join(mp3_dir, mp3),  # MP3 path
-                (
-                    os.path.join(txt_dir, analysis_file) if analysis_file else ""
-                ),  # Analysis path
-                (
-                    os.path.join(txt_dir, transcript_file) if transcript_file else ""
-                ),  # Transcript path
-                "https://via.placeholder.com/150",  # Placeholder for an image
-                "Lorem ipsum dolor sit amet.",  # Placeholder description
-            ]
-        )
-
-logger.info(f"CSV file generated at: {csv_output}")
+        yield [
+            song_title,
+            "TrashCaTs (Customizable)",  # Customize later for each song
+            os.path.join(mp3_dir, mp3),  # MP3 path
+            (
+                os.path.join(txt_dir, analysis_file) if analysis_file else ""
+            ),  # Analysis path
+            (
+                os.path.join(txt_dir, transcript_file) if transcript_file else ""
+            ),  # Transcript path
+            "https://via.placeholder.com/150",  # Placeholder for an image
+            "Lorem ipsum dolor sit amet.",  # Placeholder description
+        ]
+
+
+def build_catalog(mp3_dir=mp3_dir, txt_dir=txt_dir, csv_output=csv_output):
+    """Stream the catalog to ``csv_output``; returns the number of songs written"""
+    count = 0
+    with open(csv_output, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for row in catalog_rows(mp3_dir, txt_dir):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a songs CSV from MP3s and their text sidecars")
+    parser.add_argument("--mp3-dir", default=str(mp3_dir), help="Folder with the MP3 files")
+    parser.add_argument("--txt-dir", default=str(txt_dir), help="Folder with the analysis/transcript .txt files")
+    parser.add_argument("--output", default=str(csv_output), help="CSV file to write")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    count = build_catalog(args.mp3_dir, args.txt_dir, args.output)
+    logger.info(f"CSV file generated at: {args.output} ({count} songs)")
+
+
+if __name__ == "__main__":
+    main()
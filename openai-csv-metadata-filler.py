@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from tqdm import tqdm
 
+from llm_cache import CacheMiss, ResponseCache, cached_chat_completion
+
 import logging
 
 
@@ -30,7 +32,10 @@ CONSTANT_200 = 200
 # CONFIG
 load_dotenv(os.path.expanduser("~/.env"))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Identical prompts are answered from disk on reruns (LLM_CACHE_MODE=replay to rerun offline)
+response_cache = ResponseCache()
+# A replay run never calls the API, so it needs no client (or key)
+client = OpenAI(api_key=OPENAI_API_KEY) if response_cache.mode != "replay" else None
 CSV_PATH = Path(
     str(Path.home()) + "/Documents/python/clean/CSV/prompts_expanded_image_data-05-30-22-21.csv"
 )
@@ -73,7 +78,9 @@ def gpt_fill(context_dict, field, style=None):
             f"Given the context: {json.dumps(context_dict)}\n"
             f"Generate a creative and SEO-optimized value for the field '{field}'."
         )
-    response = client.chat.completions.create(
+    response = cached_chat_completion(
+        response_cache,
+        client,
         model="gpt-4o",
         messages=[
             {"role": "system", "content": sys_prompt},
@@ -82,7 +89,7 @@ def gpt_fill(context_dict, field, style=None):
         max_tokens=CONSTANT_200,
         temperature=0.8,
     )
-    return response.choices[0].message.content.strip()
+    return response.strip()
 
     """fill_missing_fields function."""
 
@@ -104,7 +111,11 @@ def fill_missing_fields(in_csv, out_csv, log_file):
             # Fill missing analytic fields
             for field in ANALYSIS_FIELDS:
                 if field in row and not row[field].strip():
-                    filled = gpt_fill(context, field)
+                    try:
+                        filled = gpt_fill(context, field)
+                    except CacheMiss as e:
+                        logger.warning(f"Replay skipped row {idx+2}, field '{field}': {e}")
+                        continue
                     row[field] = filled
                     logf.write(f"Row {idx+2}, field '{field}' filled: {filled}\n")
                     context[field] = filled
@@ -112,7 +123,11 @@ def fill_missing_fields(in_csv, out_csv, log_file):
             for field in fieldnames:
                 if field.startswith(PROMPT_PREFIX) and not row[field].strip():
                     style = field.replace(PROMPT_PREFIX, "")
-                    filled = gpt_fill(context, field, style=style)
+                    try:
+                        filled = gpt_fill(context, field, style=style)
+                    except CacheMiss as e:
+                        logger.warning(f"Replay skipped row {idx+2}, field '{field}': {e}")
+                        continue
                     row[field] = filled
                     logf.write(f"Row {idx+2}, field '{field}' filled: {filled}\n")
             writer.writerow(row)
@@ -122,4 +137,5 @@ def fill_missing_fields(in_csv, out_csv, log_file):
 
 
 if __name__ == "__main__":
-    fill_missing_fields(CSV_PATH, OUT_CSV, LOG_PATH)
+    with response_cache:
+        fill_missing_fields(CSV_PATH, OUT_CSV, LOG_PATH)
@@ -1,6 +1,9 @@
+import logging
 import os
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # Constants
 CONSTANT_300 = 300
 
@@ -27,19 +30,25 @@ load_env_d()
 import csv
 from io import BytesIO
 
-import openai
 import requests
+from openai import OpenAI
 from PIL import Image
 
-# Initialize the OpenAI client
-client = openai(api_key=os.getenv("OPENAI_API_KEY"))
+from llm_cache import CacheMiss, ResponseCache, cached_chat_completion
+
+# Initialize the shared response cache (LLM_CACHE_MODE=replay to rerun offline) and,
+# unless replaying, the OpenAI client
+response_cache = ResponseCache()
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if response_cache.mode != "replay" else None
 
 
 def analyze_image_with_gpt4_vision(image_url):
     """analyze_image_with_gpt4_vision function."""
 
-    # Analyze the image using GPT-4 with Vision
-    response = client.chat.completions.create(
+    # Analyze the image using GPT-4 with Vision (cached by request)
+    return cached_chat_completion(
+        response_cache,
+        client,
         model="gpt-4-vision-preview",
         messages=[
             {
@@ -52,7 +61,6 @@ def analyze_image_with_gpt4_vision(image_url):
         ],
         max_tokens=CONSTANT_300,
     )
-    return response.choices[0].message.content
 
     """upscale_image function."""
 
@@ -93,7 +101,11 @@ with (
     writer.writeheader()
 
     for row in reader:
-        image_description = analyze_image_with_gpt4_vision(row["URL"])
+        try:
+            image_description = analyze_image_with_gpt4_vision(row["URL"])
+        except CacheMiss as e:
+            logger.warning(f"Replay skipped '{row['URL']}': {e}")
+            image_description = ""
         upscaled_url = upscale_image(row["URL"])
         question_audio = text_to_speech(row["Question"])
         option_a_audio = text_to_speech(row["A"])
@@ -114,3 +126,5 @@ with (
         )
 
         writer.writerow(row)
+
+response_cache.close()
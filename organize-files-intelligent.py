@@ -24,15 +24,28 @@ import time
 from collections import defaultdict, Counter
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 import hashlib
 import mimetypes
+from dataclasses import asdict
+
+from fast_walk import FileRecord, walk_files
+from sqlite_store import SQLiteStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Constants
+CONSTANT_100 = 100
+CONSTANT_10000 = 10000
+CONSTANT_100000 = 100000
+DEFAULT_ANALYSIS_CACHE = Path.home() / ".cache" / "pythons" / "file_analysis_cache.db"
+ANALYSIS_CACHE_VERSION = 1  # bump when analyzer logic changes to invalidate stored analyses
+CACHE_COMMIT_EVERY = 500
+
+
 @dataclass
 class FileAnalysis:
     """Container for individual file analysis results."""
@@ -42,10 +55,10 @@ class FileAnalysis:
     size_bytes: int
     lines_of_code: int
     language: str
-    complexity_score: float
-    quality_score: float
-    category: str
-    subcategory: str
+    complexity_score: float = 0.0
+    quality_score: float = 0.0
+    category: str = ""
+    subcategory: str = ""
     patterns_detected: List[str] = field(default_factory=list)
     dependencies: List[str] = field(default_factory=list)
     keywords: List[str] = field(default_factory=list)
@@ -60,11 +73,11 @@ class ProjectAnalysis:
 
     project_name: str
     project_path: Path
-    total_files: int
-    total_lines: int
-    total_size: int
+    total_files: int = 0
+    total_lines: int = 0
+    total_size: int = 0
     languages: Dict[str, int] = field(default_factory=dict)
-    categories: Dict[str, int] = field(default_factory=list)
+    categories: Dict[str, int] = field(default_factory=dict)
     health_score: float = 0.0
     complexity_score: float = 0.0
     file_analyses: List[FileAnalysis] = field(default_factory=list)
@@ -75,6 +88,115 @@ class ProjectAnalysis:
     created_at: str = field(default_factory=lambda: time.strftime("%Y-%m-%d %H:%M:%S"))
 
 
+class AnalysisStore(SQLiteStore):
+    """
+    Persistent per-file FileAnalysis cache.
+
+    Rows are keyed by path and hold the file's size, mtime and content hash
+    plus a fingerprint of the analyzer configuration. An unchanged stat
+    reuses the stored analysis without reading the file; a changed stat
+    with identical content (touch, checkout) only costs a read and a hash.
+    """
+
+    default_path = DEFAULT_ANALYSIS_CACHE
+    commit_every = CACHE_COMMIT_EVERY
+
+    def init_database(self):
+        """Create the analysis table if needed."""
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_analyses (
+                path TEXT PRIMARY KEY,
+                project TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                config_hash TEXT NOT NULL,
+                analysis TEXT NOT NULL
+            )
+        """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_file_analyses_project ON file_analyses(project)")
+        self.conn.commit()
+
+    @staticmethod
+    def _dump(analysis: FileAnalysis) -> str:
+        data = asdict(analysis)
+        data["file_path"] = str(analysis.file_path)
+        return json.dumps(data, default=str)
+
+    @staticmethod
+    def _load(text: str) -> FileAnalysis:
+        data = json.loads(text)
+        data["file_path"] = Path(data["file_path"])
+        return FileAnalysis(**data)
+
+    def lookup(self, file_path: Path, size: int, mtime: float, config_hash: str) -> Optional[FileAnalysis]:
+        """Stored analysis if the file's size and mtime are unchanged."""
+        row = self.conn.execute(
+            "SELECT size, mtime, config_hash, analysis FROM file_analyses WHERE path=?",
+            (str(file_path),),
+        ).fetchone()
+        if row and row[0] == size and row[1] == mtime and row[2] == config_hash:
+            return self._load(row[3])
+        return None
+
+    def lookup_content(
+        self, file_path: Path, content_hash: str, config_hash: str, size: int, mtime: float
+    ) -> Optional[FileAnalysis]:
+        """Stored analysis if the content is unchanged; refreshes the stored stat."""
+        row = self.conn.execute(
+            "SELECT content_hash, config_hash, analysis FROM file_analyses WHERE path=?",
+            (str(file_path),),
+        ).fetchone()
+        if not row or row[0] != content_hash or row[1] != config_hash:
+            return None
+        self.conn.execute(
+            "UPDATE file_analyses SET size=?, mtime=? WHERE path=?",
+            (size, mtime, str(file_path)),
+        )
+        self._tick()
+        return self._load(row[2])
+
+    def store(
+        self, project_path: Path, analysis: FileAnalysis, mtime: float, content_hash: str, config_hash: str
+    ):
+        """Record a fresh analysis."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO file_analyses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(analysis.file_path),
+                str(project_path),
+                analysis.size_bytes,
+                mtime,
+                content_hash,
+                config_hash,
+                self._dump(analysis),
+            ),
+        )
+        self._tick()
+
+    def forget_missing(self, project_path: Path, seen_paths: Set[str]) -> int:
+        """Drop rows for files of ``project_path`` that were not seen this run."""
+        rows = self.conn.execute("SELECT path FROM file_analyses WHERE project=?", (str(project_path),))
+        missing = [(path,) for (path,) in rows if path not in seen_paths]
+        self.conn.executemany("DELETE FROM file_analyses WHERE path=?", missing)
+        self.commit()
+        return len(missing)
+
+    def cached_projects(self, config_hash: str) -> Dict[str, List[FileAnalysis]]:
+        """Stored analyses grouped by project path."""
+        projects: Dict[str, List[FileAnalysis]] = defaultdict(list)
+        rows = self.conn.execute(
+            "SELECT project, analysis FROM file_analyses WHERE config_hash=? ORDER BY project, path",
+            (config_hash,),
+        )
+        for project, text in rows:
+            projects[project].append(self._load(text))
+        return dict(projects)
+
+
+
 class IntelligentAnalyzer:
     """
     Main analyzer class that orchestrates all analysis components.
@@ -84,25 +206,40 @@ class IntelligentAnalyzer:
     and can be easily customized for specific use cases.
     """
 
-    def __init__(self, base_path: Union[str, Path], config_path: Optional[Path] = None):
+    def __init__(
+        self,
+        base_path: Union[str, Path],
+        config_path: Optional[Path] = None,
+        use_cache: bool = True,
+        cache_path: Optional[Path] = None,
+    ):
         """
         Initialize the analyzer with a base path and optional configuration.
 
         Args:
             base_path: Root directory to analyze
             config_path: Optional path to configuration file
+            use_cache: Reuse stored analyses of unchanged files between runs
+            cache_path: Analysis cache database (default: ~/.cache/pythons/file_analysis_cache.db)
         """
         self.base_path = Path(base_path)
         self.config = self._load_config(config_path)
         self.file_analyses: Dict[Path, FileAnalysis] = {}
         self.project_analyses: Dict[str, ProjectAnalysis] = {}
 
+        # Stored analyses are only valid for the same configuration
+        fingerprint = json.dumps([ANALYSIS_CACHE_VERSION, self.config], sort_keys=True, default=str)
+        self.config_hash = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        self.store = AnalysisStore(cache_path) if use_cache else None
+
         # Analysis statistics
         self.stats = {
             "files_processed": 0,
             "projects_analyzed": 0,
             "analysis_time": 0.0,
             "errors": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
         }
 
         # Initialize analysis components
@@ -276,11 +413,14 @@ class IntelligentAnalyzer:
         # Initialize project analysis
         project_analysis = ProjectAnalysis(project_name=project_path.name, project_path=project_path)
 
-        # Find and analyze all files
+        # Find and analyze all files (unchanged files come from the cache)
         file_analyses = []
-        for file_path in self._find_files(project_path):
+        seen_paths = set()
+        for record in self._find_files(project_path):
+            file_path = Path(record.path)
+            seen_paths.add(record.path)
             try:
-                file_analysis = self._analyze_file(file_path)
+                file_analysis = self._analyze_file(file_path, record.size, record.mtime, project_path)
                 if file_analysis:
                     file_analyses.append(file_analysis)
                     project_analysis.file_analyses.append(file_analysis)
@@ -288,7 +428,10 @@ class IntelligentAnalyzer:
                 logger.error(f"Error analyzing {file_path}: {e}")
                 self.stats["errors"] += 1
 
-        # Calculate project-level metrics
+        if self.store is not None:
+            self.store.forget_missing(project_path, seen_paths)
+
+        # Calculate project-level metrics (from in-memory analyses, no file reads)
         self._calculate_project_metrics(project_analysis)
 
         # Store analysis
@@ -320,39 +463,86 @@ class IntelligentAnalyzer:
 
         total_time = time.time() - start_time
         logger.info(f"Analysis complete: {self.stats['projects_analyzed']} projects in {total_time:.2f}s")
+        if self.store is not None:
+            self.store.commit()
+            logger.info(
+                f"Analysis cache: {self.stats['cache_hits']} reused, {self.stats['cache_misses']} analyzed"
+            )
 
         return self.project_analyses
 
-    def _find_files(self, directory: Path) -> List[Path]:
-        """Find all files to analyze in a directory."""
+    def load_cached_projects(self) -> Dict[str, ProjectAnalysis]:
+        """
+        Rebuild project analyses from the cache without touching the tree.
+
+        Returns:
+            Dictionary mapping project names to ProjectAnalysis objects
+        """
+        if self.store is None:
+            return self.project_analyses
+
+        for project, analyses in self.store.cached_projects(self.config_hash).items():
+            project_path = Path(project)
+            if project_path != self.base_path and self.base_path not in project_path.parents:
+                continue
+            project_analysis = ProjectAnalysis(
+                project_name=project_path.name, project_path=project_path, file_analyses=analyses
+            )
+            self._calculate_project_metrics(project_analysis)
+            self.project_analyses[project_path.name] = project_analysis
+            self.stats["projects_analyzed"] += 1
+            self.stats["cache_hits"] += len(analyses)
+
+        return self.project_analyses
+
+    def _find_files(self, directory: Path) -> List[FileRecord]:
+        """Find all files to analyze in a directory (one stat per file)."""
         files = []
 
-        for file_path in directory.rglob("*"):
-            if file_path.is_file():
-                # Skip hidden files and common non-code files
-                if not file_path.name.startswith(".") and not file_path.suffix in {
-                    ".pyc",
-                    ".pyo",
-                    ".pyd",
-                    ".so",
-                    ".dll",
-                    ".exe",
-                }:
-                    files.append(file_path)
+        for record in walk_files(str(directory)):
+            # Skip hidden files and common non-code files
+            if not record.name.startswith(".") and not record.suffix in {
+                ".pyc",
+                ".pyo",
+                ".pyd",
+                ".so",
+                ".dll",
+                ".exe",
+            }:
+                files.append(record)
 
         return files
 
-    def _analyze_file(self, file_path: Path) -> Optional[FileAnalysis]:
+    def _analyze_file(
+        self,
+        file_path: Path,
+        size_bytes: Optional[int] = None,
+        mtime: Optional[float] = None,
+        project_path: Optional[Path] = None,
+    ) -> Optional[FileAnalysis]:
         """
         Analyze a single file and return analysis results.
 
         Args:
             file_path: Path to the file to analyze
+            size_bytes: Size from the directory walk, if already known
+            mtime: Modification time from the directory walk, if already known
+            project_path: Project the file belongs to (for the analysis cache)
 
         Returns:
             FileAnalysis object or None if analysis fails
         """
         try:
+            if size_bytes is None or mtime is None:
+                file_stat = file_path.stat()
+                size_bytes, mtime = file_stat.st_size, file_stat.st_mtime
+
+            if self.store is not None:
+                cached = self.store.lookup(file_path, size_bytes, mtime, self.config_hash)
+                if cached is not None:
+                    self.stats["cache_hits"] += 1
+                    return cached
+
             # Determine file type and language
             file_type = self._detect_file_type(file_path)
             language = self._detect_language(file_path, file_type)
@@ -362,11 +552,19 @@ class IntelligentAnalyzer:
             if not content:
                 return None
 
+            content_hash = hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+            if self.store is not None:
+                cached = self.store.lookup_content(file_path, content_hash, self.config_hash, size_bytes, mtime)
+                if cached is not None:
+                    self.stats["cache_hits"] += 1
+                    return cached
+                self.stats["cache_misses"] += 1
+
             # Create base analysis
             analysis = FileAnalysis(
                 file_path=file_path,
                 file_type=file_type,
-                size_bytes=file_path.stat().st_size,
+                size_bytes=size_bytes,
                 lines_of_code=len(content.splitlines()),
                 language=language,
             )
@@ -388,6 +586,9 @@ class IntelligentAnalyzer:
             # Generate suggestions
             analysis.suggestions = self._generate_suggestions(analysis)
 
+            if self.store is not None:
+                self.store.store(project_path or file_path.parent, analysis, mtime, content_hash, self.config_hash)
+
             self.stats["files_processed"] += 1
             return analysis
 
@@ -815,6 +1016,7 @@ class IntelligentAnalyzer:
             "## Summary",
             f"Projects Analyzed: {len(self.project_analyses)}",
             f"Files Processed: {self.stats['files_processed']}",
+            f"Reused From Cache: {self.stats['cache_hits']}",
             f"Analysis Time: {self.stats['analysis_time']:.2f} seconds",
             f"Errors: {self.stats['errors']}",
             "",
@@ -847,7 +1049,7 @@ class IntelligentAnalyzer:
                     ]
                 )
 
-        report_content = Path("\n").join(report_lines)
+        report_content = "\n".join(report_lines)
 
         if output_path:
             with open(output_path, "w", encoding="utf-8") as f:
@@ -989,14 +1191,26 @@ def main():
     parser.add_argument("path", help="Path to analyze")
     parser.add_argument("--output", "-o", help="Output file for report")
     parser.add_argument("--config", "-c", help="Configuration file path")
+    parser.add_argument("--cache-db", help=f"Analysis cache database (default: {DEFAULT_ANALYSIS_CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze every file")
+    parser.add_argument(
+        "--from-cache", action="store_true", help="Regenerate the report from cached analyses without scanning"
+    )
 
     args = parser.parse_args()
 
     # Initialize analyzer
-    analyzer = IntelligentAnalyzer(args.path, Path(args.config) if args.config else None)
+    analyzer = IntelligentAnalyzer(
+        args.path,
+        Path(args.config) if args.config else None,
+        use_cache=not args.no_cache,
+        cache_path=Path(args.cache_db) if args.cache_db else None,
+    )
 
     # Analyze projects
-    if Path(args.path).is_dir():
+    if args.from_cache:
+        results = analyzer.load_cached_projects()
+    elif Path(args.path).is_dir():
         results = analyzer.analyze_all_projects()
     else:
         results = {Path(args.path).name: analyzer.analyze_project(args.path)}
@@ -1004,6 +1218,8 @@ def main():
     # Generate report
     output_path = Path(args.output) if args.output else None
     report = analyzer.generate_report(output_path)
+    if analyzer.store is not None:
+        analyzer.store.close()
 
     if not args.output:
         logger.info(report)
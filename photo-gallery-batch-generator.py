@@ -7,7 +7,7 @@ for each subdirectory that contains images, with advanced configuration options
 based on the Simple Photo Gallery features.
 
 Usage:
-    python enhanced_batch_gallery_generator.py [--pictures-path PATH] [--force] [--dry-run]
+    python enhanced_batch_gallery_generator.py [--pictures-path PATH] [--force] [--dry-run] [--jobs N]
 
 Features:
 - Recursively scans directories for image files
@@ -20,16 +20,20 @@ Features:
 - Custom thumbnail sizing and quality options
 - Date formatting and EXIF data extraction
 - Upload functionality for hosting providers
+- Galleries are built by several init/build processes at once (--jobs)
+- A fingerprint of each directory's images and config (.gallery_fingerprint)
+  lets unchanged galleries be skipped and changed ones rebuilt
 """
 
 import argparse
+import hashlib
 import os
 import sys
-import glob
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, NamedTuple
 import logging
 from datetime import datetime
 
@@ -44,8 +48,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Supported image extensions
+# Supported image extensions (lowercase; names are matched case-insensitively)
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".mp4"}
+SKIP_DIRS = {"node_modules", "__pycache__"}
+FINGERPRINT_NAME = ".gallery_fingerprint"
+
+# Constants
+CONSTANT_100 = 100
+CONSTANT_120 = 120
+CONSTANT_160 = 160
+CONSTANT_200 = 200
+CONSTANT_500 = 500
+CONSTANT_1000 = 1000
+CONSTANT_1080 = 1080
+CONSTANT_1920 = 1920
+CONSTANT_2000 = 2000
+CONSTANT_3000 = 3000
+CONSTANT_3600 = 3600
+CONSTANT_7200 = 7200
+
+
+class ImageDirectory(NamedTuple):
+    """A directory with images and the image names os.walk listed for it"""
+
+    path: str
+    images: List[str]
 
 
 def find_gallery_scripts() -> Tuple[str, str]:
@@ -69,8 +96,9 @@ def find_gallery_scripts() -> Tuple[str, str]:
         build_path = os.path.join(location, "gallery_build.py")
 
         if os.path.exists(init_path) and os.path.exists(build_path):
-            init_script = init_path
-            build_script = build_path
+            # Absolute: the scripts run with their own directory as cwd
+            init_script = os.path.abspath(init_path)
+            build_script = os.path.abspath(build_path)
             logger.info(f"Found gallery scripts in: {location}")
             break
 
@@ -83,58 +111,96 @@ def find_gallery_scripts() -> Tuple[str, str]:
     return init_script, build_script
 
 
+def image_names(files: List[str]) -> List[str]:
+    """
+    The supported images among ``files`` (names from os.walk or os.listdir).
+    Hidden files are ignored, as the old ``*.ext`` globs did.
+    """
+    return sorted(
+        name
+        for name in files
+        if not name.startswith(".") and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def _listed_files(directory: str) -> List[str]:
+    try:
+        with os.scandir(directory) as it:
+            return [entry.name for entry in it if not entry.is_dir()]
+    except OSError:
+        return []
+
+
 def has_images(directory: str) -> bool:
     """
     Check if a directory contains any supported image files.
     """
-    for ext in IMAGE_EXTENSIONS:
-        pattern = os.path.join(directory, f"*{ext}")
-        if glob.glob(pattern, recursive=False):
-            return True
-        # Also check for uppercase extensions
-        pattern = os.path.join(directory, f"*{ext.upper()}")
-        if glob.glob(pattern, recursive=False):
-            return True
-    return False
+    return bool(image_names(_listed_files(directory)))
 
 
 def count_images(directory: str) -> int:
     """
     Count the number of image files in a directory.
     """
-    count = 0
-    for ext in IMAGE_EXTENSIONS:
-        pattern = os.path.join(directory, f"*{ext}")
-        count += len(glob.glob(pattern, recursive=False))
-        # Also check for uppercase extensions
-        pattern = os.path.join(directory, f"*{ext.upper()}")
-        count += len(glob.glob(pattern, recursive=False))
-    return count
+    return len(image_names(_listed_files(directory)))
 
 
-def find_directories_with_images(root_path: str) -> List[str]:
+def find_directories_with_images(root_path: str) -> List[ImageDirectory]:
     """
-    Recursively find all directories that contain images.
+    Recursively find all directories that contain images, classified from the
+    file names os.walk already listed (no extra directory reads).
     """
     directories_with_images = []
 
     for root, dirs, files in os.walk(root_path):
         # Skip hidden directories and common non-gallery directories
-        dirs[:] = [
-            d
-            for d in dirs
-            if not d.startswith(".") and d not in ["node_modules", "__pycache__"]
-        ]
-
-        if has_images(root):
-            directories_with_images.append(root)
-            logger.info(
-                f"Found directory with images: {root} ({count_images(root)} images)"
-            )
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in SKIP_DIRS]
+
+        images = image_names(files)
+        if images:
+            directories_with_images.append(ImageDirectory(root, images))
+            logger.info(f"Found directory with images: {root} ({len(images)} images)")
 
     return directories_with_images
 
 
+def gallery_fingerprint(image_dir: ImageDirectory, config: Dict[str, Any]) -> str:
+    """
+    Hash of the directory's image list (name, size, mtime) and its gallery config.
+    """
+    entries = []
+    for name in image_dir.images:
+        try:
+            st = os.stat(os.path.join(image_dir.path, name))
+        except OSError:
+            continue
+        entries.append([name, st.st_size, st.st_mtime_ns])
+    canonical = json.dumps({"images": entries, "config": config}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def read_fingerprint(directory: str) -> Optional[str]:
+    """
+    Fingerprint recorded by the last successful build, if any.
+    """
+    try:
+        with open(os.path.join(directory, FINGERPRINT_NAME), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_fingerprint(directory: str, fingerprint: str) -> None:
+    """
+    Record a successful build (atomic replace).
+    """
+    path = os.path.join(directory, FINGERPRINT_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(fingerprint + "\n")
+    os.replace(tmp, path)
+
+
 def is_gallery_initialized(directory: str) -> bool:
     """
     Check if a directory already has a gallery initialized.
@@ -157,7 +223,7 @@ def initialize_gallery(directory: str, init_script: str, force: bool = False) ->
         # Get the directory containing the init script
         script_dir = os.path.dirname(init_script)
 
-        cmd = [sys.executable, init_script, "--path", directory, "--use-defaults"]
+        cmd = [sys.executable, init_script, "--path", os.path.abspath(directory), "--use-defaults"]
 
         if force:
             cmd.append("--force")
@@ -189,7 +255,7 @@ def build_gallery(
         # Get the directory containing the build script
         script_dir = os.path.dirname(build_script)
 
-        cmd = [sys.executable, build_script, "--path", directory]
+        cmd = [sys.executable, build_script, "--path", os.path.abspath(directory)]
 
         if force_thumbnails:
             cmd.append("--force-thumbnails")
@@ -347,12 +413,13 @@ def detect_gallery_type(directory: str) -> str:
         return "local"
 
 
-def get_gallery_config_for_directory(directory: str) -> Dict[str, Any]:
+def get_gallery_config_for_directory(directory: str, image_count: Optional[int] = None) -> Dict[str, Any]:
     """
     Get appropriate configuration for a directory based on its contents and name.
     """
     dir_name = os.path.basename(directory)
-    image_count = count_images(directory)
+    if image_count is None:
+        image_count = count_images(directory)
 
     # Base configuration
     config = {
@@ -395,6 +462,109 @@ def get_gallery_config_for_directory(directory: str) -> Dict[str, Any]:
     return config
 
 
+def build_config(image_dir: ImageDirectory, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Gallery configuration for one directory with the command line overrides applied.
+    """
+    directory = image_dir.path
+
+    # Get configuration for this directory
+    config = get_gallery_config_for_directory(directory, len(image_dir.images))
+
+    # Apply command line overrides
+    config.update(
+        {
+            "thumbnail_height": args.thumbnail_size,
+            "thumbnail_quality": args.thumbnail_quality,
+            "date_format": args.date_format,
+            "sort_by": args.sort_by,
+            "reverse_sort": args.reverse_sort,
+            "max_images": args.max_images,
+            "enable_search": args.enable_search,
+            "enable_filtering": args.enable_filtering,
+            "enable_download": args.enable_download,
+            "enable_fullscreen": args.enable_fullscreen,
+            "enable_zoom": args.enable_zoom,
+            "enable_slideshow": args.enable_slideshow,
+            "slideshow_interval": args.slideshow_interval,
+            "enable_lazy_loading": args.enable_lazy_loading,
+            "enable_compression": args.enable_compression,
+            "compression_level": args.compression_level,
+            "enable_caching": args.enable_caching,
+            "cache_duration": args.cache_duration,
+            "enable_debug": args.enable_debug,
+            "log_level": args.log_level,
+        }
+    )
+
+    # Add watermark if enabled
+    if args.enable_watermark and args.watermark_text:
+        config.update(
+            {
+                "enable_auto_watermark": True,
+                "auto_watermark_text": args.watermark_text,
+            }
+        )
+
+    # Add social features if enabled
+    if args.enable_social:
+        config.update(
+            {
+                "enable_social_sharing": True,
+                "social_platforms": ["facebook", "twitter", "pinterest"],
+            }
+        )
+
+    # Add analytics if enabled
+    if args.enable_analytics:
+        config.update(
+            {
+                "enable_analytics": True,
+                "analytics_id": f"GA-{os.path.basename(directory)}",
+            }
+        )
+
+    # Add upload if enabled
+    if args.enable_upload:
+        config.update(
+            {
+                "enable_upload": True,
+                "upload_provider": "aws",
+                "upload_config": {
+                    "bucket": f"gallery-{os.path.basename(directory)}",
+                    "region": "us-east-1",
+                },
+            }
+        )
+
+    return config
+
+
+def process_directory(
+    directory: str,
+    config: Dict[str, Any],
+    init_script: str,
+    build_script: str,
+    initialize: bool,
+    force: bool = False,
+    force_thumbnails: bool = False,
+) -> bool:
+    """
+    Initialize (if needed), configure and build one gallery. Runs in a worker thread;
+    the heavy lifting happens in the init/build subprocesses.
+    """
+    # Initialize gallery
+    if initialize and not initialize_gallery(directory, init_script, force):
+        return False
+
+    # Create enhanced configuration
+    if not create_enhanced_gallery_config(directory, **config):
+        return False
+
+    # Build gallery
+    return build_gallery(directory, build_script, force_thumbnails)
+
+
 def main():
     """main function."""
 
@@ -537,6 +707,12 @@ def main():
         help="Cache duration in seconds (default: CONSTANT_3600)",
     )
     parser.add_argument("--enable-debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Galleries built at the same time (default: one per core)",
+    )
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
@@ -573,117 +749,77 @@ def main():
 
     logger.info(f"Found {len(directories_with_images)} directories with images")
 
-    # Process each directory
-    success_count = 0
+    # Decide what to do with each directory
     skip_count = 0
-    error_count = 0
+    unchanged_count = 0
+    pending = []
 
-    for directory in directories_with_images:
+    for image_dir in directories_with_images:
+        directory = image_dir.path
         logger.info(f"\n{'='*60}")
         logger.info(f"Processing: {directory}")
 
+        config = build_config(image_dir, args)
+        fingerprint = gallery_fingerprint(image_dir, config)
+        initialized = is_gallery_initialized(directory)
+
         # Check if gallery already exists
-        if is_gallery_initialized(directory) and not args.force:
-            logger.info(f"Gallery already exists in {directory}, skipping...")
-            skip_count += 1
-            continue
+        if initialized and not args.force:
+            recorded = read_fingerprint(directory)
+            if recorded is None:
+                logger.info(f"Gallery already exists in {directory}, skipping...")
+                skip_count += 1
+                continue
+            if recorded == fingerprint:
+                logger.info(f"Gallery unchanged in {directory}, skipping...")
+                unchanged_count += 1
+                continue
+            logger.info(f"Images or settings changed in {directory}, rebuilding...")
 
         if args.dry_run:
             logger.info(f"[DRY RUN] Would process: {directory}")
             continue
 
-        # Get configuration for this directory
-        config = get_gallery_config_for_directory(directory)
+        pending.append((directory, config, fingerprint, not initialized or args.force))
 
-        # Apply command line overrides
-        config.update(
-            {
-                "thumbnail_height": args.thumbnail_size,
-                "thumbnail_quality": args.thumbnail_quality,
-                "date_format": args.date_format,
-                "sort_by": args.sort_by,
-                "reverse_sort": args.reverse_sort,
-                "max_images": args.max_images,
-                "enable_search": args.enable_search,
-                "enable_filtering": args.enable_filtering,
-                "enable_download": args.enable_download,
-                "enable_fullscreen": args.enable_fullscreen,
-                "enable_zoom": args.enable_zoom,
-                "enable_slideshow": args.enable_slideshow,
-                "slideshow_interval": args.slideshow_interval,
-                "enable_lazy_loading": args.enable_lazy_loading,
-                "enable_compression": args.enable_compression,
-                "compression_level": args.compression_level,
-                "enable_caching": args.enable_caching,
-                "cache_duration": args.cache_duration,
-                "enable_debug": args.enable_debug,
-                "log_level": args.log_level,
+    # Build the galleries, several init/build processes at once
+    success_count = 0
+    error_count = 0
+    if pending:
+        jobs = max(1, min(args.jobs, len(pending)))
+        logger.info(f"\nBuilding {len(pending)} galleries with {jobs} workers")
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(
+                    process_directory,
+                    directory,
+                    config,
+                    init_script,
+                    build_script,
+                    initialize,
+                    args.force,
+                    args.force_thumbnails,
+                ): (directory, fingerprint)
+                for directory, config, fingerprint, initialize in pending
             }
-        )
-
-        # Add watermark if enabled
-        if args.enable_watermark and args.watermark_text:
-            config.update(
-                {
-                    "enable_auto_watermark": True,
-                    "auto_watermark_text": args.watermark_text,
-                }
-            )
-
-        # Add social features if enabled
-        if args.enable_social:
-            config.update(
-                {
-                    "enable_social_sharing": True,
-                    "social_platforms": ["facebook", "twitter", "pinterest"],
-                }
-            )
-
-        # Add analytics if enabled
-        if args.enable_analytics:
-            config.update(
-                {
-                    "enable_analytics": True,
-                    "analytics_id": f"GA-{os.path.basename(directory)}",
-                }
-            )
-
-        # Add upload if enabled
-        if args.enable_upload:
-            config.update(
-                {
-                    "enable_upload": True,
-                    "upload_provider": "aws",
-                    "upload_config": {
-                        "bucket": f"gallery-{os.path.basename(directory)}",
-                        "region": "us-east-1",
-                    },
-                }
-            )
-
-        # Initialize gallery
-        if not initialize_gallery(directory, init_script, args.force):
-            error_count += 1
-            continue
-
-        # Create enhanced configuration
-        if not create_enhanced_gallery_config(directory, **config):
-            error_count += 1
-            continue
-
-        # Build gallery
-        if not build_gallery(directory, build_script, args.force_thumbnails):
-            error_count += 1
-            continue
-
-        success_count += 1
-        logger.info(f"Successfully processed: {directory}")
+            for future in as_completed(futures):
+                directory, fingerprint = futures[future]
+                if not future.result():
+                    error_count += 1
+                    continue
+                try:
+                    write_fingerprint(directory, fingerprint)
+                except OSError as e:
+                    logger.warning(f"Could not record fingerprint for {directory}: {e}")
+                success_count += 1
+                logger.info(f"Successfully processed: {directory}")
 
     # Summary
     logger.info(f"\n{'='*60}")
     logger.info("ENHANCED BATCH PROCESSING COMPLETE")
     logger.info(f"Successfully processed: {success_count}")
     logger.info(f"Skipped (already exists): {skip_count}")
+    logger.info(f"Skipped (unchanged): {unchanged_count}")
     logger.info(f"Errors: {error_count}")
     logger.info(f"Total directories found: {len(directories_with_images)}")
 
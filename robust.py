@@ -16,9 +16,23 @@ from collections import defaultdict, Counter
 import mimetypes
 import signal
 import time
+import logging
+
+from minhash_lsh import DEFAULT_BANDS, DEFAULT_ROWS, MinHashLSH
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+CONSTANT_100 = 100
+CONSTANT_200 = 200
+CONSTANT_500 = 500
+CONSTANT_1024 = 1024
+
 
 class RobustFileProcessor:
-    def __init__(self, file_list_path, base_dir=Path("/Users/steven")):
+    def __init__(self, file_list_path, base_dir=Path("/Users/steven"),
+                 similarity_threshold=0.8, lsh_bands=DEFAULT_BANDS, lsh_rows=DEFAULT_ROWS):
         self.file_list_path = Path(file_list_path)
         self.base_dir = Path(base_dir)
         self.working_dir = self.file_list_path.parent / "robust_processing"
@@ -40,6 +54,12 @@ class RobustFileProcessor:
         self.timeout_seconds = 5
         self.priority_extensions = {'.md', '.py', '.txt', '.html', '.json'}
         
+        # Near-duplicate grouping: LSH shortlists candidates, the exact
+        # similarity score must still exceed similarity_threshold
+        self.similarity_threshold = similarity_threshold
+        self.lsh_bands = lsh_bands
+        self.lsh_rows = lsh_rows
+        
     def load_and_analyze_files(self):
         """Load file list and analyze each file's content with robust error handling"""
         logger.info("🔍 Loading and Analyzing Files (Robust Mode)")
@@ -81,20 +101,15 @@ class RobustFileProcessor:
             if not file_path.is_absolute():
                 file_path = self.base_dir / file_path
             
-            # Skip if file doesn't exist
-            if not file_path.exists():
-                skipped_count += 1
-                continue
-            
-            # Skip if file is too large
+            # Skip if file doesn't exist or is too large (one stat, reused below)
             try:
-                file_size = file_path.stat().st_size
-                if file_size > self.max_file_size:
-                    skipped_count += 1
-                    continue
+                file_stat = file_path.stat()
             except OSError:
                 skipped_count += 1
                 continue
+            if file_stat.st_size > self.max_file_size:
+                skipped_count += 1
+                continue
             
             # Skip if not a priority extension
             if file_path.suffix.lower() not in self.priority_extensions:
@@ -102,7 +117,7 @@ class RobustFileProcessor:
                 continue
             
             # Analyze file with timeout protection
-            file_info = self.analyze_file_with_timeout(file_path, line_num)
+            file_info = self.analyze_file_with_timeout(file_path, line_num, file_stat)
             if file_info:
                 self.file_data[str(file_path)] = file_info
                 processed_count += 1
@@ -114,7 +129,7 @@ class RobustFileProcessor:
         logger.info(f"⏭️  Skipped {skipped_count} files (too large, wrong extension, or errors)")
         return processed_count
     
-    def analyze_file_with_timeout(self, file_path, line_num):
+    def analyze_file_with_timeout(self, file_path, line_num, file_stat=None):
         """Analyze file with timeout protection"""
         def timeout_handler(signum, frame):
             raise TimeoutError("File analysis timed out")
@@ -125,7 +140,7 @@ class RobustFileProcessor:
             signal.alarm(self.timeout_seconds)
             
             # Analyze file
-            file_info = self.analyze_file_content(file_path, line_num)
+            file_info = self.analyze_file_content(file_path, line_num, file_stat)
             
             # Cancel timeout
             signal.alarm(0)
@@ -137,14 +152,15 @@ class RobustFileProcessor:
             signal.alarm(0)
             return None
     
-    def analyze_file_content(self, file_path, line_num):
+    def analyze_file_content(self, file_path, line_num, file_stat=None):
         """Analyze individual file content with robust error handling"""
         try:
+            file_stat = file_stat or file_path.stat()
             file_info = {
                 'path': str(file_path),
                 'line_number': line_num,
-                'size': file_path.stat().st_size,
-                'modified': datetime.fromtimestamp(file_path.stat().st_mtime),
+                'size': file_stat.st_size,
+                'modified': datetime.fromtimestamp(file_stat.st_mtime),
                 'extension': file_path.suffix.lower(),
                 'content_hash': None,
                 'content_preview': '',
@@ -371,28 +387,34 @@ class RobustFileProcessor:
         for file_path, file_info in self.file_data.items():
             type_groups[file_info['content_type']].append(file_path)
         
-        # Find similar files (top priority files only)
+        # Find similar files across the whole corpus: MinHash/LSH shortlists
+        # candidates in near-linear time, the exact score confirms them
+        ranked_files = dict(sorted_files)
+        rank = {file_path: i for i, file_path in enumerate(ranked_files)}
+        lsh = MinHashLSH(bands=self.lsh_bands, rows=self.lsh_rows)
+        for file_path, file_info in ranked_files.items():
+            lsh.add(file_path, self.similarity_shingles(file_info))
+        
+        logger.info(f"📊 LSH: {len(lsh.signatures)} files indexed "
+                    f"({self.lsh_bands} bands x {self.lsh_rows} rows, "
+                    f"~{lsh.threshold:.2f} Jaccard cut-off)")
+        
         similar_groups = []
         processed = set()
         
-        # Only process top CONSTANT_500 files to avoid timeout
-        top_files = dict(sorted_files[:CONSTANT_500])
-        
-        for file_path, file_info in top_files.items():
+        for file_path, file_info in ranked_files.items():
             if file_path in processed:
                 continue
             
             similar_files = [file_path]
             processed.add(file_path)
             
-            for other_path, other_info in top_files.items():
-                if other_path in processed:
-                    continue
+            # Candidates in priority order, as the pairwise scan visited them
+            candidates = sorted(lsh.candidates(file_path) - processed, key=rank.__getitem__)
+            for other_path in candidates:
+                similarity = self.calculate_content_similarity(file_info, ranked_files[other_path])
                 
-                # Calculate similarity
-                similarity = self.calculate_content_similarity(file_info, other_info)
-                
-                if similarity > 0.8:  # High similarity threshold
+                if similarity > self.similarity_threshold:
                     similar_files.append(other_path)
                     processed.add(other_path)
             
@@ -401,14 +423,14 @@ class RobustFileProcessor:
                     'files': similar_files,
                     'count': len(similar_files),
                     'type': 'content_similarity',
-                    'priority_score': sum(top_files[f]['priority_score'] for f in similar_files)
+                    'priority_score': sum(ranked_files[f]['priority_score'] for f in similar_files)
                 })
         
         # Find merge opportunities
-        merge_opportunities = self.find_merge_opportunities(top_files)
+        merge_opportunities = self.find_merge_opportunities(ranked_files)
         
         # Find dependency chains
-        dependency_chains = self.find_dependency_chains(top_files)
+        dependency_chains = self.find_dependency_chains(ranked_files)
         
         self.relationships = {
             'type_groups': dict(type_groups),
@@ -424,6 +446,16 @@ class RobustFileProcessor:
         
         return self.relationships
     
+    def similarity_shingles(self, file_info):
+        """Token set MinHash works on: keywords plus the content type"""
+        # calculate_content_similarity is 0 without keywords, so such files
+        # get no shingles and are never indexed
+        if not file_info['keywords']:
+            return set()
+        shingles = {f"kw:{word}" for word in file_info['keywords']}
+        shingles.add(f"type:{file_info['content_type']}")
+        return shingles
+    
     def calculate_content_similarity(self, file1_info, file2_info):
         """Calculate content similarity between two files"""
         # Keyword similarity
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Title index for matching songs to their text sidecars (analysis, transcript).
+
+The catalog builders used to test ``title in name`` against every text file
+for every MP3, which is O(songs x texts). ``SidecarIndex`` is built once
+from the sidecar names and answers each lookup with dictionary probes:
+
+* exact keys: each sidecar's name with the extension and a trailing role
+  word ("_analysis", " - Transcript...") cut off. ``My Song_analysis.txt``
+  and ``My Song - Transcript.txt`` both key to ``My Song``. The key is a
+  case-sensitive slice of the name, so an exact hit is always also a
+  substring hit and matching is never wider than the old loop's. This is
+  the common case and a single dict lookup.
+* substring fallback: a trigram -> sidecar-ids inverted index, built on
+  the first title that needs it. The posting lists of a title's trigrams
+  are intersected (rarest first) and the few survivors verified with
+  ``in``, which gives exactly the old substring semantics without
+  scanning every name.
+
+For each role, a sidecar whose exact key equals the title wins. Otherwise
+the last substring match in listing order is used, as the old loop did.
+
+Usage:
+    index = SidecarIndex(name for name in os.listdir(txt_dir) if name.endswith(".txt"))
+    analysis, transcript = index.sidecars("My Song")
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Constants
+ROLES = ("analysis", "transcript")
+GRAM = 3
+_ROLE_SUFFIX = re.compile(r"[\s_\-.(\[]*(analysis|transcript)\w*[\s_\-.)\]]*$", re.IGNORECASE)
+
+
+def sidecar_role(name: str) -> Optional[str]:
+    """``analysis`` / ``transcript`` / ``None``; analysis wins if both appear"""
+    lower = name.lower()
+    for role in ROLES:
+        if role in lower:
+            return role
+    return None
+
+
+def sidecar_key(name: str) -> str:
+    """Title a sidecar belongs to (extension and trailing role word removed)"""
+    stem = name.rsplit(".", 1)[0] if "." in name else name
+    match = _ROLE_SUFFIX.search(stem)
+    return (stem[: match.start()] if match else stem).strip()
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class SidecarIndex:
+    """Exact-key and trigram lookups over sidecar file names"""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = []
+        self.roles: List[Optional[str]] = []
+        self.exact: Dict[Tuple[str, str], int] = {}
+        self._postings: Optional[Dict[str, List[int]]] = None
+
+        for i, name in enumerate(names):
+            role = sidecar_role(name)
+            self.names.append(name)
+            self.roles.append(role)
+            if role is None:
+                # Neither an analysis nor a transcript: can never be returned
+                continue
+            # Later names overwrite earlier ones, like the old loop
+            self.exact[(sidecar_key(name), role)] = i
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def postings(self) -> Dict[str, List[int]]:
+        """Trigram inverted index, built on the first substring lookup"""
+        if self._postings is None:
+            postings: Dict[str, List[int]] = defaultdict(list)
+            for i, name in enumerate(self.names):
+                if self.roles[i]:
+                    for gram in _grams(name):
+                        postings[gram].append(i)
+            self._postings = postings
+        return self._postings
+
+    def substring_matches(self, title: str) -> List[int]:
+        """Ids (in listing order) of role-bearing sidecars whose name contains ``title``"""
+        grams = _grams(title)
+        if not grams:
+            # Too short for a trigram: fall back to a scan
+            return [i for i, name in enumerate(self.names) if self.roles[i] and title in name]
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return sorted(i for i in candidates if title in self.names[i])
+
+    def sidecars(self, title: str) -> Tuple[Optional[str], Optional[str]]:
+        """(analysis, transcript) sidecar names for ``title``"""
+        found = {role: self.exact.get((title, role)) for role in ROLES}
+        if any(i is None for i in found.values()):
+            for i in self.substring_matches(title):
+                role = self.roles[i]
+                if self.exact.get((title, role)) is None:
+                    found[role] = i
+        return tuple(self.names[found[role]] if found[role] is not None else None for role in ROLES)
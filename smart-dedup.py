@@ -10,7 +10,6 @@ CONSTANT_100 = 100
 CONSTANT_256 = 256
 CONSTANT_1000 = 1000
 CONSTANT_1024 = 1024
-CONSTANT_65536 = 65536
 CONSTANT_1000000 = 1000000
 
 #!/usr/bin/env python3
@@ -31,15 +30,17 @@ Features:
 
 import os
 import sys
-import hashlib
 import json
 import shutil
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 from typing import Dict, List, Tuple, Optional
 import argparse
 
+from dedup_engine import StagedDuplicateFinder
+from fast_walk import walk_files
+from hash_cache import HashCache
+
 # Color codes
 class Colors:
     HEADER = '\CONSTANT_33[95m'
@@ -80,17 +81,22 @@ class SmartDeduplicator:
     }
 
     def __init__(self, dry_run: bool = True, interactive: bool = True,
-                 backup_dir: Optional[str] = None):
+                 backup_dir: Optional[str] = None, use_hash_cache: bool = True,
+                 hash_cache_db: Optional[str] = None, workers="1"):
         self.dry_run = dry_run
         self.interactive = interactive
+        self.workers = workers if workers == 'auto' else int(workers)
         self.backup_dir = backup_dir or Path(str(Path.home()) + "/Documents/python/dedup_backup")
+        self.hash_cache = HashCache(hash_cache_db) if use_hash_cache else None
 
         self.stats = {
             'total_dupes': 0,
             'files_deleted': 0,
             'files_kept': 0,
             'space_saved': 0,
-            'groups_processed': 0
+            'groups_processed': 0,
+            'bytes_hashed': 0,
+            'hash_throughput': 0.0
         }
 
         self.deletion_log = []
@@ -102,53 +108,41 @@ class SmartDeduplicator:
         logger.info(f"{emoji} {text}")
         logger.info(f"{'='*80}{Colors.END}\n")
 
-    def calculate_hash(self, filepath: Path) -> str:
-        """Calculate SHA-CONSTANT_256 hash"""
-        try:
-            hasher = hashlib.sha256()
-            with open(filepath, 'rb') as f:
-                for chunk in iter(lambda: f.read(CONSTANT_65536), b''):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except Exception as e:
-            return f"ERROR: {str(e)}"
-
     def find_duplicates(self, directories: List[str]) -> Dict[str, List[str]]:
         """Find all duplicate files in directories"""
         self.print_header("SCANNING FOR DUPLICATES", Colors.CYAN, Emojis.BRAIN)
 
-        hash_to_files = defaultdict(list)
+        # Hashing starts in the worker pool while the walk is still running
+        finder = StagedDuplicateFinder(algorithm="sha256", cache=self.hash_cache,
+                                       workers=self.workers)
         file_count = 0
 
         for directory in directories:
             logger.info(f"{Colors.CYAN}{Emojis.FOLDER} Scanning: {directory}{Colors.END}")
 
-            for root, dirs, files in os.walk(directory):
-                # Skip hidden directories and common ignore patterns
-                dirs[:] = [d for d in dirs if not d.startswith('.')
-                          and d != '__pycache__' and d != 'node_modules']
+            # Skip hidden files/directories (.DS_Store, .git) and common ignore patterns;
+            # the walk's stat supplies size and device, so nothing is stat'ed twice
+            for record in walk_files(str(directory), skip_dirs={'__pycache__', 'node_modules'},
+                                     skip_hidden=True):
+                finder.add(record.path, record.size, record.dev)
+                file_count += 1
 
-                for filename in files:
-                    # Skip hidden files and .DS_Store
-                    if filename.startswith('.'):
-                        continue
-
-                    filepath = Path(root) / filename
-                    try:
-                        file_hash = self.calculate_hash(filepath)
-                        if not file_hash.startswith("ERROR"):
-                            hash_to_files[file_hash].append(str(filepath))
-                            file_count += 1
-
-                            if file_count % CONSTANT_100 == 0:
-                                logger.info(f"{Colors.YELLOW}  Processed: {file_count} files...{Colors.END}", end='\r')
-                    except Exception as e:
-                        pass
+                if file_count % CONSTANT_100 == 0:
+                    logger.info(f"{Colors.YELLOW}  Found: {file_count} files...{Colors.END}")
 
         logger.info(f"\n{Colors.GREEN}{Emojis.CHECK} Scanned {file_count} files{Colors.END}")
 
-        # Filter to only duplicates
-        duplicates = {h: files for h, files in hash_to_files.items() if len(files) > 1}
+        # Only files sharing a size (then a partial hash) are ever hashed in full
+        duplicates = finder.find_duplicates()
+        self.stats['bytes_hashed'] = finder.stats['bytes_read']
+        self.stats['hash_throughput'] = finder.throughput()
+        logger.info(f"{Colors.CYAN}  Full hashes: {finder.stats['full_hashed']:,} | "
+                    f"Read: {finder.stats['bytes_read'] / (CONSTANT_1024**2):.2f} MB | "
+                    f"Throughput: {self.stats['hash_throughput'] / (CONSTANT_1024**2):.1f} MB/s "
+                    f"({self.workers} workers){Colors.END}")
+        if self.hash_cache:
+            self.hash_cache.close()
+            logger.info(f"{Colors.CYAN}  {self.hash_cache.summary()}{Colors.END}")
 
         total_dupes = sum(len(files) - 1 for files in duplicates.values())
         self.stats['total_dupes'] = total_dupes
@@ -340,6 +334,11 @@ class SmartDeduplicator:
             f.write(f"| **Files Deleted** | {self.stats['files_deleted']:,} |\n")
             f.write(f"| **Files Kept** | {self.stats['files_kept']:,} |\n")
             f.write(f"| **Space Saved** | {self.stats['space_saved'] / (CONSTANT_1024**2):.2f} MB |\n")
+            f.write(f"| **Data Hashed** | {self.stats['bytes_hashed'] / (CONSTANT_1024**2):.2f} MB |\n")
+            f.write(f"| **Hash Throughput** | {self.stats['hash_throughput'] / (CONSTANT_1024**2):.1f} MB/s |\n")
+            if self.hash_cache:
+                f.write(f"| **Hash Cache Hits** | {self.hash_cache.hits:,} |\n")
+                f.write(f"| **Hash Cache Misses** | {self.hash_cache.misses:,} |\n")
             f.write(f"| **Backup Location** | `{self.backup_dir}` |\n\n")
 
             # Deleted files
@@ -418,6 +417,8 @@ class SmartDeduplicator:
         logger.info(f"  {Emojis.FIRE} Groups Processed: {Colors.CYAN}{self.stats['groups_processed']:,}{Colors.END}")
         logger.info(f"  {Emojis.TRASH} Files Deleted: {Colors.CYAN}{self.stats['files_deleted']:,}{Colors.END}")
         logger.info(f"  {Emojis.KEEP} Files Kept: {Colors.CYAN}{self.stats['files_kept']:,}{Colors.END}")
+        if self.hash_cache:
+            logger.info(f"  {Emojis.BRAIN} {self.hash_cache.summary()}")
         logger.info(f"  💾 Space Saved: {Colors.CYAN}{self.stats['space_saved'] / (CONSTANT_1024**2):.2f} MB{Colors.END}\n")
 
         logger.info(f"{Colors.BOLD}📝 OUTPUTS:{Colors.END}\n")
@@ -448,6 +449,9 @@ Examples:
 
   # Batch mode (no confirmation, dry run):
   python smart_deduplication_tool.py --dry-run --batch
+
+  # Parallel hashing, sized per device:
+  python smart_deduplication_tool.py --batch --workers auto
         """
     )
 
@@ -463,6 +467,13 @@ Examples:
                        help='Custom backup directory')
     parser.add_argument('--dirs', nargs='+',
                        help='Custom directories to scan (default: python dirs)')
+    parser.add_argument('--hash-cache', type=str,
+                       help='Hash cache database (default: ~/.cache/pythons/hash_cache.db)')
+    parser.add_argument('--no-hash-cache', action='store_true',
+                       help='Hash every candidate from scratch')
+    parser.add_argument('--workers', type=str, default='1',
+                       help="Hashing threads, or 'auto' to size per device "
+                            "(fewer on spinning disks, more on SSD/NFS)")
 
     args = parser.parse_args()
 
@@ -481,7 +492,10 @@ Examples:
     dedup = SmartDeduplicator(
         dry_run=dry_run,
         interactive=interactive,
-        backup_dir=args.backup_dir
+        backup_dir=args.backup_dir,
+        use_hash_cache=not args.no_hash_cache,
+        hash_cache_db=args.hash_cache,
+        workers=args.workers
     )
 
     # Run
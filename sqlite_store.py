@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Common base for the SQLite-backed caches and indexes under ~/.cache/pythons/.
+
+Every store opens its database the same way (parent folder created, WAL
+journal, ``synchronous=NORMAL``), batches writes into one transaction per
+``commit_every`` changes, commits on close and works as a context manager.
+``SQLiteStore`` holds that part; subclasses set ``default_path`` (and
+optionally ``commit_every``), create their tables in ``init_database`` and
+call ``_tick()`` after each write.
+
+Usage:
+    class MyIndex(SQLiteStore):
+        default_path = Path.home() / ".cache" / "pythons" / "my_index.db"
+
+        def init_database(self):
+            self.conn.execute("CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.commit()
+
+        def put(self, key, value):
+            self.conn.execute("INSERT OR REPLACE INTO items VALUES (?, ?)", (key, value))
+            self._tick()
+
+    with MyIndex() as index:
+        index.put("a", "b")
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+# Constants
+COMMIT_EVERY = 500
+
+
+class SQLiteStore:
+    """WAL-mode SQLite connection with batched commits"""
+
+    default_path: Optional[Path] = None
+    commit_every = COMMIT_EVERY
+
+    def __init__(self, db_path: Optional[os.PathLike] = None):
+        if not db_path and self.default_path is None:
+            raise ValueError(f"{type(self).__name__} needs a database path")
+        self.db_path = Path(db_path) if db_path else self.default_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._pending = 0
+        self.init_database()
+
+    def init_database(self):
+        """Create the store's tables if needed"""
+
+    def _tick(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """Flush pending writes"""
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        """Commit and close the connection"""
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
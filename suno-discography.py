@@ -4,13 +4,138 @@ AlchemyAPI Discography Merger
 Merges Suno and NocTurnE MeLoDies discography data for QuantumForgeLabs integration
 """
 
+import argparse
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import json
+import logging
 import os
 from datetime import datetime
+from difflib import SequenceMatcher
 import re
 
+logger = logging.getLogger(__name__)
+
+
+# Constants
+FUZZY_THRESHOLD = 0.9  # SequenceMatcher ratio for near-duplicate titles
+FUZZY_WINDOW = 8  # Neighbours compared in each sorted order
+MAX_KEY_CHARS = 64  # Characters of each end compared in the vectorized pass
+FUZZY_SLACK = 0.1  # How far below the threshold a cheap score still gets a full comparison
+FUZZY_MIN_CHARS = 8  # Shorter compact titles are never fuzzy-matched ("Ocean" / "Oceans")
+FUZZY_MIN_LENGTH_RATIO = 0.9  # Shorter / longer compact length a fuzzy pair needs
+LOG_EXAMPLES = 10
+
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+_NUMBER = re.compile(r"\d+")
+
+
+def _compact_title(title):
+    """Lowercase letters and digits only: the key near-duplicates are compared on"""
+    return _NON_ALNUM.sub("", title.lower())
+
+
+def _title_digits(title):
+    # "Part 1" / "Part 2" are different songs however similar the rest is
+    return _NUMBER.findall(title)
+
+
+def _char_matrix(keys):
+    """(n, MAX_KEY_CHARS) uint32 code points, zero-padded, for vectorized comparisons"""
+    fixed = np.array([k[:MAX_KEY_CHARS] for k in keys], dtype=f"U{MAX_KEY_CHARS}")
+    return fixed.view(np.uint32).reshape(len(keys), MAX_KEY_CHARS)
+
+
+def _common_run(chars, step):
+    """Common leading run of each row of ``chars`` with the row ``step`` below it"""
+    differs = chars[:-step] != chars[step:]
+    return np.where(differs.any(axis=1), differs.argmax(axis=1), chars.shape[1])
+
+
+def find_similar_titles(titles, threshold=FUZZY_THRESHOLD, window=FUZZY_WINDOW):
+    """Clusters of indexes into ``titles`` whose compact forms nearly match.
+
+    Blocking by sorted neighbourhood: titles are sorted by their compact
+    key and by the reversed key, and each one is only compared with the
+    next ``window`` titles in either order. A typo near the end keeps the
+    shared prefix adjacent in the first order, one near the start keeps
+    the shared suffix adjacent in the second.
+
+    All neighbour pairs at the same distance are scored at once with numpy:
+    common prefix + common suffix is a lower bound on the matching
+    characters, so a pair that differs in one stretch (a typo, an inserted
+    or dropped word) clears the threshold on it directly. Pairs within
+    FUZZY_SLACK below it get the full ``SequenceMatcher`` ratio, the rest
+    are rejected. Titles whose numbers differ never match, and neither do
+    titles shorter than FUZZY_MIN_CHARS or whose lengths differ by more
+    than FUZZY_MIN_LENGTH_RATIO allows.
+
+    Clusters do not chain: matched pairs are taken best first and a title
+    only joins a cluster if it also matches the cluster's first title, so
+    A ~ B ~ C does not put A and C together unless they match themselves.
+    """
+    compact = [_compact_title(t) for t in titles]
+    usable = np.array([i for i, key in enumerate(compact) if len(key) >= FUZZY_MIN_CHARS], dtype=np.int64)
+    if len(usable) < 2:
+        return []
+    keys = [compact[i] for i in usable]
+    lengths = np.array([len(k) for k in keys])
+    numbers = np.array(["/".join(_title_digits(titles[i])) for i in usable])
+    forward = _char_matrix(keys)
+    backward = _char_matrix([k[::-1] for k in keys])
+
+    def ratio(a, b):
+        return SequenceMatcher(None, keys[a], keys[b], autojunk=False).ratio()
+
+    def matches(a, b):
+        if keys[a] == keys[b]:
+            return True
+        return numbers[a] == numbers[b] and ratio(a, b) >= threshold and (
+            min(lengths[a], lengths[b]) >= FUZZY_MIN_LENGTH_RATIO * max(lengths[a], lengths[b])
+        )
+
+    pairs = {}
+    for order in (np.argsort(np.array(keys)), np.argsort(np.array([k[::-1] for k in keys]))):
+        # Rows in sorted order, so each neighbour distance is a plain slice
+        ahead, behind = forward[order], backward[order]
+        for step in range(1, min(window, len(order) - 1) + 1):
+            i, j = order[:-step], order[step:]
+            shortest = np.minimum(lengths[i], lengths[j])
+            shared = np.minimum(_common_run(ahead, step) + _common_run(behind, step), shortest)
+            # ratio = 2 * matches / (len(a) + len(b))
+            score = 2 * shared / (lengths[i] + lengths[j])
+            candidates = (
+                (score >= threshold - FUZZY_SLACK)
+                & (numbers[i] == numbers[j])
+                & (shortest >= FUZZY_MIN_LENGTH_RATIO * np.maximum(lengths[i], lengths[j]))
+            )
+            for a, b, sc in zip(i[candidates], j[candidates], score[candidates]):
+                a, b = min(a, b), max(a, b)
+                if (a, b) not in pairs:
+                    # The lower bound is exact for one-stretch differences
+                    sc = sc if sc >= threshold else ratio(a, b)
+                    if sc >= threshold:
+                        pairs[a, b] = sc
+
+    # Best pairs first; a title joins a cluster only if it matches its head
+    head = {}
+    clusters = {}
+    for (a, b), _ in sorted(pairs.items(), key=lambda item: (-item[1], item[0])):
+        if a in head and b in head:
+            continue
+        if a not in head and b not in head:
+            head[a] = head[b] = a
+            clusters[a] = [a, b]
+            continue
+        joined, new = (a, b) if a in head else (b, a)
+        first = head[joined]
+        if matches(first, new):
+            head[new] = first
+            clusters[first].append(new)
+    return [sorted(int(usable[k]) for k in members) for _, members in sorted(clusters.items())]
+
 
 class DiscographyMerger:
     def __init__(self):
@@ -90,7 +215,7 @@ class DiscographyMerger:
         if self.nocturne_data is not None:
             self.nocturne_data["source"] = "NocTurnE"
 
-    def merge_datasets(self):
+    def merge_datasets(self, fuzzy_threshold=None):
         """Merge the two datasets, handling duplicates"""
         if self.suno_data is None and self.nocturne_data is None:
             logger.info("❌ No data to merge")
@@ -115,36 +240,75 @@ class DiscographyMerger:
             logger.info(f"🔄 Removed {duplicates_removed} exact duplicates")
 
         # Handle similar song titles (fuzzy matching for potential duplicates)
-        self.handle_similar_titles()
+        self.handle_similar_titles(fuzzy_threshold)
 
         logger.info(f"✅ Merged dataset: {len(self.merged_data)} unique tracks")
         return True
 
-    def handle_similar_titles(self):
-        """Handle similar song titles that might be duplicates"""
+    def handle_similar_titles(self, fuzzy_threshold=None):
+        """Handle similar song titles that might be duplicates.
+
+        Exact matches on the normalized title are collapsed in one
+        sort + drop_duplicates pass, keeping the most complete row (fewest
+        nulls, earliest on ties). Near-duplicate titles found by
+        ``find_similar_titles`` are only collapsed when ``fuzzy_threshold``
+        is given (e.g. FUZZY_THRESHOLD); by default they are left alone.
+        """
         if "song_title" not in self.merged_data.columns:
             return
 
+        data = self.merged_data
         # Group by normalized titles
-        self.merged_data["normalized_title"] = (
-            self.merged_data["song_title"].str.lower().str.strip()
+        data["normalized_title"] = (
+            data["song_title"].str.lower().str.strip()
         )
+        completeness = data.notna().sum(axis=1)
 
-        # Find potential duplicates
-        title_groups = self.merged_data.groupby("normalized_title")
-        potential_duplicates = title_groups.filter(lambda x: len(x) > 1)
-
-        if len(potential_duplicates) > 0:
+        group_sizes = data["normalized_title"].value_counts()
+        repeated = group_sizes[group_sizes > 1]
+        if len(repeated) > 0:
             logger.info(
-                f"🔍 Found {len(potential_duplicates)} potential duplicates to review:"
+                f"🔍 Found {int(repeated.sum())} potential duplicates in {len(repeated)} title groups:"
             )
-            for title, group in potential_duplicates.groupby("normalized_title"):
-                logger.info(f"  - '{title}': {len(group)} versions")
-                # Keep the most complete version (most non-null values)
-                most_complete = group.isnull().sum(axis=1).idxmin()
-                duplicates_to_remove = group.index[group.index != most_complete]
-                self.merged_data = self.merged_data.drop(duplicates_to_remove)
-                logger.info(f"    Kept version with index {most_complete}")
+            for title, count in repeated.head(LOG_EXAMPLES).items():
+                logger.info(f"  - '{title}': {count} versions")
+            if len(repeated) > LOG_EXAMPLES:
+                logger.info(f"  ... and {len(repeated) - LOG_EXAMPLES} more groups")
+
+        # Keep the most complete version of each title (most non-null values)
+        data = self._keep_most_complete(data, data["normalized_title"], completeness)
+
+        if fuzzy_threshold:
+            titles = data["normalized_title"].tolist()
+            clusters = find_similar_titles([t if isinstance(t, str) else "" for t in titles], fuzzy_threshold)
+            if clusters:
+                logger.info(f"🔍 Found {len(clusters)} near-duplicate title groups:")
+                for members in clusters[:LOG_EXAMPLES]:
+                    logger.info("  - " + " ~ ".join(f"'{titles[i]}'" for i in members))
+                # Every member of a cluster shares the key of its first member
+                cluster_key = list(titles)
+                for members in clusters:
+                    for i in members:
+                        cluster_key[i] = titles[members[0]]
+                data = self._keep_most_complete(data, pd.Series(cluster_key, index=data.index), completeness)
+
+        removed = len(self.merged_data) - len(data)
+        if removed:
+            logger.info(f"    Kept the most complete version of each title ({removed} rows removed)")
+        self.merged_data = data
+
+    @staticmethod
+    def _keep_most_complete(data, key, completeness):
+        """First row per ``key`` after sorting by completeness (desc), then original order.
+
+        Rows without a key (missing title) are all kept, as groupby dropped them before.
+        """
+        ranked = pd.DataFrame(
+            {"key": key, "completeness": completeness.loc[data.index], "order": range(len(data))},
+            index=data.index,
+        ).sort_values(["key", "completeness", "order"], ascending=[True, False, True])
+        keep = ranked[ranked["key"].isna() | ~ranked["key"].duplicated()].sort_values("order").index
+        return data.loc[keep]
 
     def add_api_hooks(self):
         """Add AlchemyAPI integration hooks for each track"""
@@ -274,7 +438,7 @@ class DiscographyMerger:
 
         return True
 
-    def run_merge(self, suno_path, nocturne_path, output_dir):
+    def run_merge(self, suno_path, nocturne_path, output_dir, fuzzy_threshold=None):
         """Run the complete merge process"""
         logger.info("🔮 Starting AlchemyAPI Discography Merge Process...")
         logger.info("=" * 50)
@@ -293,7 +457,7 @@ class DiscographyMerger:
         self.clean_and_normalize()
 
         logger.info("\n🔗 Merging datasets...")
-        if not self.merge_datasets():
+        if not self.merge_datasets(fuzzy_threshold):
             return False
 
         logger.info("\n⚗️ Adding AlchemyAPI hooks...")
@@ -319,6 +483,17 @@ class DiscographyMerger:
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Merge Suno and NocTurnE discography CSVs")
+    parser.add_argument(
+        "--fuzzy-threshold",
+        type=float,
+        nargs="?",
+        const=FUZZY_THRESHOLD,
+        help=f"Also collapse near-duplicate titles at this similarity (default when given: {FUZZY_THRESHOLD})",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     merger = DiscographyMerger()
 
     # Define paths
@@ -327,7 +502,7 @@ def main():
     output_dir = Path(str(Path.home()) + "/tehSiTes/AlchemyAPI/merged_data")
 
     # Run merge
-    success = merger.run_merge(suno_path, nocturne_path, output_dir)
+    success = merger.run_merge(suno_path, nocturne_path, output_dir, args.fuzzy_threshold)
 
     if success:
         logger.info("\n🎉 Merge completed successfully!")
@@ -8,171 +8,39 @@ Usage:
     python suno_html_batch_extractor.py
     python suno_html_batch_extractor.py --dir ~/Documents/HTML
     python suno_html_batch_extractor.py --file specific_file.html
+    python suno_html_batch_extractor.py --dir ~/Documents/HTML --backend lxml --workers 4
+
+Pages are parsed by suno_html_engine (bs4, lxml or a streaming parser).
 """
 
 import argparse
 import csv
-import json
-import re
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional
 
-def extract_from_html(html_path: Path) -> List[Dict]:
-    """Extract song data from a single HTML file"""
+from suno_html_engine import BACKENDS, PageSongs, extract_many, songs_from_file
+
+def report(html_path: Path, page: PageSongs) -> List[Dict]:
+    """Print what was found in one file"""
     print(f"?? Processing: {html_path.name}")
-    
-    try:
-        with open(html_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-    except Exception as e:
-        print(f"   ? Error reading file: {e}")
+    if page.method == "error":
+        print(f"   ? {page.warning}")
         return []
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    songs = []
-    extracted_ids: Set[str] = set()
-    
-    # Method 1: Extract from Next.js data (best method)
-    next_data = soup.find('script', id='__NEXT_DATA__')
-    if next_data:
-        try:
-            data = json.loads(next_data.string)
-            props = data.get('props', {}).get('pageProps', {})
-            
-            # Try different data paths
-            clips = (
-                props.get('clips') or 
-                props.get('playlist', {}).get('clips') or
-                props.get('songs') or
-                props.get('library', {}).get('clips') or
-                []
-            )
-            
-            for clip in clips:
-                song_id = clip.get('id', '')
-                if not song_id or song_id in extracted_ids:
-                    continue
-                extracted_ids.add(song_id)
-                
-                songs.append({
-                    'id': song_id,
-                    'title': clip.get('title', ''),
-                    'url': f"https://suno.com/song/{song_id}",
-                    'shareUrl': f"https://suno.com/s/{song_id.split('-')[0]}",
-                    'audioUrl': clip.get('audio_url') or f"https://cdn1.suno.ai/{song_id}.mp3",
-                    'imageUrl': clip.get('image_url') or clip.get('image_large_url', ''),
-                    'videoUrl': clip.get('video_url', ''),
-                    'duration': format_duration(clip.get('duration', 0)),
-                    'author': clip.get('display_name', ''),
-                    'authorHandle': clip.get('handle', ''),
-                    'authorLink': f"https://suno.com/@{clip.get('handle', '')}" if clip.get('handle') else '',
-                    'published': clip.get('created_at', ''),
-                    'plays': clip.get('play_count', 0),
-                    'likes': clip.get('upvote_count', 0),
-                    'tags': ', '.join(clip.get('metadata', {}).get('tags', [])),
-                    'prompt': clip.get('metadata', {}).get('prompt', ''),
-                    'lyrics': clip.get('metadata', {}).get('prompt', ''),  # Suno calls it prompt
-                    'isPublic': clip.get('is_public', False),
-                    'modelVersion': clip.get('model_name', ''),
-                    'sourceFile': html_path.name,
-                })
-            
-            if songs:
-                print(f"   ? Found {len(songs)} songs via Next.js data")
-                return songs
-                
-        except (json.JSONDecodeError, KeyError, AttributeError) as e:
-            print(f"   ??  Could not parse Next.js data: {e}")
-    
-    # Method 2: Extract from HTML structure (fallback)
-    song_links = soup.find_all('a', href=re.compile(r'/song/[a-f0-9-]{36}'))
-    
-    for link in song_links:
-        href = link.get('href', '')
-        match = re.search(r'/song/([a-f0-9-]{36})', href)
-        
-        if not match:
-            continue
-        
-        song_id = match.group(1)
-        if song_id in extracted_ids:
-            continue
-        extracted_ids.add(song_id)
-        
-        # Get title
-        title = (
-            link.get('title') or 
-            link.get_text(strip=True) or
-            'Untitled'
-        )
-        
-        # Try to find container for more data
-        container = link.find_parent()
-        
-        # Extract duration
-        duration = ''
-        if container:
-            duration_el = container.find(class_=re.compile(r'font-mono'))
-            if duration_el:
-                time_match = re.search(r'\d+:\d+', duration_el.get_text())
-                if time_match:
-                    duration = time_match.group(0)
-        
-        # Extract image
-        image_url = ''
-        if container:
-            img = container.find('img', src=re.compile(r'suno'))
-            if img:
-                image_url = img.get('src') or img.get('data-src', '')
-        
-        # Extract tags
-        tags = ''
-        if container:
-            tag_links = container.find_all('a', href=re.compile(r'/style/'))
-            if tag_links:
-                tags = ', '.join(t.get_text(strip=True) for t in tag_links)
-        
-        # Extract author
-        author = ''
-        author_link = ''
-        if container:
-            author_el = container.find('a', href=re.compile(r'/@'))
-            if author_el:
-                author = author_el.get_text(strip=True)
-                author_link = author_el.get('href', '')
-        
-        songs.append({
-            'id': song_id,
-            'title': title,
-            'url': f"https://suno.com/song/{song_id}",
-            'shareUrl': f"https://suno.com/s/{song_id.split('-')[0]}",
-            'audioUrl': f"https://cdn1.suno.ai/{song_id}.mp3",
-            'imageUrl': image_url,
-            'videoUrl': '',
-            'duration': duration,
-            'author': author,
-            'authorLink': author_link,
-            'tags': tags,
-            'sourceFile': html_path.name,
-        })
-    
-    if songs:
-        print(f"   ? Found {len(songs)} songs via HTML parsing")
+    if page.warning:
+        print(f"   ??  {page.warning}")
+    if page.method == "next_data":
+        print(f"   ? Found {len(page.songs)} songs via Next.js data")
+    elif page.songs:
+        print(f"   ? Found {len(page.songs)} songs via HTML parsing")
     else:
         print(f"   ??  No songs found in this file")
-    
-    return songs
+    return page.songs
 
 
-def format_duration(seconds: float) -> str:
-    """Format duration as MM:SS"""
-    if not seconds:
-        return ''
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-    return f"{minutes}:{secs:02d}"
+def extract_from_html(html_path: Path, backend: Optional[str] = None) -> List[Dict]:
+    """Extract song data from a single HTML file"""
+    return report(html_path, songs_from_file(html_path, backend))
 
 
 def find_suno_html_files(directory: Path) -> List[Path]:
@@ -219,6 +87,8 @@ def main():
     parser.add_argument('--file', help='Single HTML file to process')
     parser.add_argument('--output', '-o', help='Output CSV file (default: auto-generated)')
     parser.add_argument('--recursive', '-r', action='store_true', help='Search directories recursively')
+    parser.add_argument('--backend', choices=['auto', *BACKENDS], help='HTML parser (default: $SUNO_HTML_BACKEND or auto)')
+    parser.add_argument('--workers', type=int, default=1, help='Files parsed in parallel processes')
     
     args = parser.parse_args()
     
@@ -246,8 +116,8 @@ def main():
     all_songs = []
     song_ids = set()
     
-    for html_file in sorted(html_files):
-        songs = extract_from_html(html_file)
+    for html_file, page in extract_many(songs_from_file, sorted(html_files), args.backend, args.workers):
+        songs = report(html_file, page)
         
         # Remove duplicates across files
         for song in songs:
@@ -1,8 +1,10 @@
 from pathlib import Path
+import argparse
 import os
 
 import pandas as pd
-from bs4 import BeautifulSoup
+
+from suno_html_engine import BACKENDS, cards_from_file, extract_many
 
 import logging
 
@@ -28,43 +30,18 @@ def predefined_file_paths():
 
 
 # Main function to process HTML files
-def extract_song_details(file_paths):
-    song_details = []
-
+def extract_song_details(file_paths, backend=None, workers=1):
+    """Card rows of every page; see suno_html_engine for the parser backends"""
+    existing = []
     for file_path in file_paths:
         if not os.path.exists(file_path):
             logger.info(f"File not found: {file_path}")
             continue
+        existing.append(file_path)
 
-        with open(file_path, "r", encoding="utf-8") as file:
-            html_content = file.read()
-
-        soup = BeautifulSoup(html_content, "html.parser")
-        for item in soup.find_all(
-            "div", class_="css-79jxux"
-        ):  # Adjust class names if needed
-            title_element = item.find("span", class_="text-primary")
-            song_url_element = item.find("a", href=True)
-            cover_url_element = item.find_previous_sibling("img", src=True)
-            genre_element = item.find("a", class_="hover:underline", href=True)
-            time_element = item.find("span", class_="text-mono")
-
-            song_details.append(
-                {
-                    "Song Title": title_element["title"] if title_element else "",
-                    "Time": time_element.text.strip() if time_element else "",
-                    "Genre": genre_element.text.strip() if genre_element else "",
-                    "Song URL": (
-                        f"https://avatararts.org/mp3/{root_folder_name}/{title.replace(' ', '_')}.mp3"
-                        if song_url_element
-                        else ""
-                    ),
-                    "Cover Url": cover_url_element["src"] if cover_url_element else "",
-                    "Lyrics": "",  # Placeholder for Lyrics
-                    "Info": "",  # Placeholder for Info
-                    "Keys": "",  # Placeholder for Keys
-                }
-            )
+    song_details = []
+    for _, rows in extract_many(cards_from_file, existing, backend, workers):
+        song_details.extend(rows)
 
     return song_details
 
@@ -73,20 +50,33 @@ def extract_song_details(file_paths):
 
 # Execution starts here
 def main():
-    logger.info("Choose an option:")
-    logger.info("1. Prompt for file paths")
-    logger.info("2. Use predefined file paths")
-    choice = input("Enter 1 or 2: ").strip()
-
-    if choice == "1":
-        file_paths = prompt_for_files()
-    elif choice == "2":
-        file_paths = predefined_file_paths()
+    parser = argparse.ArgumentParser(description="Extract Suno song cards from saved HTML pages")
+    parser.add_argument("files", nargs="*", help="HTML files (default: choose interactively)")
+    parser.add_argument(
+        "--backend", choices=["auto", *BACKENDS], help="HTML parser (default: $SUNO_HTML_BACKEND or auto)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Pages parsed in parallel processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.files:
+        file_paths = args.files
     else:
-        logger.info("Invalid choice. Exiting.")
-        return
-
-    song_details = extract_song_details(file_paths)
+        logger.info("Choose an option:")
+        logger.info("1. Prompt for file paths")
+        logger.info("2. Use predefined file paths")
+        choice = input("Enter 1 or 2: ").strip()
+
+        if choice == "1":
+            file_paths = prompt_for_files()
+        elif choice == "2":
+            file_paths = predefined_file_paths()
+        else:
+            logger.info("Invalid choice. Exiting.")
+            return
+
+    song_details = extract_song_details(file_paths, args.backend, args.workers)
     if not song_details:
         logger.info("No song details extracted.")
         return
@@ -7,46 +7,76 @@ This file was automatically merged from the following source files:
 - /Users/steven/Music/nocTurneMeLoDieS/python/CLEAN_ORGANIZED/generation/splt-1.py
 
 Combines the best features and functionality from multiple similar files.
+
+Splits saved HTML pages into one file per div/section/article element.
+Pages are parsed by suno_html_engine.split_sections (``--backend bs4``
+keeps BeautifulSoup's html.parser; anything else uses its lxml tree
+builder) and several pages can be split in parallel with ``--workers``.
+
+Usage:
+    python suno-html-splitter.py
+    python suno-html-splitter.py page1.html page2.html --output-dir chunks --workers 4
 """
 
 # Imports from all source files
+import argparse
 from pathlib import Path
-from bs4 import BeautifulSoup
 import os
 
-input_path = str(Path.home()) + "/Music/NocTurnE-meLoDieS/Song-origins-html/Raccoon Alley Album Art(83% copy).html"
-output_dir = Path(str(Path.home()) + "/Music/NocTurnE-meLoDieS/Song-origins-html/chunks")
-
-# Create output directory if it doesn't exist
-os.makedirs(output_dir, exist_ok=True)
-
-# Load the HTML content
-with open(input_path, "r", encoding="utf-8") as file:
-    html_content = file.read()
-
-# Parse HTML using BeautifulSoup
-soup = BeautifulSoup(html_content, "html.parser")
-
-# Split by a specific tag, e.g., 'div' or 'section'
-sections = soup.find_all(["div", "section", "article"])
-
-# If no sections are found, fall back to splitting by length (e.g., 10,000 characters per chunk)
-if not sections:
-    chunk_size = CONSTANT_10000
-    chunks = [
-        html_content[i : i + chunk_size]
-        for i in range(0, len(html_content), chunk_size)
-    ]
-else:
-    # Use the found sections as chunks
-    chunks = [str(section) for section in sections]
-
-# Write each chunk to a new HTML file
-for i, chunk in enumerate(chunks):
-    output_path = os.path.join(output_dir, f"chunk_{i + 1}.html")
-    with open(output_path, "w", encoding="utf-8") as chunk_file:
-        chunk_file.write(chunk)
-
-logger.info(
-    f"Successfully split the HTML into {len(chunks)} chunks, saved to: {output_dir}"
-)
+from suno_html_engine import BACKENDS, extract_many, split_sections
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+CONSTANT_10000 = 10000
+DEFAULT_INPUT = str(Path.home()) + "/Music/NocTurnE-meLoDieS/Song-origins-html/Raccoon Alley Album Art(83% copy).html"
+DEFAULT_OUTPUT = Path(str(Path.home()) + "/Music/NocTurnE-meLoDieS/Song-origins-html/chunks")
+
+
+def split_html(input_path, output_dir, sections):
+    """Write the sections of one page to ``output_dir``; returns the chunk count"""
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+
+    # If no sections are found, fall back to splitting by length (e.g., 10,000 characters per chunk)
+    if not sections:
+        with open(input_path, "r", encoding="utf-8") as file:
+            html_content = file.read()
+        chunk_size = CONSTANT_10000
+        chunks = [html_content[i : i + chunk_size] for i in range(0, len(html_content), chunk_size)]
+    else:
+        # Use the found sections as chunks
+        chunks = sections
+
+    # Write each chunk to a new HTML file
+    for i, chunk in enumerate(chunks):
+        output_path = os.path.join(output_dir, f"chunk_{i + 1}.html")
+        with open(output_path, "w", encoding="utf-8") as chunk_file:
+            chunk_file.write(chunk)
+
+    logger.info(f"Successfully split the HTML into {len(chunks)} chunks, saved to: {output_dir}")
+    return len(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split saved HTML pages into one file per section")
+    parser.add_argument("inputs", nargs="*", default=[DEFAULT_INPUT], help="HTML files to split")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT), help="Chunk folder (one subfolder per page if several)")
+    parser.add_argument("--backend", choices=["auto", *BACKENDS], help="HTML parser (default: $SUNO_HTML_BACKEND or auto)")
+    parser.add_argument("--workers", type=int, default=1, help="Pages parsed in parallel processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    for input_path, sections in extract_many(split_sections, args.inputs, args.backend, args.workers):
+        output_dir = args.output_dir
+        if len(args.inputs) > 1:
+            output_dir = os.path.join(output_dir, Path(input_path).stem)
+        split_html(input_path, output_dir, sections)
+
+
+if __name__ == "__main__":
+    main()
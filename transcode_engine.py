@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Parallel ffmpeg transcoding shared by the audio/video converter scripts.
+
+Running ``ffmpeg`` once per file with ``subprocess.run`` leaves all but one
+core idle for codecs that encode on a single thread (MP3, AAC ...).
+``run_transcodes`` keeps ``workers`` ffmpeg processes running at once
+(default: one per core) and starts the next job as soon as one exits.
+
+Each job:
+
+* is skipped when its output already exists and is newer than its input
+* writes to a ``.tmp_`` file next to the output and renames it into place
+  on success, so an interrupted run never leaves a truncated output that
+  would later count as up to date
+* is killed after ``timeout`` seconds
+* reports progress parsed from ``-progress pipe:1`` (``out_time_us``)
+
+The ffmpeg binary comes from ``ffmpeg=``, else the ``FFMPEG_BIN``
+environment variable, else ``ffmpeg`` on PATH. Any executable that takes
+the same arguments works, so a stub script that copies its input and
+prints ``progress=end`` exercises the scheduler without real codecs:
+``fake-ffmpeg.py`` is one, and ``check-transcode-engine.py`` runs the
+scheduler against it.
+
+``write_summary`` stores the per-job results and totals as JSON.
+
+Usage:
+    jobs = [TranscodeJob(src, dst, ["-acodec", "libmp3lame", "-ab", "128k"]) for src, dst in pairs]
+    results = run_transcodes(jobs, workers=4, timeout=600)
+    write_summary("transcode_summary.json", results)
+"""
+
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+DEFAULT_FFMPEG = "ffmpeg"
+TMP_PREFIX = ".tmp_"
+STDERR_TAIL = 2000
+US_PER_SECOND = 1_000_000
+
+
+class TranscodeJob(NamedTuple):
+    """One ffmpeg invocation: ``ffmpeg [input_args] -i src [output_args] dst``"""
+
+    src: str
+    dst: str
+    output_args: Sequence[str] = ()
+    input_args: Sequence[str] = ()
+
+
+class TranscodeResult(NamedTuple):
+    """What happened to a job: ``done``, ``skipped``, ``failed`` or ``timeout``"""
+
+    job: TranscodeJob
+    status: str
+    elapsed: float
+    out_seconds: float
+    error: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("done", "skipped")
+
+
+def ffmpeg_binary(ffmpeg: Optional[str] = None) -> str:
+    """The ffmpeg executable to run"""
+    return ffmpeg or os.environ.get("FFMPEG_BIN") or DEFAULT_FFMPEG
+
+
+def default_workers() -> int:
+    """One ffmpeg per core"""
+    return os.cpu_count() or 1
+
+
+def is_up_to_date(job: TranscodeJob) -> bool:
+    """True if the output exists, is non-empty and is newer than the input"""
+    try:
+        out = os.stat(job.dst)
+        return out.st_size > 0 and out.st_mtime >= os.stat(job.src).st_mtime
+    except OSError:
+        return False
+
+
+def build_command(job: TranscodeJob, output: str, ffmpeg: Optional[str] = None) -> List[str]:
+    """Full argv for ``job`` writing to ``output`` with machine-readable progress on stdout"""
+    return [
+        ffmpeg_binary(ffmpeg),
+        "-hide_banner", "-nostdin", "-nostats", "-v", "error",
+        "-progress", "pipe:1",
+        *job.input_args,
+        "-i", job.src,
+        *job.output_args,
+        "-y", output,
+    ]
+
+
+def _temp_output(dst: str) -> str:
+    # Keep the extension: ffmpeg picks the muxer from it
+    directory, name = os.path.split(dst)
+    return os.path.join(directory, f"{TMP_PREFIX}{name}")
+
+
+def transcode(
+    job: TranscodeJob,
+    ffmpeg: Optional[str] = None,
+    timeout: Optional[float] = None,
+    on_progress: Optional[Callable[[TranscodeJob, float], None]] = None,
+) -> TranscodeResult:
+    """Run one job to completion (no up-to-date check)"""
+    start = time.perf_counter()
+    tmp = _temp_output(job.dst)
+    os.makedirs(os.path.dirname(job.dst) or ".", exist_ok=True)
+    out_seconds = 0.0
+    timed_out = threading.Event()
+
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(
+                build_command(job, tmp, ffmpeg),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+            )
+        except OSError as e:
+            return TranscodeResult(job, "failed", time.perf_counter() - start, 0.0, str(e))
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill) if timeout else None
+        if timer:
+            timer.start()
+        try:
+            for line in proc.stdout:
+                key, _, value = line.strip().partition("=")
+                # out_time_ms is also in microseconds (a long-standing ffmpeg quirk)
+                if key in ("out_time_us", "out_time_ms") and value.isdigit():
+                    out_seconds = int(value) / US_PER_SECOND
+                elif key == "progress" and on_progress:
+                    on_progress(job, out_seconds)
+            returncode = proc.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+        elapsed = time.perf_counter() - start
+        if returncode == 0 and not timed_out.is_set():
+            os.replace(tmp, job.dst)
+            return TranscodeResult(job, "done", elapsed, out_seconds, None)
+
+        stderr.seek(0)
+        message = stderr.read().decode("utf-8", errors="replace").strip()[-STDERR_TAIL:]
+
+    try:
+        os.remove(tmp)
+    except OSError:
+        pass
+    if timed_out.is_set():
+        return TranscodeResult(job, "timeout", elapsed, out_seconds, f"killed after {timeout}s")
+    return TranscodeResult(job, "failed", elapsed, out_seconds, message or f"exit status {returncode}")
+
+
+def run_transcodes(
+    jobs: Iterable[TranscodeJob],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    ffmpeg: Optional[str] = None,
+    force: bool = False,
+    on_progress: Optional[Callable[[TranscodeJob, float], None]] = None,
+) -> List[TranscodeResult]:
+    """Run ``jobs`` with up to ``workers`` ffmpeg processes at once.
+
+    Results are returned in job order. Outputs newer than their inputs are
+    skipped unless ``force``.
+    """
+    jobs = list(jobs)
+    results: List[Optional[TranscodeResult]] = [None] * len(jobs)
+    pending = []
+    for i, job in enumerate(jobs):
+        if not force and is_up_to_date(job):
+            results[i] = TranscodeResult(job, "skipped", 0.0, 0.0, None)
+        else:
+            pending.append(i)
+
+    workers = max(1, min(workers or default_workers(), len(pending) or 1))
+    logger.info(f"Transcoding {len(pending)} files with {workers} workers ({len(jobs) - len(pending)} up to date)")
+
+    # Threads only wait on the ffmpeg processes, which do the actual work
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(transcode, jobs[i], ffmpeg, timeout, on_progress): i for i in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[futures[future]] = result
+            level = logging.INFO if result.ok else logging.WARNING
+            detail = f"{result.elapsed:.1f}s" if result.ok else result.error
+            logger.log(level, f"[{done}/{len(pending)}] {result.status}: {os.path.basename(result.job.src)} ({detail})")
+    return results
+
+
+def summarize(results: List[TranscodeResult], wall_seconds: Optional[float] = None) -> Dict:
+    """Totals per status plus one entry per job, ready for JSON"""
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    summary = {
+        "total": len(results),
+        "counts": counts,
+        "busy_seconds": round(sum(r.elapsed for r in results), 3),
+        "media_seconds": round(sum(r.out_seconds for r in results), 3),
+        "jobs": [
+            {
+                "src": r.job.src,
+                "dst": r.job.dst,
+                "status": r.status,
+                "elapsed": round(r.elapsed, 3),
+                "out_seconds": round(r.out_seconds, 3),
+                "error": r.error,
+            }
+            for r in results
+        ],
+    }
+    if wall_seconds is not None:
+        summary["wall_seconds"] = round(wall_seconds, 3)
+    return summary
+
+
+def write_summary(path: str, results: List[TranscodeResult], wall_seconds: Optional[float] = None) -> None:
+    """Write ``summarize(results)`` to ``path``"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summarize(results, wall_seconds), f, ensure_ascii=False, indent=2)
@@ -4,15 +4,44 @@
 ============================================
 Search for transcript/lyric files by:
 1. Filename patterns
-2. File content (grep through text files)
+2. File content (full-text index over transcript bodies)
 3. Home directory + Volumes
+
+One walk per root matches every filename pattern at once (os.scandir,
+no shell ``find``), and the stat from that walk is the only one taken.
+Matches are kept in a SQLite inventory (path, size, mtime) with an FTS5
+index over the text of transcript files. Later runs only re-read files
+whose size or mtime changed and drop rows for files that disappeared.
+
+Usage:
+    python comprehensive-transcript-search.py                   # update index + CSV report
+    python comprehensive-transcript-search.py --query "river"   # full-text search
+    python comprehensive-transcript-search.py --query "night NEAR/5 city" --no-scan
 """
 
+import argparse
+import csv
+import fnmatch
 import os
-import subprocess
-from pathlib import Path
+import re
+import sqlite3
+import sys
+import time
 from datetime import datetime
-import csv
+from pathlib import Path
+
+sys.path.append(os.path.join(sys.path[0], "../"))
+from fast_walk import scandir_files
+from sqlite_store import SQLiteStore
+
+# Constants
+DEFAULT_DB_PATH = Path.home() / ".cache" / "pythons" / "transcript_index.db"
+FILENAME_PATTERNS = ["*transcript*", "*lyrics*", "*lyric*", "*transcription*"]
+TEXT_EXTENSIONS = {".txt", ".md", ".srt", ".vtt", ".lrc", ".json", ".csv"}
+MAX_BODY_BYTES = 5 * 1024 * 1024
+COMMIT_EVERY = 500
+SEARCH_LIMIT = 50
+
 
 class Colors:
     CYAN = "\033[96m"
@@ -23,16 +52,121 @@ class Colors:
     BOLD = "\033[1m"
     END = "\033[0m"
 
+
+class TranscriptIndex(SQLiteStore):
+    """Persistent transcript inventory with an FTS5 index over file bodies"""
+
+    default_path = DEFAULT_DB_PATH
+    commit_every = COMMIT_EVERY
+
+    def __init__(self, db_path=None, patterns=FILENAME_PATTERNS):
+        # All patterns in one case-insensitive regex, tested once per file name
+        self.name_regex = re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+        super().__init__(db_path)
+
+    def init_database(self):
+        """Create the inventory and full-text tables if needed"""
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                name TEXT NOT NULL,
+                parent TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                scan_id INTEGER NOT NULL
+            )
+        """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS files_root ON files (root, scan_id)")
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS bodies USING fts5("
+            "path UNINDEXED, name, body, tokenize='unicode61 remove_diacritics 2')"
+        )
+        self.conn.commit()
+
+    def _index_body(self, path, name):
+        self.conn.execute("DELETE FROM bodies WHERE path=?", (path,))
+        if os.path.splitext(name)[1].lower() not in TEXT_EXTENSIONS:
+            return
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                body = f.read(MAX_BODY_BYTES)
+        except OSError:
+            return
+        self.conn.execute("INSERT INTO bodies (path, name, body) VALUES (?, ?, ?)", (path, name, body))
+
+    def update(self, root):
+        """Walk ``root`` once, refreshing changed matches; returns (matched, reindexed, removed)"""
+        root = os.fspath(root)
+        scan_id = time.time_ns()
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.conn.execute("SELECT path, size, mtime_ns FROM files WHERE root=?", (root,))
+        }
+
+        matched = reindexed = 0
+        for entry in scandir_files(root):
+            # The index database (and its -wal/-shm) matches "*transcript*" itself
+            if not self.name_regex.match(entry.name) or entry.path.startswith(str(self.db_path)):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            matched += 1
+            path = entry.path
+            if known.get(path) == (st.st_size, st.st_mtime_ns):
+                self.conn.execute("UPDATE files SET scan_id=? WHERE path=?", (scan_id, path))
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, root, entry.name, os.path.basename(os.path.dirname(path)), st.st_size, st.st_mtime_ns, scan_id),
+                )
+                self._index_body(path, entry.name)
+                reindexed += 1
+            self._tick()
+
+        # Whatever this walk didn't see is gone
+        stale = [(path,) for (path,) in self.conn.execute("SELECT path FROM files WHERE root=? AND scan_id!=?", (root, scan_id))]
+        self.conn.executemany("DELETE FROM bodies WHERE path=?", stale)
+        self.conn.executemany("DELETE FROM files WHERE path=?", stale)
+        self.commit()
+        return matched, reindexed, len(stale)
+
+    def files(self, root=None):
+        """Inventory rows as dicts, optionally limited to those under ``root``"""
+        query = "SELECT path, name, parent, size, mtime_ns FROM files"
+        params = ()
+        if root is not None:
+            prefix = os.path.join(os.fspath(root), "")
+            query += " WHERE substr(path, 1, ?) = ?"
+            params = (len(prefix), prefix)
+        return [
+            {"path": path, "name": name, "parent": parent, "size": size, "mtime_ns": mtime_ns}
+            for path, name, parent, size, mtime_ns in self.conn.execute(query, params)
+        ]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """(path, snippet) for the best FTS5 matches of ``query``"""
+        return self.conn.execute(
+            "SELECT path, snippet(bodies, 2, '[', ']', ' … ', 12) FROM bodies "
+            "WHERE bodies MATCH ? ORDER BY bm25(bodies) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+
 class ComprehensiveTranscriptSearch:
     """Search for all transcript/lyric content"""
     
-    def __init__(self):
+    def __init__(self, index: TranscriptIndex):
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         self.home_dir = Path.home()
         self.output_dir = self.home_dir / "Documents" / f"TRANSCRIPT_SEARCH_{self.timestamp}"
-        self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        self.index = index
         self.found_files = []
         
     def print_header(self, text: str, color=Colors.CYAN):
@@ -42,45 +176,23 @@ class ComprehensiveTranscriptSearch:
         """Search for files by name pattern"""
         self.print_header(f"🔍 SEARCHING BY FILENAME: {search_path}")
         
-        patterns = [
-            "*transcript*",
-            "*lyrics*",
-            "*lyric*",
-            "*transcription*"
-        ]
+        try:
+            matched, reindexed, removed = self.index.update(search_path)
+        except sqlite3.Error as e:
+            print(f"{Colors.RED}Error indexing {search_path}: {e}{Colors.END}")
+            return 0
+        print(f"  {reindexed} new/changed, {matched - reindexed} unchanged, {removed} removed")
         
         found_count = 0
-        
-        for pattern in patterns:
-            try:
-                # Use find command for speed
-                cmd = f"find '{search_path}' -type f -iname '{pattern}' 2>/dev/null"
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=120)
-                
-                files = result.stdout.strip().split('\n')
-                files = [f for f in files if f]
-                
-                for file in files:
-                    file_path = Path(file)
-                    
-                    # Get file size
-                    try:
-                        size = file_path.stat().st_size
-                    except:
-                        size = 0
-                    
-                    self.found_files.append({
-                        'path': str(file_path),
-                        'name': file_path.name,
-                        'parent': file_path.parent.name,
-                        'size_kb': size / 1024,
-                        'type': 'filename_match'
-                    })
-                    
-                    found_count += 1
-                
-            except Exception as e:
-                print(f"{Colors.RED}Error with pattern {pattern}: {e}{Colors.END}")
+        for row in self.index.files(search_path):
+            self.found_files.append({
+                'path': row['path'],
+                'name': row['name'],
+                'parent': row['parent'],
+                'size_kb': row['size'] / 1024,
+                'type': 'filename_match'
+            })
+            found_count += 1
         
         print(f"{Colors.GREEN}✅ Found {found_count} files by filename{Colors.END}")
         
@@ -118,11 +230,12 @@ class ComprehensiveTranscriptSearch:
         nocturne = self.home_dir / "Music" / "nocTurneMeLoDieS"
         
         if not nocturne.exists():
-            return
+            return 0
         
-        # Find all transcript files
-        transcript_files = list(nocturne.rglob("*transcript*.txt"))
-        lyric_files = list(nocturne.rglob("*lyric*.txt"))
+        # Answered from the home directory index instead of two more walks
+        indexed = [Path(row['path']) for row in self.index.files(nocturne)]
+        transcript_files = [f for f in indexed if fnmatch.fnmatch(f.name.lower(), "*transcript*.txt")]
+        lyric_files = [f for f in indexed if fnmatch.fnmatch(f.name.lower(), "*lyric*.txt")]
         
         all_content_files = transcript_files + lyric_files
         
@@ -163,6 +276,7 @@ class ComprehensiveTranscriptSearch:
         self.found_files = list(unique_files.values())
         
         # Save CSV
+        self.output_dir.mkdir(parents=True, exist_ok=True)
         csv_file = self.output_dir / "ALL_TRANSCRIPTS_FOUND.csv"
         
         with open(csv_file, 'w', newline='', encoding='utf-8') as f:
@@ -213,11 +327,42 @@ class ComprehensiveTranscriptSearch:
         
         print(f"{Colors.BOLD}📁 Report saved to:{Colors.END}")
         print(f"  {self.output_dir}\n")
+    
+    def search_content(self, query: str, limit: int = SEARCH_LIMIT):
+        """Full-text search over indexed transcript bodies"""
+        self.print_header(f"📝 SEARCHING CONTENT: {query}")
+        
+        try:
+            hits = self.index.search(query, limit)
+        except sqlite3.OperationalError as e:
+            print(f"{Colors.RED}Invalid query {query!r}: {e}{Colors.END}")
+            return 0
+        
+        for path, snippet in hits:
+            print(f"{Colors.CYAN}{path}{Colors.END}")
+            print(f"  {' '.join(snippet.split())}\n")
+        
+        print(f"{Colors.GREEN}✅ {len(hits)} matching files{Colors.END}")
+        return len(hits)
 
 
 def main():
-    searcher = ComprehensiveTranscriptSearch()
-    searcher.run()
+    parser = argparse.ArgumentParser(description="Find transcript/lyric files and search their text")
+    parser.add_argument("--query", help="FTS5 query over transcript bodies (e.g. 'river', '\"exact phrase\"', 'night NEAR/5 city')")
+    parser.add_argument("--no-scan", action="store_true", help="With --query: search the existing index without walking")
+    parser.add_argument("--limit", type=int, default=SEARCH_LIMIT, help="Maximum search results")
+    parser.add_argument("--db", help=f"Index database (default: {DEFAULT_DB_PATH})")
+    args = parser.parse_args()
+
+    with TranscriptIndex(args.db) as index:
+        searcher = ComprehensiveTranscriptSearch(index)
+        if args.query:
+            if not args.no_scan:
+                searcher.search_by_filename(str(searcher.home_dir))
+                searcher.search_volumes()
+            searcher.search_content(args.query, args.limit)
+        else:
+            searcher.run()
 
 
 if __name__ == "__main__":
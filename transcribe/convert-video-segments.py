@@ -1,20 +1,26 @@
+import argparse
+import logging
 import os
-import subprocess
+import sys
+
 import whisper
 
-import logging
+sys.path.append(os.path.join(sys.path[0], "../"))
+from transcode_engine import TranscodeJob, default_workers, run_transcodes, transcode, write_summary
 
 logger = logging.getLogger(__name__)
 
 
+# Constants
+MP3_ARGS = ["-q:a", "0", "-map", "a"]
+
 
 def convert_mp4_to_mp3(mp4_file, mp3_file):
-    try:
-        subprocess.run(["ffmpeg", "-i", mp4_file, "-q:a",
-                        "0", "-map", "a", mp3_file], check=True)
+    result = transcode(TranscodeJob(mp4_file, mp3_file, MP3_ARGS))
+    if result.ok:
         logger.info(f"Converted {mp4_file} to {mp3_file}")
-    except subprocess.CalledProcessError as e:
-        logger.info(f"Error converting {mp4_file} to {mp3_file}: {e}")
+    else:
+        logger.info(f"Error converting {mp4_file} to {mp3_file}: {result.error}")
 def transcribe_audio(file_path):
     model = whisper.load_model("base")
     result = model.transcribe(file_path)
@@ -30,26 +36,44 @@ def save_transcription(segments, output_file):
     logger.info(f"Transcription saved to {output_file}")
 
 
-def process_directory(source_directory):
+def process_directory(source_directory, jobs=None, timeout=None, ffmpeg=None, summary=None):
+    # Convert every MP4 first, several ffmpeg processes at once
+    transcode_jobs = []
     for root, _, files in os.walk(source_directory):
         for filename in files:
             if filename.lower().endswith(".mp4"):
-                mp4_file = os.path.join(root, filename)
                 filename_no_ext = os.path.splitext(filename)[0]
-                mp3_file = os.path.join(root, f"{filename_no_ext}.mp3")
-                transcription_file = os.path.join(
-                    root, f"{filename_no_ext}_transcription.txt"
+                transcode_jobs.append(
+                    TranscodeJob(os.path.join(root, filename), os.path.join(root, f"{filename_no_ext}.mp3"), MP3_ARGS)
                 )
+    results = run_transcodes(transcode_jobs, workers=jobs, timeout=timeout, ffmpeg=ffmpeg)
+    if summary:
+        write_summary(summary, results)
 
-                convert_mp4_to_mp3(mp4_file, mp3_file)
-                segments = transcribe_audio(mp3_file)
-                save_transcription(segments, transcription_file)
+    for result in results:
+        if not result.ok:
+            logger.info(f"Error converting {result.job.src} to {result.job.dst}: {result.error}")
+            continue
+        mp3_file = result.job.dst
+        transcription_file = f"{os.path.splitext(mp3_file)[0]}_transcription.txt"
+        segments = transcribe_audio(mp3_file)
+        save_transcription(segments, transcription_file)
 
 
 def main():
-    source_directory = input("Enter the path to the source directory: ")
+    parser = argparse.ArgumentParser(description="Convert every MP4 under a directory to MP3 and transcribe it")
+    parser.add_argument("source_directory", nargs="?", help="Directory to scan (prompted if omitted)")
+    parser.add_argument("--jobs", type=int, default=default_workers(), help="Concurrent ffmpeg processes")
+    parser.add_argument("--timeout", type=float, help="Seconds before a single conversion is killed")
+    parser.add_argument("--ffmpeg", help="ffmpeg executable (default: $FFMPEG_BIN or ffmpeg)")
+    parser.add_argument("--summary", help="Write a JSON summary of the conversions to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    source_directory = args.source_directory or input("Enter the path to the source directory: ")
     if os.path.isdir(source_directory):
-        process_directory(source_directory)
+        process_directory(source_directory, args.jobs, args.timeout, args.ffmpeg, args.summary)
     else:
         logger.info(f"The directory {source_directory} does not exist.")
 
@@ -1,22 +1,19 @@
+import argparse
 import os
+import time
 
-import whisper
+from whisper_pool import DEFAULT_MODEL, WhisperPool, transcribe_file
 
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def transcribe_audio(file_path):
+def transcribe_audio(file_path, model_name=DEFAULT_MODEL):
     """transcribe_audio function."""
 
-    # Load the Whisper model
-    model = whisper.load_model("base")
-
-    # Transcribe the audio file
-    result = model.transcribe(file_path)
-
-    return result["segments"]
+    # The model is loaded once per process and reused for every file
+    return transcribe_file(file_path, model_name).segments
 
     """save_transcription function."""
 
@@ -32,28 +29,53 @@ def save_transcription(segments, output_file):
     """process_directory function."""
 
 
-def process_directory(source_directory):
+def transcription_path(mp3_file):
+    root, filename = os.path.split(mp3_file)
+    filename_no_ext = os.path.splitext(filename)[0]
+    return os.path.join(root, f"{filename_no_ext}_transcription.txt")
+
+
+def process_directory(source_directory, model_name=DEFAULT_MODEL, workers=1, threads=None):
+    mp3_files = []
     for root, _, files in os.walk(source_directory):
         for filename in files:
             if filename.lower().endswith(".mp3"):
-                mp3_file = os.path.join(root, filename)
-                filename_no_ext = os.path.splitext(filename)[0]
-                transcription_file = os.path.join(
-                    root, f"{filename_no_ext}_transcription.txt"
-                )
-
-                # Transcribe the MP3
-                segments = transcribe_audio(mp3_file)
-
-                # Save the transcription
-                save_transcription(segments, transcription_file)
-                logger.info(f"Transcription saved to {transcription_file}")
+                mp3_files.append(os.path.join(root, filename))
+
+    pool = WhisperPool(model_name, workers=workers, threads=threads)
+    started = time.perf_counter()
+    audio_seconds = 0.0
+    for result in pool.transcribe_many(mp3_files):
+        # Save the transcription
+        transcription_file = transcription_path(result.path)
+        save_transcription(result.segments, transcription_file)
+        audio_seconds += result.duration
+        logger.info(
+            f"Transcription saved to {transcription_file} "
+            f"({result.duration:.0f}s audio in {result.elapsed:.1f}s, RTF {result.rtf:.2f})"
+        )
+
+    wall = time.perf_counter() - started
+    if audio_seconds:
+        logger.info(
+            f"{len(mp3_files) - len(pool.failed)} files, {audio_seconds / 60:.1f} min audio in "
+            f"{wall / 60:.1f} min (overall RTF {wall / audio_seconds:.2f}, {workers} worker(s))"
+        )
     """main function."""
 
 
 def main():
-    source_directory = input("Enter the path to the source directory: ")
-    process_directory(source_directory)
+    parser = argparse.ArgumentParser(description="Transcribe every MP3 under a directory with Whisper")
+    parser.add_argument("source_directory", nargs="?", help="Directory to scan (prompted if omitted)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Whisper model name")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own model")
+    parser.add_argument("--threads", type=int, help="CPU threads per worker (default: cores / workers)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    source_directory = args.source_directory or input("Enter the path to the source directory: ")
+    process_directory(source_directory, args.model, args.workers, args.threads)
 
 
 if __name__ == "__main__":
@@ -7,16 +7,17 @@ Converts MP4 to MP3, transcribes with timestamps, and provides GPT-4o analysis
 import os
 import sys
 import json
+import argparse
 import logging
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
 
-import whisper
 from moviepy.editor import VideoFileClip
 from openai import OpenAI
 from dotenv import load_dotenv
 from audio_chunker import AudioChunker
+from whisper_pool import WhisperPool, default_threads, load_model, merge_chunk_results, plan_chunks, probe_duration
 import config
 
 
@@ -44,13 +45,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Constants
+CORES_PER_CHUNK_WORKER = 4
+
 
 class TranscriptionAnalyzer:
-    def __init__(self, openai_api_key: str):
-        """Initialize the transcription analyzer with OpenAI API key."""
+    def __init__(self, openai_api_key: str, chunk_workers: Optional[int] = None):
+        """Initialize the transcription analyzer with OpenAI API key.
+
+        Long files are transcribed ``chunk_workers`` chunks at a time
+        (default: one worker per CORES_PER_CHUNK_WORKER cores). The Whisper
+        model is only loaded here when first needed, see ``whisper_model``.
+        """
         self.client = OpenAI(api_key=openai_api_key)
-        self.whisper_model = whisper.load_model(config.WHISPER_MODEL)
         self.chunker = AudioChunker()
+        self.chunk_workers = chunk_workers or max(1, (os.cpu_count() or 1) // CORES_PER_CHUNK_WORKER)
+
+    @property
+    def whisper_model(self):
+        """Whisper model for short files, loaded on first use.
+
+        This is whisper_pool's resident model, so a single-worker pool for a
+        long file reuses it instead of loading a second copy, and runs that
+        only use worker processes never load it in the parent.
+        """
+        return load_model(config.WHISPER_MODEL)
 
     def convert_mp4_to_mp3(self, input_path: str, output_path: str) -> bool:
         """Convert MP4 file to MP3 format."""
@@ -83,8 +102,7 @@ class TranscriptionAnalyzer:
 
             return {
                 "full_transcript": result["text"],
-                "timestamped_transcript": "
-".join(transcript_with_timestamps),
+                "timestamped_transcript": "\n".join(transcript_with_timestamps),
                 "segments": result["segments"],
                 "language": result.get("language", "unknown"),
             }
@@ -258,45 +276,48 @@ class TranscriptionAnalyzer:
     ) -> bool:
         """Process a long file by splitting into chunks."""
         try:
-            # Create chunks directory
-            chunks_dir = dirs["base_dir"] / "chunks"
-            chunks_dir.mkdir(exist_ok=True)
-
-            # Split audio into chunks
-            chunk_files = self.chunker.split_audio_file(str(audio_path), chunks_dir)
-            if not chunk_files:
-                logger.error("Failed to create audio chunks")
-                return False
-
-            logger.info(f"Created {len(chunk_files)} chunks, processing each...")
-
-            # Process each chunk
-            chunk_transcripts = []
-            for i, chunk_file in enumerate(chunk_files, 1):
-                logger.info(
-                    f"Processing chunk {i}/{len(chunk_files)}: {Path(chunk_file).name}"
-                )
-
-                chunk_result = self.transcribe_audio(chunk_file)
-                if chunk_result:
-                    chunk_transcripts.append(chunk_result)
-
-                    # Save individual chunk transcript
-                    chunk_name = Path(chunk_file).stem
-                    chunk_transcript_file = chunks_dir / f"{chunk_name}_transcript.txt"
-                    with open(chunk_transcript_file, "w", encoding="utf-8") as f:
-                        f.write(chunk_result["full_transcript"])
+            # Plan overlapping windows; each worker decodes its own window to
+            # PCM in memory, so no chunk files are written
+            chunks = plan_chunks(
+                probe_duration(str(audio_path)),
+                config.MAX_CHUNK_DURATION_MINUTES * 60,
+                config.CHUNK_OVERLAP_SECONDS,
+            )
+            workers = min(self.chunk_workers, len(chunks))
+            logger.info(f"Transcribing {len(chunks)} chunks with {workers} workers...")
+
+            pool = WhisperPool(
+                config.WHISPER_MODEL,
+                workers=workers,
+                threads=default_threads(workers),
+                word_timestamps=True,
+            )
+            chunk_results = pool.transcribe_chunks(str(audio_path), chunks)
+            for chunk, result in zip(chunks, chunk_results):
+                if result is None:
+                    logger.warning(f"Failed to transcribe chunk {chunk.index + 1}")
                 else:
-                    logger.warning(f"Failed to transcribe chunk {i}")
-                    chunk_transcripts.append({})
+                    logger.info(
+                        f"Chunk {chunk.index + 1}/{len(chunks)}: {result.duration:.0f}s audio "
+                        f"in {result.elapsed:.1f}s (RTF {result.rtf:.2f})"
+                    )
 
-            # Merge all chunk transcripts
-            merged_transcript = self.chunker.merge_transcripts(
-                chunk_transcripts, chunk_files
-            )
-            if not merged_transcript:
-                logger.error("Failed to merge chunk transcripts")
+            # Merge all chunk transcripts, deduplicating the overlaps by word timestamps
+            if not any(chunk_results):
+                logger.error("Failed to transcribe any chunk")
                 return False
+            segments, full_text = merge_chunk_results(chunks, chunk_results)
+            merged_transcript = {
+                "full_transcript": full_text.strip(),
+                "timestamped_transcript": "\n".join(
+                    f"[{self._format_timestamp(segment['start'])} - "
+                    f"{self._format_timestamp(segment['end'])}] {segment['text'].strip()}"
+                    for segment in segments
+                ),
+                "segments": segments,
+                "language": next((r.language for r in chunk_results if r and r.language), "unknown"),
+                "total_duration": chunks[-1].end,
+            }
 
             # Save merged transcript files
             transcript_file = (
@@ -322,7 +343,7 @@ class TranscriptionAnalyzer:
             if isinstance(analysis, dict):
                 analysis["chunking_info"] = {
                     "was_chunked": True,
-                    "chunk_count": len(chunk_files),
+                    "chunk_count": len(chunks),
                     "max_chunk_duration_minutes": config.MAX_CHUNK_DURATION_MINUTES,
                     "chunk_overlap_seconds": config.CHUNK_OVERLAP_SECONDS,
                 }
@@ -340,14 +361,11 @@ class TranscriptionAnalyzer:
                 merged_transcript,
                 analysis,
                 True,
-                len(chunk_files),
+                len(chunks),
             )
 
-            # Clean up chunk files
-            self.chunker.cleanup_chunks(chunk_files)
-
             logger.info(
-                f"Successfully processed {input_file.name} ({len(chunk_files)} chunks)"
+                f"Successfully processed {input_file.name} ({len(chunks)} chunks)"
             )
             logger.info(f"Output directory: {dirs['base_dir']}")
             return True
@@ -404,7 +422,7 @@ class TranscriptionAnalyzer:
                 if input_file.suffix.lower() == ".mp4":
                     f.write(f"- Audio: {audio_path.name}\n")
                 if was_chunked:
-                    f.write(f"- Chunks: {chunk_count} temporary files (cleaned up)\n")
+                    f.write(f"- Chunks: {chunk_count} decoded in memory (no temporary files)\n")
 
                 if (
                     was_chunked
@@ -419,7 +437,7 @@ class TranscriptionAnalyzer:
                     f.write(
                         f"- {config.CHUNK_OVERLAP_SECONDS}s overlap between chunks\n"
                     )
-                    f.write(f"- Chunks processed individually and merged\n")
+                    f.write(f"- Chunks transcribed in parallel and merged by word timestamps\n")
 
         except Exception as e:
             logger.warning(f"Could not create summary file: {e}")
@@ -436,16 +454,13 @@ def main():
         )
         return
 
-    # Initialize analyzer
-    analyzer = TranscriptionAnalyzer(api_key)
-
     # Get input file from command line argument
-    if len(sys.argv) != 2:
-        logger.info("Usage: python transcription_analyzer.py <input_file>")
-        logger.info("Supported formats: MP3, MP4")
-        return
+    parser = argparse.ArgumentParser(description="Transcribe and analyze an MP3/MP4 file")
+    parser.add_argument("input_file", help="Supported formats: MP3, MP4")
+    parser.add_argument("--workers", type=int, help="Processes transcribing the chunks of long files")
+    args = parser.parse_args()
 
-    input_file = sys.argv[1]
+    input_file = args.input_file
 
     # Validate file format
     supported_formats = [".mp3", ".mp4"]
@@ -455,6 +470,9 @@ def main():
         )
         return
 
+    # Initialize analyzer
+    analyzer = TranscriptionAnalyzer(api_key, chunk_workers=args.workers)
+
     # Process the file
     success = analyzer.process_file(input_file)
     if success:
@@ -1,11 +1,41 @@
+#!/usr/bin/env python3
+"""
+Batch Whisper transcription driven by config.yaml.
+
+A manifest in the output directory records every finished file, keyed by
+the SHA-256 of the audio content plus a hash of the settings that shape
+the output (model, transcription options, SRT layout, formats). On the
+next run an input whose key is recorded with its output files, and whose
+outputs still exist, is skipped; editing the audio or changing a setting
+re-transcribes everything it affects. The manifest is rewritten
+after each file, so a killed batch resumes with the first file it had not
+finished.
+
+Content hashes are cached in hash_cache (by inode, size and mtime), so
+checking an unchanged library does not re-read the audio.
+
+Usage:
+    python whisper-transcriber.py                     # transcribe what changed
+    python whisper-transcriber.py --plan              # show what would run, and how much audio
+    python whisper-transcriber.py --force             # ignore the manifest
+"""
+
+import argparse
+import hashlib
 import json
+import logging
+import os
+import subprocess
+import sys
+import time
 from pathlib import Path
 
-import the
 import whisper
 import yaml
 
-import logging
+sys.path.append(os.path.join(sys.path[0], "../"))
+from dedup_engine import hash_file
+from hash_cache import HashCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +44,8 @@ logger = logging.getLogger(__name__)
 CONSTANT_1000 = 1000
 CONSTANT_60000 = 60000
 CONSTANT_3600000 = 3600000
-
-
+MANIFEST_NAME = ".whisper_manifest.json"
+ALL_FORMATS = ["txt", "vtt", "srt", "json"]
 
 def load_config(config_file="config.yaml"):
     """Load configuration file"""
@@ -51,7 +81,145 @@ def get_media_files(config):
     return sorted(media_files)
 
 
-def transcribe_audio(config_file="config.yaml"):
+def output_formats(config):
+    """Output formats selected in the config"""
+    fmt = config["output"]["format"]
+    return ALL_FORMATS if fmt == "all" else fmt
+
+
+def config_fingerprint(config):
+    """Hash of the settings that change what gets written for a file"""
+    settings = {
+        "model": config["model"]["name"],
+        "fp16": config["model"]["fp16"],
+        "transcription": config["transcription"],
+        "srt": config["srt"],
+        "formats": sorted(output_formats(config)),
+    }
+    canonical = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def audio_duration(path):
+    """Duration in seconds from ffprobe, or ``None`` if it can't be read"""
+    try:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return float(out.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def format_duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m{rest % 60:02d}s"
+
+
+class Manifest:
+    """Finished transcriptions in an output directory, keyed by content + config hash"""
+
+    def __init__(self, output_dir):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def is_done(self, key, outputs):
+        """True if ``key`` was finished into ``outputs`` and they all still exist"""
+        entry = self.entries.get(key)
+        return bool(entry) and set(outputs) <= set(entry["outputs"]) and all(map(os.path.exists, outputs))
+
+    def record(self, key, source, outputs, duration):
+        """Mark ``key`` finished and persist the manifest atomically"""
+        known = self.entries.get(key, {}).get("outputs", [])
+        self.entries[key] = {
+            "source": source,
+            "outputs": sorted(set(known) | set(outputs)),
+            "duration": duration,
+            "completed": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def plan_work(media_files, config, manifest, force=False):
+    """Split ``media_files`` into (pending, skipped) lists of (path, key)"""
+    fingerprint = config_fingerprint(config)
+    pending, skipped = [], []
+    with HashCache() as cache:
+        for audio in media_files:
+            digest = cache.get_or_compute(audio, "sha256", lambda: hash_file(audio))
+            key = f"{digest}:{fingerprint}"
+            if not force and digest and manifest.is_done(key, output_paths(audio, config)):
+                skipped.append((audio, key))
+            else:
+                pending.append((audio, key))
+    return pending, skipped
+
+
+def output_paths(audio, config):
+    """Files a transcription of ``audio`` is written to"""
+    base_name = os.path.splitext(os.path.basename(audio))[0]
+    return [os.path.join(config["output"]["directory"], f"{base_name}.{fmt}") for fmt in output_formats(config)]
+
+
+def write_outputs(result, audio, config):
+    """Write every configured format for one result; returns the paths written"""
+    outputs = output_paths(audio, config)
+    for fmt, output_file in zip(output_formats(config), outputs):
+        if fmt == "txt":
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(result["text"])
+        elif fmt == "srt":
+            # Manually process SRT output
+            with open(output_file, "w", encoding="utf-8") as f:
+                if config["srt"]["use_default_line_breaks"]:
+                    write_srt_with_default_line_breaks(result, f)
+                else:
+                    write_srt_with_word_timestamps(
+                        result,
+                        f,
+                        config["srt"]["max_line_width"],
+                        config["srt"]["max_line_count"],
+                        config["srt"]["max_words_per_line"])
+        elif fmt == "vtt":
+            with open(output_file, "w", encoding="utf-8") as f:
+                writer = whisper.utils.WriteVTT(config["output"]["directory"])
+                writer.write_result(result, f)
+        elif fmt == "json":
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+    return outputs
+
+
+def print_plan(pending, skipped):
+    """Report what a run would transcribe and how much audio that is"""
+    durations = {audio: audio_duration(audio) for audio, _ in pending}
+    total = sum(d for d in durations.values() if d)
+    unknown = sum(d is None for d in durations.values())
+
+    for audio, _ in pending:
+        duration = durations[audio]
+        print(f"  transcribe  {format_duration(duration) if duration else '?':>10}  {os.path.basename(audio)}")
+    for audio, _ in skipped:
+        print(f"  skip        {'':>10}  {os.path.basename(audio)}")
+    print()
+    print(f"{len(pending)} to transcribe ({format_duration(total)} of audio), {len(skipped)} already done")
+    if unknown:
+        print(f"Duration unknown for {unknown} file(s) (ffprobe missing or unreadable)")
+
+
+def transcribe_audio(config_file="config.yaml", plan=False, force=False):
     """Use the configuration file's transcription function"""
     # Load configuration
     config = load_config(config_file)
@@ -64,9 +232,19 @@ def transcribe_audio(config_file="config.yaml"):
         logger.info(f"Supported formats: {', '.join(config['input']['formats'])}")
         return
 
-    logger.info(f"Found {len(media_files)} files to process:")
-    for file in media_files:
+    os.makedirs(config["output"]["directory"], exist_ok=True)
+    manifest = Manifest(config["output"]["directory"])
+    pending, skipped = plan_work(media_files, config, manifest, force)
+
+    if plan:
+        print_plan(pending, skipped)
+        return
+
+    logger.info(f"Found {len(media_files)} files, {len(skipped)} already transcribed, {len(pending)} to process:")
+    for file, _ in pending:
         logger.info(f"  - {os.path.basename(file)}")
+    if not pending:
+        return
     print()
 
     # Load the model
@@ -74,10 +252,8 @@ def transcribe_audio(config_file="config.yaml"):
         config["model"]["name"], device=config["model"]["device"]
     )
 
-    for audio in media_files:
+    for audio, key in pending:
         logger.info(f"Processing: {os.path.basename(audio)}")
-        # Get the file name (remove the extension)
-        base_name = os.path.splitext(os.path.basename(audio))[0]
 
         # Using the transcribe function
         result = model.transcribe(
@@ -98,39 +274,10 @@ def transcribe_audio(config_file="config.yaml"):
             word_timestamps=config["transcription"]["word_timestamps"],
             verbose=config["output"]["verbose"])
 
-        # Processing output
-        formats = (
-            config["output"]["format"]
-            if config["output"]["format"] != "all"
-            else ["txt", "vtt", "srt", "json"]
-        )
-
-        for fmt in formats:
-            output_file = os.path.join(
-                config["output"]["directory"], f"{base_name}.{fmt}"
-            )
-            if fmt == "txt":
-                with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(result["text"])
-            elif fmt == "srt":
-                # Manually process SRT output
-                with open(output_file, "w", encoding="utf-8") as f:
-                    if config["srt"]["use_default_line_breaks"]:
-                        write_srt_with_default_line_breaks(result, f)
-                    else:
-                        write_srt_with_word_timestamps(
-                            result,
-                            f,
-                            config["srt"]["max_line_width"],
-                            config["srt"]["max_line_count"],
-                            config["srt"]["max_words_per_line"])
-            elif fmt == "vtt":
-                with open(output_file, "w", encoding="utf-8") as f:
-                    writer = whisper.utils.WriteVTT(config["output"]["directory"])
-                    writer.write_result(result, f)
-            elif fmt == "json":
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+        # Processing output, then record the file as finished
+        outputs = write_outputs(result, audio, config)
+        segments = result.get("segments") or []
+        manifest.record(key, audio, outputs, segments[-1]["end"] if segments else None)
 
         if config["output"]["verbose"]:
             print(
@@ -191,7 +338,7 @@ def write_srt_with_default_line_breaks(result, file):
         start = format_timestamp(segment["start"])
         end = format_timestamp(segment["end"])
         text = segment["text"].strip().replace("-->", "->")
-        logger.info(f"{segment['id']}\n{start} --> {end}\n{text}\n", file=file)
+        print(f"{segment['id']}\n{start} --> {end}\n{text}\n", file=file)
 def format_timestamp(seconds: float):
     milliseconds = int(seconds * CONSTANT_1000)
     hours = milliseconds // CONSTANT_3600000
@@ -201,5 +348,16 @@ def format_timestamp(seconds: float):
     return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe media files listed by a config.yaml")
+    parser.add_argument("--config", default="config.yaml", help="Configuration file (default: config.yaml)")
+    parser.add_argument("--plan", action="store_true", help="List what would be transcribed and the audio duration, then exit")
+    parser.add_argument("--force", action="store_true", help="Re-transcribe files the manifest marks as done")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    transcribe_audio(args.config, plan=args.plan, force=args.force)
+
+
 if __name__ == "__main__":
-    transcribe_audio()
+    main()
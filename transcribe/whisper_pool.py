@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Resident Whisper workers: load the model once per process, then transcribe
+many files.
+
+``whisper.load_model`` costs seconds (more for the larger models) and a
+few hundred MB; calling it per file makes a directory of short episodes
+spend most of its time reloading weights. ``WhisperPool`` keeps the model
+resident:
+
+* ``workers=1`` runs in this process with one model loaded on first use
+  (``load_model``, which callers can also use to share that model)
+* ``workers=N`` starts N spawned processes, each loading its own model
+  once in the pool initializer and capping torch to ``threads`` CPU
+  threads so N workers don't oversubscribe the cores. At most
+  IN_FLIGHT_PER_WORKER jobs per worker are submitted ahead, so a long
+  job list is not queued (and pickled) all at once.
+
+Every result carries the audio duration and the wall time spent, so the
+real-time factor (``rtf`` = processing seconds / audio seconds; below 1 is
+faster than real time) can be reported per file.
+
+Long recordings are split with ``plan_chunks`` into overlapping windows
+that the workers transcribe concurrently. Each worker decodes only its own
+window straight to PCM in memory (``ffmpeg -ss/-t`` into a pipe), so no
+chunk files are written. ``merge_chunk_results`` stitches the chunks back
+together by word timestamps: inside each overlap, words are kept from the
+chunk whose centre they are closer to (cut at the overlap midpoint), and a
+word repeated on both sides of the cut is dropped once.
+
+Usage:
+    pool = WhisperPool("base", workers=4)
+    for result in pool.transcribe_many(paths):
+        print(result.path, f"RTF {result.rtf:.2f}")
+
+    pool = WhisperPool("base", workers=4, word_timestamps=True)
+    chunks = plan_chunks(probe_duration(path), 10 * 60, 5)
+    results = pool.transcribe_chunks(path, chunks)
+    segments, text = merge_chunk_results(chunks, results)
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+DEFAULT_MODEL = "base"
+SAMPLE_RATE = 16000  # whisper.load_audio resamples everything to 16 kHz
+SEAM_TOLERANCE = 0.3  # Seconds two copies of a seam word may be apart
+IN_FLIGHT_PER_WORKER = 2  # Jobs submitted ahead per worker process
+
+# Per-process resident model, set by _init_worker (or lazily in-process)
+_model = None
+_model_name: Optional[str] = None
+
+
+class TranscriptionResult(NamedTuple):
+    """One transcribed file with its timing"""
+
+    path: str
+    segments: List[Dict[str, Any]]
+    text: str
+    language: Optional[str]
+    duration: float
+    elapsed: float
+
+    @property
+    def rtf(self) -> float:
+        """Real-time factor: processing seconds per second of audio"""
+        return self.elapsed / self.duration if self.duration else 0.0
+
+
+class AudioChunk(NamedTuple):
+    """A window of a long recording, in seconds"""
+
+    index: int
+    start: float
+    end: float
+
+
+def default_threads(workers: int) -> int:
+    """CPU threads per worker so that ``workers`` of them fill the machine"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _limit_threads(threads: Optional[int]) -> None:
+    if not threads:
+        return
+    # Before torch is imported these also cap OpenMP/MKL inside numpy
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def load_model(model_name: str = DEFAULT_MODEL, device: Optional[str] = None):
+    """This process's resident Whisper model, loaded on first use"""
+    global _model, _model_name
+    if _model is None or _model_name != model_name:
+        import whisper
+
+        start = time.perf_counter()
+        _model = whisper.load_model(model_name, device=device)
+        _model_name = model_name
+        logger.info(f"Loaded Whisper '{model_name}' in {time.perf_counter() - start:.1f}s (pid {os.getpid()})")
+    return _model
+
+
+def _init_worker(model_name: str, device: Optional[str], threads: Optional[int]) -> None:
+    _limit_threads(threads)
+    load_model(model_name, device)
+
+
+def transcribe_file(path: str, model_name: str = DEFAULT_MODEL, device: Optional[str] = None, **options) -> TranscriptionResult:
+    """Transcribe ``path`` with this process's resident model"""
+    import whisper
+
+    model = load_model(model_name, device)
+    start = time.perf_counter()
+    audio = whisper.load_audio(path)
+    result = model.transcribe(audio, **options)
+    return TranscriptionResult(
+        path=path,
+        segments=result["segments"],
+        text=result["text"],
+        language=result.get("language"),
+        duration=len(audio) / SAMPLE_RATE,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def probe_duration(path: str) -> float:
+    """Audio duration in seconds, from ffprobe (no decoding)"""
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(out.strip())
+
+
+def load_audio_slice(path: str, start: float, duration: float) -> "np.ndarray":
+    """Decode ``duration`` seconds from ``start`` to 16 kHz mono float32, in memory"""
+    import numpy as np
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error",
+        "-ss", f"{start:.3f}", "-t", f"{duration:.3f}", "-i", path,
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-",
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def plan_chunks(duration: float, max_seconds: float, overlap: float) -> List[AudioChunk]:
+    """Windows of at most ``max_seconds`` covering ``duration``, each overlapping the next"""
+    if overlap >= max_seconds:
+        raise ValueError("overlap must be shorter than the chunk length")
+    chunks = []
+    start = 0.0
+    while True:
+        end = min(duration, start + max_seconds)
+        chunks.append(AudioChunk(len(chunks), start, end))
+        if end >= duration:
+            return chunks
+        start = end - overlap
+
+
+def transcribe_chunk(
+    path: str, chunk: AudioChunk, model_name: str = DEFAULT_MODEL, device: Optional[str] = None, **options
+) -> TranscriptionResult:
+    """Transcribe one window; segment and word times are shifted to file time"""
+    model = load_model(model_name, device)
+    start = time.perf_counter()
+    audio = load_audio_slice(path, chunk.start, chunk.end - chunk.start)
+    result = model.transcribe(audio, **options)
+
+    segments = []
+    for segment in result["segments"]:
+        segment = dict(segment, start=segment["start"] + chunk.start, end=segment["end"] + chunk.start)
+        if segment.get("words"):
+            segment["words"] = [
+                dict(word, start=word["start"] + chunk.start, end=word["end"] + chunk.start)
+                for word in segment["words"]
+            ]
+        segments.append(segment)
+    return TranscriptionResult(
+        path=path,
+        segments=segments,
+        text=result["text"],
+        language=result.get("language"),
+        duration=len(audio) / SAMPLE_RATE,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def _normalized(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_chunk_results(
+    chunks: List[AudioChunk], results: List[Optional[TranscriptionResult]]
+) -> Tuple[List[Dict[str, Any]], str]:
+    """Stitch chunk transcripts into one (segments, text), deduplicating overlaps.
+
+    Each overlap is cut at its midpoint: a word (or, without word
+    timestamps, a segment) belongs to the chunk whose side of the cut its
+    centre falls on. If the first word kept after a cut repeats the last
+    word kept before it and they overlap in time, it is dropped. Chunks
+    that failed (``None``) leave a gap.
+    """
+    merged: List[Dict[str, Any]] = []
+    last_word = None
+    for i, (chunk, result) in enumerate(zip(chunks, results)):
+        lower = (chunk.start + chunks[i - 1].end) / 2 if i else float("-inf")
+        upper = (chunks[i + 1].start + chunk.end) / 2 if i + 1 < len(chunks) else float("inf")
+        at_seam = i > 0
+        for segment in result.segments if result else ():
+            words = segment.get("words")
+            if not words:
+                if lower <= (segment["start"] + segment["end"]) / 2 < upper:
+                    merged.append(dict(segment))
+                    at_seam = False
+                continue
+
+            kept = [w for w in words if lower <= (w["start"] + w["end"]) / 2 < upper]
+            if (
+                at_seam
+                and kept
+                and last_word is not None
+                and _normalized(kept[0]["word"]) == _normalized(last_word["word"])
+                and kept[0]["start"] < last_word["end"] + SEAM_TOLERANCE
+            ):
+                kept = kept[1:]
+            if not kept:
+                continue
+            at_seam = False
+            merged.append(
+                dict(
+                    segment,
+                    start=kept[0]["start"],
+                    end=kept[-1]["end"],
+                    text="".join(w["word"] for w in kept),
+                    words=kept,
+                )
+            )
+            last_word = kept[-1]
+
+    for i, segment in enumerate(merged):
+        segment["id"] = i
+    return merged, "".join(segment["text"] for segment in merged)
+
+
+class WhisperPool:
+    """Transcribe many files with the model loaded once per worker"""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        workers: int = 1,
+        threads: Optional[int] = None,
+        device: Optional[str] = None,
+        **options,
+    ):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.threads = threads or (default_threads(self.workers) if self.workers > 1 else None)
+        self.device = device
+        self.options = options
+        self.failed: List[tuple] = []
+
+    def _run(self, fn: Callable[..., TranscriptionResult], jobs: Iterable[tuple]) -> Iterator[Tuple[tuple, TranscriptionResult]]:
+        """``fn(*job, model, device, **options)`` per job, yielded as (job, result) when done"""
+        self.failed = []
+        if self.workers == 1:
+            if self.threads:
+                _limit_threads(self.threads)
+            for job in jobs:
+                try:
+                    yield job, fn(*job, self.model_name, self.device, **self.options)
+                except Exception as e:
+                    self._failed(job, e)
+            return
+
+        # spawn: forking a process that already holds torch threads can deadlock
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.model_name, self.device, self.threads),
+        ) as pool:
+            jobs = iter(jobs)
+            limit = self.workers * IN_FLIGHT_PER_WORKER
+            pending: Dict[Any, tuple] = {}
+
+            def submit_more():
+                for job in islice(jobs, limit - len(pending)):
+                    pending[pool.submit(fn, *job, self.model_name, self.device, **self.options)] = job
+
+            submit_more()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                finished = [(pending.pop(future), future) for future in done]
+                # Refill before yielding so workers stay busy while the caller works
+                submit_more()
+                for job, future in finished:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self._failed(job, e)
+                        continue
+                    yield job, result
+
+    def transcribe_many(self, paths: Iterable[str]) -> Iterator[TranscriptionResult]:
+        """Yield a result per path as files finish; failures are logged and kept in ``self.failed``"""
+        for _, result in self._run(transcribe_file, ((path,) for path in paths)):
+            yield result
+
+    def transcribe_chunks(self, path: str, chunks: List[AudioChunk]) -> List[Optional[TranscriptionResult]]:
+        """Transcribe the windows of one file concurrently; results in chunk order (``None`` if failed)"""
+        results: List[Optional[TranscriptionResult]] = [None] * len(chunks)
+        for (_, chunk), result in self._run(transcribe_chunk, ((path, chunk) for chunk in chunks)):
+            results[chunk.index] = result
+        return results
+
+    def _failed(self, job: tuple, error: Exception) -> None:
+        logger.error(f"Failed to transcribe {' '.join(map(str, job))}: {error}")
+        self.failed.append((job, error))
@@ -19,6 +19,7 @@ from collections import defaultdict, Counter, deque
 from typing import Dict, List, Tuple, Optional, Union, Any
 import mimetypes
 import base64
+import codecs
 import zlib
 import pickle
 from dataclasses import dataclass, field
@@ -26,6 +27,30 @@ from enum import Enum
 import threading
 import queue
 import time
+import random
+import logging
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pairwise analyze_quantum_similarity still works without them
+    np = None
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+
+# Constants
+CONSTANT_100 = 100
+CONSTANT_200 = 200
+CONSTANT_1024 = 1024
+CONSTANT_3000 = 3000
+CONSTANT_10000 = 10000
+QUANTUM_HASH_DIMENSIONS = 2 ** 20  # hashed vocabulary columns
+QUANTUM_BLOCK_ROWS = 256  # rows per sparse product block
+QUANTUM_DENSE_COLUMNS = 256  # most common columns multiplied as dense BLAS
+QUANTUM_TOP_K = 10
+SAMPLE_CHUNK_BYTES = CONSTANT_1024 * CONSTANT_1024  # read size when sampling large files
 
 class ContentComplexity(Enum):
     SIMPLE = "simple"
@@ -83,11 +108,24 @@ class SemanticVector:
                 self.normalized = True
 
 class QuantumInspiredAnalyzer:
-    """Quantum-inspired analysis for content understanding"""
-    def __init__(self):
+    """Quantum-inspired analysis for content understanding
+
+    For corpus-wide similarity each document's amplitude vector is computed
+    once (``add_document``) over a hashed vocabulary and stacked into a
+    sparse matrix; ``top_k_neighbours`` then multiplies it against its own
+    transpose a block of rows at a time, so memory stays at
+    ``block_rows x documents`` dense scores instead of a full n x n matrix.
+
+    Words like "the" appear in nearly every document and would make every
+    sparse product fully dense, so the most common columns are split off
+    into a small dense matrix (a BLAS product) and only the long tail goes
+    through the sparse product.
+    """
+    def __init__(self, dimensions: int = QUANTUM_HASH_DIMENSIONS):
         self.quantum_states = {}
         self.entanglement_matrix = defaultdict(dict)
         self.superposition_threshold = 0.7
+        self.dimensions = dimensions
         
     def analyze_quantum_similarity(self, content1: str, content2: str) -> float:
         """Quantum-inspired similarity analysis"""
@@ -115,15 +153,101 @@ class QuantumInspiredAnalyzer:
     
     def _calculate_quantum_overlap(self, state1: Dict[str, float], state2: Dict[str, float]) -> float:
         """Calculate quantum overlap between two states"""
-        all_words = set(state1.keys()) | set(state2.keys())
-        overlap = 0.0
+        # Only shared words contribute to the inner product
+        if len(state1) > len(state2):
+            state1, state2 = state2, state1
+        return sum(amp * state2[word] for word, amp in state1.items() if word in state2)
+    
+    def _hashed_state(self, content: str) -> Tuple[List[int], List[float]]:
+        """Amplitude vector over the hashed vocabulary as (columns, amplitudes)"""
+        words = re.findall(r'\b\w+\b', content.lower())
+        if not words:
+            return [], []
         
-        for word in all_words:
-            amp1 = state1.get(word, 0.0)
-            amp2 = state2.get(word, 0.0)
-            overlap += amp1 * amp2
+        # Words colliding in one column pool their frequency, so the state
+        # stays normalised (sum of squared amplitudes == 1)
+        column_freq = Counter()
+        for word, freq in Counter(words).items():
+            column_freq[zlib.crc32(word.encode('utf-8')) % self.dimensions] += freq
         
-        return overlap
+        total_words = len(words)
+        columns = sorted(column_freq)
+        return columns, [math.sqrt(column_freq[c] / total_words) for c in columns]
+    
+    def add_document(self, doc_id: str, content: str):
+        """Compute and keep one document's amplitude vector (a sparse matrix row)"""
+        columns, amplitudes = self._hashed_state(content)
+        if np is not None:
+            columns = np.asarray(columns, dtype=np.int32)
+            amplitudes = np.asarray(amplitudes, dtype=np.float32)
+        self.quantum_states[doc_id] = (columns, amplitudes)
+    
+    def build_state_matrix(self) -> Tuple[List[str], Any]:
+        """Stack the stored amplitude vectors into a CSR matrix (documents x columns)"""
+        doc_ids = list(self.quantum_states)
+        indptr = np.zeros(len(doc_ids) + 1, dtype=np.int64)
+        for i, doc_id in enumerate(doc_ids):
+            indptr[i + 1] = indptr[i] + len(self.quantum_states[doc_id][0])
+        
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        data = np.empty(indptr[-1], dtype=np.float32)
+        for i, doc_id in enumerate(doc_ids):
+            columns, amplitudes = self.quantum_states[doc_id]
+            indices[indptr[i]:indptr[i + 1]] = columns
+            data[indptr[i]:indptr[i + 1]] = amplitudes
+        
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(doc_ids), self.dimensions))
+        return doc_ids, matrix
+    
+    def top_k_neighbours(self, k: int = QUANTUM_TOP_K, block_rows: int = QUANTUM_BLOCK_ROWS,
+                         min_overlap: float = 0.0) -> Dict[str, List[Tuple[str, float]]]:
+        """Top-k quantum overlaps for every stored document, best first"""
+        if sparse is None:
+            logger.info("⚠️ numpy/scipy not available, skipping quantum neighbour analysis")
+            return {}
+        if len(self.quantum_states) < 2:
+            return {doc_id: [] for doc_id in self.quantum_states}
+        
+        doc_ids, matrix = self.build_state_matrix()
+        k = min(k, len(doc_ids) - 1)
+        
+        # Split the most frequent columns off into a dense head
+        doc_freq = np.bincount(matrix.indices, minlength=self.dimensions)
+        head_columns = np.argsort(-doc_freq, kind='stable')[:QUANTUM_DENSE_COLUMNS]
+        head_columns = head_columns[doc_freq[head_columns] > 1]
+        in_head = np.zeros(self.dimensions, dtype=bool)
+        in_head[head_columns] = True
+        
+        head = matrix[:, head_columns].toarray()
+        tail = matrix.copy()
+        tail.data[in_head[tail.indices]] = 0.0
+        tail.eliminate_zeros()
+        tail_transposed = tail.T.tocsr()
+        neighbours = {}
+        
+        for start in range(0, len(doc_ids), block_rows):
+            stop = min(start + block_rows, len(doc_ids))
+            scores = head[start:stop] @ head.T
+            scores += (tail[start:stop] @ tail_transposed).toarray()
+            
+            # A document is not its own neighbour
+            rows = np.arange(stop - start)
+            scores[rows, rows + start] = -1.0
+            
+            best = np.argpartition(scores, -k, axis=1)[:, -k:]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            
+            for row in range(stop - start):
+                neighbours[doc_ids[start + row]] = [
+                    (doc_ids[col], float(score))
+                    for col, score in zip(best[row], best_scores[row])
+                    if score > min_overlap
+                ]
+        
+        return neighbours
 
 class AdvancedNLPProcessor:
     """Advanced NLP processing with semantic understanding"""
@@ -547,7 +671,7 @@ class UltraAdvancedContentAnalyzer:
             ('utf-32', 0.8),
             ('latin-1', 0.7),
             ('cp1252', 0.6),
-            ('iso-CONSTANT_8859-1', 0.5),
+            ('iso-8859-1', 0.5),
             ('ascii', 0.4)
         ]
         
@@ -634,39 +758,57 @@ class UltraAdvancedContentAnalyzer:
                 'error': str(e)
             }
     
-    def _intelligent_sampling(self, file_path: str, max_size: int, encoding: str) -> str:
-        """Intelligent sampling strategy for large files"""
+    def _intelligent_sampling(self, file_path: str, max_size: int, encoding: str,
+                              middle_lines: int = CONSTANT_100) -> str:
+        """Intelligent sampling strategy for large files
+        
+        One sequential pass with bounded memory: the head, a reservoir
+        sample of ``middle_lines`` lines from the middle (kept in file order),
+        then the tail. Nothing larger than ``max_size`` bytes is ever held,
+        however big the file is.
+        
+        Lines are split on raw bytes when ``encoding`` writes "\n" as the
+        byte 0x0A. For UTF-16/32 the offsets are aligned to whole code units
+        and the middle is decoded incrementally before it is split, since a
+        0x0A byte there can be half of any character.
+        """
         file_size = os.path.getsize(file_path)
         
         # Calculate sampling strategy
         header_size = min(CONSTANT_1024 * CONSTANT_1024, max_size // 3)  # First 1MB or 1/3 of max
         footer_size = min(CONSTANT_1024 * CONSTANT_1024, max_size // 3)  # Last 1MB or 1/3 of max
         middle_size = max_size - header_size - footer_size
+        max_line = max(1, middle_size // max(1, middle_lines))
         
         sampled_content = []
         
         try:
-            # Read header
-            with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                sampled_content.append(f.read(header_size))
-            
-            # Read middle section (every nth line to get representative sample)
-            if middle_size > 0 and file_size > header_size + footer_size:
-                with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                    f.seek(header_size)
-                    lines = f.readlines()
-                    total_lines = len(lines)
-                    
-                    if total_lines > CONSTANT_100:  # Only sample if there are enough lines
-                        step = max(1, total_lines // CONSTANT_100)  # Sample every nth line
-                        middle_lines = [lines[i] for i in range(0, total_lines, step)]
-                        sampled_content.append(''.join(middle_lines[:middle_size//CONSTANT_100]))
-            
-            # Read footer
-            if footer_size > 0:
-                with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                    f.seek(max(0, file_size - footer_size))
-                    sampled_content.append(f.read())
+            with open(file_path, 'rb') as f:
+                codec = self._sampling_codec(f.read(4), encoding)
+                unit = len('\n'.encode(codec)) if codec else 1
+                header_size -= header_size % unit
+                footer_start = max(header_size, file_size - footer_size)
+                footer_start += -footer_start % unit
+                
+                # Read header
+                f.seek(0)
+                sampled_content.append(f.read(header_size).decode(encoding, errors='ignore'))
+                
+                # Reservoir-sample whole lines between header and footer
+                if middle_size > 0 and middle_lines > 0 and footer_start > header_size:
+                    decoder = codecs.getincrementaldecoder(codec)(errors='ignore') if codec else None
+                    reservoir = self._reservoir_sample_lines(
+                        f, footer_start - header_size, middle_lines, max_line,
+                        random.Random(file_size),  # same sample for the same file
+                        decoder,
+                    )
+                    middle = ''.join(reservoir) if codec else b''.join(reservoir).decode(encoding, errors='ignore')
+                    sampled_content.append(middle)
+                
+                # Read footer
+                if footer_size > 0:
+                    f.seek(footer_start)
+                    sampled_content.append(f.read(footer_size).decode(codec or encoding, errors='ignore'))
             
             return ''.join(sampled_content)
             
@@ -675,6 +817,79 @@ class UltraAdvancedContentAnalyzer:
             with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
                 return f.read(max_size)
     
+    def _sampling_codec(self, head: bytes, encoding: str) -> Optional[str]:
+        """Byte-order-explicit codec when ``encoding`` does not write "\n" as 0x0A, else None"""
+        if '\n'.encode(encoding) == b'\n':
+            return None
+        name = codecs.lookup(encoding).name
+        if name == 'utf-16':
+            return 'utf-16-be' if head.startswith(codecs.BOM_UTF16_BE) else 'utf-16-le'
+        if name == 'utf-32':
+            return 'utf-32-be' if head.startswith(codecs.BOM_UTF32_BE) else 'utf-32-le'
+        return name
+    
+    def _reservoir_sample_lines(self, f, length: int, k: int, max_line: int,
+                                rng: random.Random, decoder=None) -> List[Union[bytes, str]]:
+        """Up to ``k`` random whole lines from the next ``length`` bytes of ``f``
+        
+        Reads fixed-size chunks and just counts their newlines; a chunk is
+        only split when Algorithm L (skip-ahead reservoir sampling) keeps a
+        line from it, so the cost stays close to a plain read. Lines are
+        capped at ``max_line`` bytes and returned in file order. With an
+        incremental ``decoder`` the chunks are decoded first and the lines
+        are ``str`` (capped at ``max_line`` characters).
+        """
+        newline = '\n' if decoder is not None else b'\n'
+        reservoir = []  # (line index, line)
+        weight = math.exp(math.log(rng.random() or 1e-300) / k)
+        next_pick = 0
+        filled = 0
+        line_no = -1  # the line the header cut through is index -1, never picked
+        carry = newline[:0]
+        remaining = length
+        
+        while remaining > 0:
+            raw = f.read(min(SAMPLE_CHUNK_BYTES, remaining))
+            if not raw:
+                break
+            remaining -= len(raw)
+            chunk = decoder.decode(raw) if decoder is not None else raw
+            
+            data = carry + chunk
+            last_newline = data.rfind(newline)
+            if last_newline == -1:
+                carry = data[:max_line]  # an overlong line only keeps its head
+                continue
+            carry = data[last_newline + 1:][:max_line]
+            complete = data[:last_newline]
+            count = complete.count(newline) + 1
+            
+            # Decide which lines of this chunk are kept, then split only as far as needed
+            picks = []  # (reservoir slot, line index)
+            while next_pick < line_no + count:
+                if filled < k:
+                    picks.append((filled, next_pick))
+                    filled += 1
+                else:
+                    picks.append((rng.randrange(k), next_pick))
+                    weight *= math.exp(math.log(rng.random() or 1e-300) / k)
+                next_pick += 1
+                if filled == k:
+                    next_pick += int(math.log(rng.random() or 1e-300) / math.log(1 - weight))
+            
+            if picks:
+                lines = complete.split(newline, picks[-1][1] - line_no + 1)
+                for slot, index in picks:
+                    line = lines[index - line_no][:max_line - 1] + newline
+                    if slot < len(reservoir):
+                        reservoir[slot] = (index, line)
+                    else:
+                        reservoir.append((index, line))
+            line_no += count
+        
+        reservoir.sort()
+        return [line for _, line in reservoir]
+    
     def analyze_file_content_ultra_advanced(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
         """Ultra-advanced file content analysis"""
         file_path = file_info['full_path']
@@ -739,6 +954,9 @@ class UltraAdvancedContentAnalyzer:
             }
         }
         
+        # Keep the amplitude vector for the corpus-wide neighbour pass
+        self.quantum_analyzer.add_document(file_name, content_data['content'])
+        
         # Generate intelligent descriptions and recommendations
         analysis['intelligent_description'] = self._generate_ultra_intelligent_description(analysis)
         analysis['organization_priority'] = self._calculate_ultra_organization_priority(analysis)
@@ -1388,10 +1606,29 @@ class UltraAdvancedContentAnalyzer:
     
     def _calculate_quantum_similarity(self, content: str) -> float:
         """Calculate quantum similarity with other files"""
-        # This would typically compare with other files in the dataset
-        # For now, return a placeholder value
+        # Placeholder until analyze_quantum_neighbours() has seen the whole
+        # dataset and stores the best neighbour overlap instead
         return 0.5
     
+    def analyze_quantum_neighbours(self, top_k: int = QUANTUM_TOP_K):
+        """Find each analyzed file's most similar files in one blocked sparse pass"""
+        logger.info("⚛️ Computing quantum similarity neighbours...")
+        start = time.time()
+        
+        neighbours = self.quantum_analyzer.top_k_neighbours(k=top_k)
+        for file_name, matches in neighbours.items():
+            analysis = self.content_analysis.get(file_name)
+            if analysis is None:
+                continue
+            analysis['quantum_neighbours'] = [
+                {'file_name': other, 'overlap': round(score, 4)} for other, score in matches
+            ]
+            analysis['quantum_similarity'] = round(matches[0][1], 4) if matches else 0.0
+        
+        self.performance_metrics['quantum_neighbours_seconds'] = time.time() - start
+        logger.info(f"   {len(neighbours)} files compared in "
+                    f"{self.performance_metrics['quantum_neighbours_seconds']:.2f}s")
+    
     def _calculate_innovation_score(self, content: str, file_name: str) -> float:
         """Calculate innovation score"""
         return self._calculate_innovation_potential(content, file_name)
@@ -1782,6 +2019,8 @@ class UltraAdvancedContentAnalyzer:
         else:
             self._analyze_files_sequential(files_to_analyze)
         
+        self.analyze_quantum_neighbours()
+        
         logger.info(f"\n✅ Ultra-advanced analysis complete!")
         logger.info(f"   Files analyzed: {len(self.content_analysis)}")
     
@@ -1,52 +1,73 @@
+import argparse
 import os
 from PIL import Image
 
 import logging
 
+from image_engine import Journal, encode, run_jobs, write_atomic
+
 logger = logging.getLogger(__name__)
 
 
 # Constants
 CONSTANT_300 = 300
+DEFAULT_JOBS = os.cpu_count() or 1
+
+
+def convert_file(source_file, destination_file):
+    """Convert one WebP to a 2x PNG, then remove it (runs in a worker process)"""
+    with Image.open(source_file) as im:
+        width, height = im.size
+        upscale_width = width * 2
+        upscale_height = height * 2
+        im_resized = im.resize((upscale_width, upscale_height))
+        data = encode(im_resized, "PNG", dpi=(CONSTANT_300, CONSTANT_300))
+
+    # Remove the original WebP file only once the PNG is fully in place
+    write_atomic(destination_file, data)
+    os.remove(source_file)
 
 
 # Function to convert WebP images to PNG and upscale by 200% with CONSTANT_300 DPI
-def convert_and_upscale_images(source_directory, destination_directory):
+def convert_and_upscale_images(source_directory, destination_directory, jobs=DEFAULT_JOBS, restart=False):
     """convert_and_upscale_images function."""
 
     # Create the destination directory if it doesn't exist
     os.makedirs(destination_directory, exist_ok=True)
 
-    for filename in os.listdir(source_directory):
+    tasks = []
+    for filename in sorted(os.listdir(source_directory)):
         if filename.endswith(".webp"):
             source_file = os.path.join(source_directory, filename)
             filename_no_ext = os.path.splitext(filename)[0]
             destination_file = os.path.join(
                 destination_directory, f"{filename_no_ext}.png"
             )
+            tasks.append((source_file, destination_file))
 
-            # Convert WebP to PNG and upscale by 200% with CONSTANT_300 DPI
-            im = Image.open(source_file)
-            width, height = im.size
-            upscale_width = width * 2
-            upscale_height = height * 2
-            im_resized = im.resize((upscale_width, upscale_height))
-            im_resized.save(destination_file, dpi=(CONSTANT_300, CONSTANT_300))
+    with Journal.for_target(destination_directory, restart=restart) as journal:
+        for outcome in run_jobs(convert_file, tasks, workers=jobs, journal=journal):
+            filename = os.path.basename(outcome.job[0])
+            if outcome.error is not None:
+                logger.info(f"Error processing {filename}: {outcome.error}")
+            elif not outcome.resumed:
+                logger.info(
+                    f"Converted, upscaled, and removed: {filename} -> {os.path.basename(outcome.job[1])}"
+                )
 
-            # Remove the original WebP file
-            os.remove(source_file)
 
-            print(
-                f"Converted, upscaled, and removed: {filename} -> {filename_no_ext}.png"
-            )
-
-    # Main function
-    """main function."""
+def main():
+    parser = argparse.ArgumentParser(description="Convert WebP images to 2x PNG at 300 DPI")
+    parser.add_argument("source", nargs="?", help="Source directory (prompted if omitted)")
+    parser.add_argument("destination", nargs="?", help="Destination directory (prompted if omitted)")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Worker processes")
+    parser.add_argument("--restart", action="store_true", help="Ignore the journal of an interrupted run")
+    args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-def main():
     # Prompt for the source directory containing WebP images
-    source_directory = input(
+    source_directory = args.source or input(
         "Enter the path to the source directory containing WebP images: "
     )
 
@@ -56,9 +77,9 @@ def main():
         return
 
     # Prompt for the destination directory
-    destination_directory = input("Enter the path for the destination directory: ")
+    destination_directory = args.destination or input("Enter the path for the destination directory: ")
 
-    convert_and_upscale_images(source_directory, destination_directory)
+    convert_and_upscale_images(source_directory, destination_directory, jobs=args.jobs, restart=args.restart)
 
 
 # Run the main function